@@ -0,0 +1,367 @@
+"""Offline end-to-end benchmark for the toolbox agent and the supervisor.
+
+Runs a corpus of representative queries without a live LLM or the remote
+DevOps API, using the offline mode (playground_chatbot.offline):
+
+- get_answer_model() is replaced by a scripted tool-calling fake model
+  that replays a plan per query (offline/queries.yml).
+- The 'devops' API service is registered against a local HTTP server
+  serving the fixtures in offline/fixtures/devops/.
+
+For each query it reports wall time, tool-call counts, HTTP requests and
+bytes, tool-output bytes, estimated tokens in/out of the model, and the
+time spent in each layer (model, tools, framework overhead).
+
+Usage:
+    uv run python benchmarks/bench_e2e.py
+    uv run python benchmarks/bench_e2e.py --mode supervisor --repeat 3
+    uv run python benchmarks/bench_e2e.py --llm-latency 0.5 --output results.json
+    uv run python benchmarks/bench_e2e.py --mode toolbox --tables devops
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from playground_chatbot.offline import (
+    QUERIES_FILE,
+    MockDevOpsAPI,
+    QueryScript,
+    ScriptedChatModel,
+    install_offline,
+    load_scripts,
+)
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+
+def _union_seconds(intervals: list[tuple[float, float]]) -> float:
+    """Total time covered by possibly overlapping intervals."""
+    total = 0.0
+    end = float("-inf")
+    for start, stop in sorted(intervals):
+        if stop <= end:
+            continue
+        total += stop - max(start, end)
+        end = stop
+    return total
+
+
+class LayerTimer(BaseCallbackHandler):
+    """Callback handler recording when the model and the tools are running.
+
+    Agent tools (e.g., the supervisor's 'toolbox' tool) are not counted as
+    tool time, since they contain the specialist's own model and tool time.
+    """
+
+    def __init__(self, agent_tools: set[str]) -> None:
+        """Initialize the timer.
+
+        Args:
+            agent_tools: Names of the tools that wrap whole agents.
+        """
+        self.agent_tools = agent_tools
+        self.llm: list[tuple[float, float]] = []
+        self.tools: list[tuple[float, float]] = []
+        self.tool_output_bytes = 0
+        self._started: dict[UUID, tuple[str, float]] = {}
+
+    def on_chat_model_start(
+        self, serialized: dict, messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._started[run_id] = ("llm", time.perf_counter())
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._stop(run_id)
+
+    def on_llm_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._stop(run_id)
+
+    def on_tool_start(
+        self, serialized: dict, input_str: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        name = (serialized or {}).get("name") or kwargs.get("name") or ""
+        layer = "agent" if name in self.agent_tools else "tool"
+        self._started[run_id] = (layer, time.perf_counter())
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        layer = self._stop(run_id)
+        if layer == "tool":
+            content = getattr(output, "content", output)
+            self.tool_output_bytes += len(str(content).encode("utf-8"))
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._stop(run_id)
+
+    def _stop(self, run_id: UUID) -> str | None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return None
+        layer, start = started
+        interval = (start, time.perf_counter())
+        if layer == "llm":
+            self.llm.append(interval)
+        elif layer == "tool":
+            self.tools.append(interval)
+        return layer
+
+
+@dataclass
+class QueryResult:
+    """Measurements for one run of one query."""
+
+    id: str
+    mode: str
+    run: int
+    wall_s: float
+    llm_calls: int
+    tool_calls: dict[str, int]
+    http_requests: int
+    http_bytes: int
+    tool_output_bytes: int
+    tokens_in: int
+    tokens_out: int
+    llm_s: float
+    tools_s: float
+    framework_s: float
+    response: str = ""
+    error: str | None = None
+
+
+# =============================================================================
+# SETUP
+# =============================================================================
+
+
+def reset_caches() -> None:
+    """Forget all cached results so each query starts cold."""
+    from playground_chatbot.local_agents.toolbox.cache import (
+        answer_cache,
+        api_cache,
+    )
+    from playground_chatbot.local_agents.toolbox.middleware import (
+        SessionMemoMiddleware,
+    )
+
+    api_cache.clear()
+    answer_cache.clear()
+    SessionMemoMiddleware.clear()
+
+
+# =============================================================================
+# RUNNERS
+# =============================================================================
+
+
+async def _invoke(mode: str, query: str, run_config: dict, graph: Any) -> str:
+    """Run one query through the toolbox or the supervisor graph."""
+    if mode == "toolbox":
+        from playground_chatbot.local_agents.toolbox.agent import run_toolbox
+
+        result = await run_toolbox(query, run_config=run_config)
+        return str(result.get("response", ""))
+
+    from langchain_core.messages import HumanMessage
+
+    state = await graph.ainvoke({"messages": [HumanMessage(content=query)]}, run_config)
+    messages = state.get("messages") if isinstance(state, dict) else None
+    if messages:
+        return str(messages[-1].content)
+    return str(state)
+
+
+async def run_query(
+    script: QueryScript,
+    mode: str,
+    run: int,
+    model: ScriptedChatModel,
+    api: MockDevOpsAPI,
+    graph: Any = None,
+) -> QueryResult:
+    """Run one query and collect its measurements."""
+    timer = LayerTimer(agent_tools={"toolbox"})
+    run_config = {
+        "callbacks": [timer],
+        "configurable": {"thread_id": f"bench-{uuid.uuid4().hex[:8]}"},
+    }
+    model.reset_usage()
+    api.reset_counters()
+
+    error = None
+    response = ""
+    start = time.perf_counter()
+    try:
+        response = await _invoke(mode, script.query, run_config, graph)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall = time.perf_counter() - start
+
+    llm_s = _union_seconds(timer.llm)
+    tools_s = _union_seconds(timer.tools)
+    busy = _union_seconds(timer.llm + timer.tools)
+    usage = model.usage
+    return QueryResult(
+        id=script.id,
+        mode=mode,
+        run=run,
+        wall_s=wall,
+        llm_calls=usage.calls,
+        tool_calls=dict(usage.tool_calls),
+        http_requests=api.requests,
+        http_bytes=api.bytes_sent,
+        tool_output_bytes=timer.tool_output_bytes,
+        tokens_in=usage.input_tokens,
+        tokens_out=usage.output_tokens,
+        llm_s=llm_s,
+        tools_s=tools_s,
+        framework_s=max(wall - busy, 0.0),
+        response=response,
+        error=error,
+    )
+
+
+async def run_benchmark(args: argparse.Namespace) -> list[QueryResult]:
+    """Run the selected queries in the selected modes."""
+    scripts = load_scripts(args.queries)
+    if args.only:
+        scripts = [s for s in scripts if s.id in args.only]
+
+    if args.tables is not None:
+        from playground_chatbot.config import config
+
+        config.tool_result_tables = args.tables
+
+    model = ScriptedChatModel(scripts=scripts, latency=args.llm_latency)
+    api = MockDevOpsAPI(latency=args.api_latency).start()
+    results: list[QueryResult] = []
+    try:
+        install_offline(model, api.base_url)
+        modes = ["toolbox", "supervisor"] if args.mode == "both" else [args.mode]
+
+        graph = None
+        if "supervisor" in modes:
+            from macsdk.core import create_chatbot_graph
+
+            from playground_chatbot import agents
+
+            graph = create_chatbot_graph(agents.register_all_agents)
+            # The graph may import more of the SDK, patch those factories too
+            install_offline(model, api.base_url)
+
+        for mode in modes:
+            for script in scripts:
+                for run in range(args.repeat):
+                    # Every query starts cold; with --warm, repeats reuse caches
+                    if run == 0 or not args.warm:
+                        reset_caches()
+                    result = await run_query(script, mode, run, model, api, graph)
+                    results.append(result)
+    finally:
+        api.stop()
+    return results
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+
+def print_report(results: list[QueryResult]) -> None:
+    """Print a table with one row per query run."""
+    header = (
+        f"{'query':<28} {'mode':<10} {'run':>3} {'wall ms':>8} {'llm':>4} "
+        f"{'tools':>5} {'http':>4} {'http KB':>8} {'tool KB':>8} "
+        f"{'tok in':>7} {'tok out':>7} {'llm ms':>7} {'tool ms':>7} {'fw ms':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.id:<28} {r.mode:<10} {r.run:>3} {r.wall_s * 1000:>8.1f} "
+            f"{r.llm_calls:>4} {sum(r.tool_calls.values()):>5} "
+            f"{r.http_requests:>4} {r.http_bytes / 1024:>8.1f} "
+            f"{r.tool_output_bytes / 1024:>8.1f} {r.tokens_in:>7} "
+            f"{r.tokens_out:>7} {r.llm_s * 1000:>7.1f} {r.tools_s * 1000:>7.1f} "
+            f"{r.framework_s * 1000:>7.1f}" + (f"  ERROR {r.error}" if r.error else "")
+        )
+
+    totals: Counter[str] = Counter()
+    for r in results:
+        totals["wall_ms"] += r.wall_s * 1000
+        totals["tokens_in"] += r.tokens_in
+        totals["tokens_out"] += r.tokens_out
+        totals["http_bytes"] += r.http_bytes
+        totals["errors"] += bool(r.error)
+    print("-" * len(header))
+    print(
+        f"{len(results)} runs: {totals['wall_ms']:.1f} ms total, "
+        f"{totals['tokens_in']} tokens in, {totals['tokens_out']} tokens out, "
+        f"{totals['http_bytes'] / 1024:.1f} KB over HTTP, "
+        f"{totals['errors']} errors"
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--mode",
+        choices=["toolbox", "supervisor", "both"],
+        default="both",
+        help="Run queries through run_toolbox, the supervisor graph, or both",
+    )
+    parser.add_argument("--queries", type=Path, default=QUERIES_FILE)
+    parser.add_argument("--only", nargs="*", help="Only run the queries with these ids")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per query")
+    parser.add_argument(
+        "--warm",
+        action="store_true",
+        help="Keep caches between repeats of a query (default: always cold)",
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.0, help="Seconds per model call"
+    )
+    parser.add_argument(
+        "--api-latency", type=float, default=0.0, help="Seconds per API request"
+    )
+    parser.add_argument(
+        "--tables",
+        nargs="*",
+        metavar="SERVICE",
+        help="Send these API services' results as tables (tool_result_tables)",
+    )
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark from the command line."""
+    args = parse_args(argv)
+    results = asyncio.run(run_benchmark(args))
+    print_report(results)
+    if args.output:
+        args.output.write_text(
+            json.dumps([asdict(r) for r in results], indent=2), encoding="utf-8"
+        )
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Token savings of the tabular encoding of API results.
+
+Encodes the DevOps API fixtures (offline/fixtures/devops/: /services,
+/alerts, /pipelines, /jobs, /deployments) the ways they can reach the
+model:
+
+- json: the api_get result as the model gets it by default
+- compact: JSON without whitespace
+- tables: uniform lists as a header plus tab-separated rows (see
+  toolbox/tabular.py, enabled per service with tool_result_tables)
+
+and reports their size and estimated tokens (the same estimate used for
+the token budgets), with the savings of the table encoding over json.
+Pass --scale to repeat each fixture's rows, like a larger deployment.
+
+Usage:
+    uv run python benchmarks/bench_encoding.py
+    uv run python benchmarks/bench_encoding.py --scale 20 --output encoding.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+from playground_chatbot.local_agents.toolbox.compaction import estimate_tokens
+from playground_chatbot.local_agents.toolbox.tabular import encode_tables
+from playground_chatbot.offline import FIXTURES_DIR
+
+ENCODINGS = ("json", "compact", "tables")
+
+
+def load_fixture(path: Path, scale: int) -> Any:
+    """Load a fixture, with its rows repeated (with new IDs) scale times."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if not isinstance(data, list) or scale <= 1:
+        return data
+    rows = []
+    for copy in range(scale):
+        for row in data:
+            row = dict(row)
+            if isinstance(row.get("id"), int):
+                row["id"] += copy * len(data)
+            rows.append(row)
+    return rows
+
+
+def encode(data: Any, encoding: str) -> str:
+    """Encode a payload the way it would be sent to the model."""
+    if encoding == "json":
+        return json.dumps(data, ensure_ascii=False)
+    compact = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    if encoding == "compact":
+        return compact
+    return encode_tables(data) or compact
+
+
+def bench_endpoint(name: str, data: Any) -> dict[str, Any]:
+    """Measure the encodings of one endpoint's payload."""
+    result: dict[str, Any] = {
+        "endpoint": f"/{name}",
+        "rows": len(data) if isinstance(data, list) else 1,
+    }
+    for encoding in ENCODINGS:
+        text = encode(data, encoding)
+        result[f"{encoding}_bytes"] = len(text.encode("utf-8"))
+        result[f"{encoding}_tokens"] = estimate_tokens(text)
+    result["tabular"] = encode_tables(data) is not None
+    result["savings"] = 1 - result["tables_tokens"] / max(result["json_tokens"], 1)
+    return result
+
+
+def print_report(results: list[dict[str, Any]]) -> None:
+    """Print a table with one row per endpoint, and the totals."""
+    header = (
+        f"{'endpoint':<14} {'rows':>5} {'json tok':>9} {'compact tok':>12} "
+        f"{'tables tok':>11} {'savings':>8}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['endpoint']:<14} {r['rows']:>5} {r['json_tokens']:>9} "
+            f"{r['compact_tokens']:>12} {r['tables_tokens']:>11} "
+            f"{r['savings']:>7.0%}" + ("" if r["tabular"] else "  (kept as JSON)")
+        )
+    totals = {e: sum(r[f"{e}_tokens"] for r in results) for e in ENCODINGS}
+    print("-" * len(header))
+    print(
+        f"{'total':<14} {sum(r['rows'] for r in results):>5} "
+        f"{totals['json']:>9} {totals['compact']:>12} {totals['tables']:>11} "
+        f"{1 - totals['tables'] / max(totals['json'], 1):>7.0%}"
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--fixtures", type=Path, default=FIXTURES_DIR, help="Fixtures directory"
+    )
+    parser.add_argument(
+        "--scale", type=int, default=1, help="Times each fixture's rows repeat"
+    )
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the benchmark from the command line."""
+    args = parse_args(argv)
+    results = [
+        bench_endpoint(path.stem, load_fixture(path, args.scale))
+        for path in sorted(args.fixtures.glob("*.json"))
+    ]
+    print_report(results)
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,434 @@
+"""Microbenchmarks for the toolbox tool layer.
+
+Measures the pure-Python hot paths hit on every agent turn:
+
+- _list_documents   (list_skills / list_facts)
+- _parse_frontmatter
+- _read_document    (read_skill / read_fact)
+- _safe_path
+- calculate
+
+Each function is run against synthetic skill corpora of 10, 1k and 10k
+documents, with frontmatter and body sizes similar to the real skills and
+facts. Per call, it reports:
+
+- latency (min, median, p95 and mean, in microseconds)
+- allocations (peak bytes allocated during a call and bytes retained
+  after it, measured with tracemalloc)
+- file opens (counted with an audit hook)
+
+Results are written as JSON. Pass a previous result file with --compare
+to flag regressions (exit code 1 if any median latency, peak allocation
+or file-open count got worse than the threshold).
+
+Usage:
+    uv run python benchmarks/bench_tools.py --output tools.json
+    uv run python benchmarks/bench_tools.py --sizes 10 1000 --compare tools.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from playground_chatbot.local_agents.toolbox.tools import (
+    _list_documents,
+    _parse_frontmatter,
+    _read_document,
+    _safe_path,
+    calculate,
+)
+
+DEFAULT_SIZES = [10, 1000, 10000]
+
+# Documents per subdirectory, like skills/check-service-health/
+DOCS_PER_DIR = 50
+
+WORDS = (
+    "service health alert pipeline deployment latency uptime error rate "
+    "database connection pool cache replica gateway token auth job build "
+    "check verify investigate escalate monitor threshold incident status"
+).split()
+
+EXPRESSIONS = [
+    "(5 / 6) * 100",
+    "round((99.95 - 99.91) * 100, 2)",
+    "sqrt(420 ** 2 + 180 ** 2)",
+    "max(85, 420, 160, 35) / min(85, 420, 160, 35)",
+    "sum([1, 2, 3, 4, 5]) / 5",
+    "log(1000, 10) + sin(pi / 2)",
+]
+
+
+# =============================================================================
+# SYNTHETIC CORPUS
+# =============================================================================
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    """Build a pseudo-random sentence."""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_document(rng: random.Random, index: int) -> str:
+    """Build a skill-like markdown document with frontmatter.
+
+    Sizes follow the real skills and facts: 1-3 KB bodies with a few
+    sections, and occasionally a long (10 KB) document.
+    """
+    name = f"synthetic-skill-{index:05d}"
+    lines = [
+        "---",
+        f"name: {name}",
+        f'description: "{_sentence(rng, rng.randint(8, 20))}"',
+    ]
+    if rng.random() < 0.2:
+        # Some skills carry nested frontmatter (e.g., recipes)
+        lines += [
+            "recipe:",
+            "  intents:",
+            f"    - '^is {name} healthy$'",
+            "  calls:",
+            f"    service: {{service: devops, endpoint: /services/{index}}}",
+            '  template: "{service[name]} is {service[status]}"',
+        ]
+    lines += ["---", "", f"# {name.replace('-', ' ').title()}", ""]
+
+    sections = 10 if rng.random() < 0.05 else rng.randint(2, 5)
+    for section in range(sections):
+        lines += [f"## Step {section + 1}", ""]
+        paragraphs = rng.randint(2, 6)
+        lines += [_sentence(rng, rng.randint(10, 30)) for _ in range(paragraphs)]
+        lines += [
+            "",
+            "Use `api_get` tool with:",
+            '- service: "devops"',
+            f'- endpoint: "/services/{rng.randint(1, 6)}"',
+            "",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def build_corpus(directory: Path, size: int, seed: int = 0) -> list[str]:
+    """Write a synthetic skills corpus.
+
+    Args:
+        directory: Directory to write the documents to.
+        size: Number of documents.
+        seed: Random seed, so corpora are identical across runs.
+
+    Returns:
+        Relative paths of the documents.
+    """
+    rng = random.Random(seed)
+    paths = []
+    for index in range(size):
+        group = Path(f"group-{index // DOCS_PER_DIR:03d}")
+        relative = group / f"skill-{index:05d}.md"
+        (directory / group).mkdir(parents=True, exist_ok=True)
+        document = make_document(rng, index)
+        (directory / relative).write_text(document, encoding="utf-8")
+        paths.append(relative.as_posix())
+    return paths
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+_counting_opens = False
+_file_opens = 0
+
+
+def _audit_hook(event: str, args: tuple[Any, ...]) -> None:
+    """Count file opens while measuring."""
+    global _file_opens
+    if _counting_opens and event == "open":
+        _file_opens += 1
+
+
+sys.addaudithook(_audit_hook)
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def measure(
+    name: str,
+    corpus_size: int,
+    call: Callable[[int], Any],
+    calls: int,
+) -> dict[str, Any]:
+    """Measure latency, allocations and file opens of a function.
+
+    Args:
+        name: Name of the benchmarked function.
+        corpus_size: Number of documents in the corpus.
+        call: Function taking the call index (to vary its inputs).
+        calls: Number of calls to measure.
+
+    Returns:
+        Result dict with per-call statistics.
+    """
+    global _counting_opens, _file_opens
+
+    # Warm up (imports, caches in pathlib/yaml)
+    call(0)
+
+    # Latency, without tracemalloc overhead
+    timings = []
+    for i in range(calls):
+        start = time.perf_counter_ns()
+        call(i)
+        timings.append((time.perf_counter_ns() - start) / 1000)
+
+    # Allocations and file opens, on a separate pass
+    peaks = []
+    retained = 0
+    _file_opens = 0
+    _counting_opens = True
+    tracemalloc.start()
+    try:
+        for i in range(calls):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call(i)
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained += after - before
+    finally:
+        tracemalloc.stop()
+        _counting_opens = False
+
+    return {
+        "function": name,
+        "corpus_size": corpus_size,
+        "calls": calls,
+        "latency_us": {
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "p95": _percentile(timings, 0.95),
+            "mean": statistics.fmean(timings),
+        },
+        # Peak memory allocated during a call, and memory kept after it
+        "alloc_peak_bytes": {
+            "median": statistics.median(peaks),
+            "max": max(peaks),
+        },
+        "retained_bytes_per_call": retained / calls,
+        "file_opens_per_call": _file_opens / calls,
+    }
+
+
+def bench_corpus(size: int, calls: int, seed: int) -> list[dict[str, Any]]:
+    """Run all benchmarks against a corpus of the given size."""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-skills-") as tmp:
+        base = Path(tmp)
+        paths = build_corpus(base, size, seed)
+        rng = random.Random(seed)
+        sample = [rng.choice(paths) for _ in range(calls)]
+        contents = [(base / p).read_text(encoding="utf-8") for p in sample]
+
+        # Listing walks the whole corpus, so scale calls down with its size
+        list_calls = max(3, min(calls, 20_000 // size))
+        results.append(
+            measure(
+                "_list_documents",
+                size,
+                lambda i: _list_documents(base),
+                list_calls,
+            )
+        )
+        results.append(
+            measure(
+                "_parse_frontmatter",
+                size,
+                lambda i: _parse_frontmatter(contents[i % len(contents)]),
+                calls,
+            )
+        )
+        results.append(
+            measure(
+                "_read_document",
+                size,
+                lambda i: _read_document(base, sample[i % len(sample)], "skill"),
+                calls,
+            )
+        )
+        results.append(
+            measure(
+                "_safe_path",
+                size,
+                lambda i: _safe_path(base, sample[i % len(sample)]),
+                calls,
+            )
+        )
+    return results
+
+
+def bench_calculate(calls: int) -> dict[str, Any]:
+    """Benchmark the calculate tool function (no corpus involved)."""
+    return measure(
+        "calculate",
+        0,
+        lambda i: calculate.func(EXPRESSIONS[i % len(EXPRESSIONS)]),
+        calls,
+    )
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+
+def _git_commit() -> str | None:
+    """Get the current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """Compare two result files.
+
+    Args:
+        baseline: Previous results.
+        current: New results.
+        threshold: Allowed relative increase (e.g., 0.2 for 20%).
+
+    Returns:
+        Descriptions of the regressions found.
+    """
+    previous = {
+        (r["function"], r["corpus_size"]): r for r in baseline.get("results", [])
+    }
+    regressions = []
+    for result in current["results"]:
+        old = previous.get((result["function"], result["corpus_size"]))
+        if old is None:
+            continue
+        metrics = {
+            "median latency": (
+                old["latency_us"]["median"],
+                result["latency_us"]["median"],
+            ),
+            "peak allocation": (
+                old["alloc_peak_bytes"]["median"],
+                result["alloc_peak_bytes"]["median"],
+            ),
+            "file opens": (old["file_opens_per_call"], result["file_opens_per_call"]),
+        }
+        for metric, (before, after) in metrics.items():
+            if after > before * (1 + threshold) and after - before > 1e-9:
+                change = (after / before - 1) * 100 if before else float("inf")
+                regressions.append(
+                    f"{result['function']} ({result['corpus_size']} docs): "
+                    f"{metric} {before:.1f} → {after:.1f} (+{change:.0f}%)"
+                )
+    return regressions
+
+
+def print_report(results: list[dict[str, Any]]) -> None:
+    """Print a table with one row per function and corpus size."""
+    header = (
+        f"{'function':<20} {'docs':>6} {'calls':>6} {'median us':>10} "
+        f"{'p95 us':>10} {'peak B':>10} {'kept B':>8} {'opens':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['function']:<20} {r['corpus_size']:>6} {r['calls']:>6} "
+            f"{r['latency_us']['median']:>10.1f} {r['latency_us']['p95']:>10.1f} "
+            f"{r['alloc_peak_bytes']['median']:>10.0f} "
+            f"{r['retained_bytes_per_call']:>8.0f} "
+            f"{r['file_opens_per_call']:>7.1f}"
+        )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=DEFAULT_SIZES,
+        help="Corpus sizes (number of documents)",
+    )
+    parser.add_argument("--calls", type=int, default=200, help="Calls per function")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to compare")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.2,
+        help="Relative increase reported as a regression (default: 0.2)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Run the microbenchmarks from the command line."""
+    args = parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        results.extend(bench_corpus(size, args.calls, args.seed))
+    results.append(bench_calculate(args.calls))
+    print_report(results)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "calls": args.calls,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.compare}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
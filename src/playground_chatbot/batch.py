@@ -0,0 +1,309 @@
+"""Headless batch processing of queries.
+
+Runs a file of queries through the chatbot graph without an interface
+(e.g., nightly health reports from a set of canned questions):
+
+- The graph is built once and shared by all queries; each query runs in
+  its own conversation (thread), so answers don't depend on each other.
+- Queries run concurrently, at most `concurrency` at a time. They share
+  the process's caches: with api_cache (opt-in, `batch --api-cache`),
+  repeated API lookups across queries are served from the API cache.
+- Each result is written as a JSON line as soon as the query finishes, or
+  in input order with `ordered` (a result waits for the ones before it).
+
+Input is JSONL: one object per line with a 'query' (and optionally an
+'id' and any other fields, which are copied to the result), or just a
+JSON string. Each result has the query's id and index, the response (or
+the error), its latency, and the model and tool calls it made.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import HumanMessage
+
+from .loadtest import percentiles
+
+
+@dataclass
+class BatchQuery:
+    """One query of a batch."""
+
+    index: int
+    query: str
+    id: str
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+def load_batch(path: Path) -> list[BatchQuery]:
+    """Load the queries of a batch from a JSONL file.
+
+    Args:
+        path: Path to the input file.
+
+    Returns:
+        The queries, in file order (blank lines are skipped).
+
+    Raises:
+        ValueError: If a line isn't valid JSON or has no query.
+    """
+    queries: list[BatchQuery] = []
+    lines = path.read_text(encoding="utf-8").splitlines()
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"{path}:{number}: invalid JSON ({e})") from e
+        if isinstance(data, str):
+            data = {"query": data}
+        if not isinstance(data, dict) or not str(data.get("query", "")).strip():
+            raise ValueError(f"{path}:{number}: expected an object with a 'query'")
+        index = len(queries)
+        extra = {k: v for k, v in data.items() if k not in ("id", "query")}
+        queries.append(
+            BatchQuery(
+                index=index,
+                query=str(data["query"]),
+                id=str(data.get("id", index + 1)),
+                extra=extra,
+            )
+        )
+    return queries
+
+
+class CallStats(BaseCallbackHandler):
+    """Callback handler counting the model and tool calls of one query.
+
+    Agent tools (e.g., the supervisor's 'toolbox' tool) are counted as calls
+    but not as tool time, since they contain the specialist's own calls.
+    """
+
+    def __init__(self, agent_tools: set[str] | None = None) -> None:
+        """Initialize the counters.
+
+        Args:
+            agent_tools: Names of the tools that wrap whole agents.
+        """
+        self.agent_tools = agent_tools or set()
+        self.model_calls = 0
+        self.tools: Counter[str] = Counter()
+        self.tool_errors = 0
+        self.tool_seconds = 0.0
+        self._started: dict[UUID, float] = {}
+
+    def on_chat_model_start(
+        self, serialized: dict, messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Count a model call."""
+        self.model_calls += 1
+
+    def on_tool_start(
+        self, serialized: dict, input_str: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Count a tool call and start its clock."""
+        name = (serialized or {}).get("name") or kwargs.get("name") or "unknown"
+        self.tools[name] += 1
+        if name not in self.agent_tools:
+            self._started[run_id] = time.perf_counter()
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Add the time of a finished tool call."""
+        self._stop(run_id)
+
+    def on_tool_error(
+        self, error: BaseException, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Count a failed tool call."""
+        self.tool_errors += 1
+        self._stop(run_id)
+
+    def _stop(self, run_id: UUID) -> None:
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            self.tool_seconds += time.perf_counter() - started
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one query of a batch."""
+
+    index: int
+    id: str
+    query: str
+    response: str | None = None
+    error: str | None = None
+    latency_s: float = 0.0
+    model_calls: int = 0
+    tools: dict[str, int] = field(default_factory=dict)
+    tool_errors: int = 0
+    tool_s: float = 0.0
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the result as a JSON-serializable dict (one output line)."""
+        data = {
+            "index": self.index,
+            "id": self.id,
+            "query": self.query,
+            "response": self.response,
+            "error": self.error,
+            "latency_s": round(self.latency_s, 3),
+            "model_calls": self.model_calls,
+            "tool_calls": sum(self.tools.values()),
+            "tools": self.tools,
+            "tool_errors": self.tool_errors,
+            "tool_s": round(self.tool_s, 3),
+        }
+        # Input fields (e.g., tags) are passed through, without overriding
+        return {**self.extra, **data}
+
+
+@dataclass
+class BatchReport:
+    """Aggregated results of a batch."""
+
+    duration: float
+    results: list[BatchResult] = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize completions, errors, throughput and latency.
+
+        Returns:
+            Dict with queries, completed, errors (by type), throughput
+            (completed per second), latency percentiles and tool calls.
+        """
+        completed = [r for r in self.results if r.error is None]
+        errors = Counter(
+            r.error.split(":", 1)[0] for r in self.results if r.error is not None
+        )
+        tools: Counter[str] = Counter()
+        for result in self.results:
+            tools.update(result.tools)
+        return {
+            "duration_s": self.duration,
+            "queries": len(self.results),
+            "completed": len(completed),
+            "errors": dict(errors),
+            "throughput_qps": len(completed) / self.duration if self.duration else 0.0,
+            "latency_s": percentiles([r.latency_s for r in completed]),
+            "tool_calls": dict(tools.most_common()),
+        }
+
+
+async def run_query(
+    graph: Any,
+    query: BatchQuery,
+    timeout: float | None = None,
+    agent_tools: set[str] | None = None,
+) -> BatchResult:
+    """Run one query through the graph, in its own conversation.
+
+    Args:
+        graph: The chatbot graph.
+        query: The query.
+        timeout: Seconds before the query is cancelled (None for no limit).
+        agent_tools: Names of the tools that wrap whole agents.
+
+    Returns:
+        The result (with the error instead of a response if it failed).
+    """
+    stats = CallStats(agent_tools)
+    run_config = {
+        "callbacks": [stats],
+        "configurable": {"thread_id": f"batch-{uuid.uuid4().hex[:12]}"},
+    }
+    result = BatchResult(
+        index=query.index, id=query.id, query=query.query, extra=query.extra
+    )
+    start = time.perf_counter()
+    try:
+        state = await asyncio.wait_for(
+            graph.ainvoke(
+                {"messages": [HumanMessage(content=query.query)]}, run_config
+            ),
+            timeout,
+        )
+        messages = state.get("messages") if isinstance(state, dict) else None
+        result.response = str(messages[-1].content) if messages else str(state)
+    except TimeoutError:
+        result.error = f"timeout: no answer within {timeout:g}s"
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    result.latency_s = time.perf_counter() - start
+    result.model_calls = stats.model_calls
+    result.tools = dict(stats.tools)
+    result.tool_errors = stats.tool_errors
+    result.tool_s = stats.tool_seconds
+    return result
+
+
+async def run_batch(
+    graph: Any,
+    queries: list[BatchQuery],
+    output: IO[str],
+    concurrency: int = 4,
+    ordered: bool = False,
+    timeout: float | None = None,
+    agent_tools: set[str] | None = None,
+) -> BatchReport:
+    """Run a batch of queries, writing each result as a JSON line.
+
+    Args:
+        graph: The chatbot graph (built once, shared by all queries).
+        queries: The queries.
+        output: Where the results are written (flushed after each line).
+        concurrency: Maximum queries running at once.
+        ordered: Whether to write the results in input order.
+        timeout: Per-query timeout in seconds (None for no limit).
+        agent_tools: Names of the tools that wrap whole agents.
+
+    Returns:
+        The report with all results, in input order.
+    """
+    pending: asyncio.Queue[BatchQuery] = asyncio.Queue()
+    for query in queries:
+        pending.put_nowait(query)
+    finished: dict[int, BatchResult] = {}
+    next_index = 0
+
+    def write(result: BatchResult) -> None:
+        output.write(json.dumps(result.as_dict(), ensure_ascii=False) + "\n")
+        output.flush()
+
+    def emit(result: BatchResult) -> None:
+        nonlocal next_index
+        finished[result.index] = result
+        if not ordered:
+            write(result)
+            return
+        # Write every result whose predecessors are all written
+        while next_index in finished:
+            write(finished[next_index])
+            next_index += 1
+
+    async def worker() -> None:
+        while True:
+            try:
+                query = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            emit(await run_query(graph, query, timeout, agent_tools))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    duration = time.perf_counter() - start
+    return BatchReport(
+        duration=duration, results=[finished[i] for i in sorted(finished)]
+    )
@@ -47,6 +47,8 @@ def _show_welcome() -> None:
 
     commands_table.add_row("chat", "Start interactive CLI chat")
     commands_table.add_row("web", "Start web interface")
+    commands_table.add_row("loadtest", "Load test a running web interface")
+    commands_table.add_row("batch", "Answer a file of queries headlessly")
     commands_table.add_row("agents", "List registered agents")
     commands_table.add_row("info", "Show configuration")
 
@@ -167,9 +169,52 @@ def info() -> None:
     )
 
 
+def _show_profile() -> None:
+    """Show a summary of the timing spans recorded in this session."""
+    from .telemetry import profile_summary
+
+    rows = profile_summary()
+    if not rows:
+        console.print("\n[dim]No tool or model calls were profiled.[/]\n")
+        return
+
+    table = Table(title="Profile", title_style="bold cyan", border_style="dim")
+    table.add_column("Kind", style="dim")
+    table.add_column("Name", style="green")
+    table.add_column("Calls", justify="right")
+    table.add_column("Total", justify="right")
+    table.add_column("Mean", justify="right")
+    table.add_column("p95", justify="right")
+    table.add_column("Max", justify="right")
+    table.add_column("Errors", justify="right")
+    table.add_column("Avg size", justify="right")
+
+    for row in rows:
+        size = row["mean_bytes"]
+        table.add_row(
+            row["kind"],
+            row["name"],
+            str(row["count"]),
+            f"{row['total_s']:.3f}s",
+            f"{row['mean_s'] * 1000:.1f}ms",
+            f"≤{row['p95_s'] * 1000:.1f}ms",
+            f"{row['max_s'] * 1000:.1f}ms",
+            f"[red]{row['errors']}[/]" if row["errors"] else "0",
+            f"{size / 1024:.1f} KB" if size is not None else "-",
+        )
+    console.print()
+    console.print(table)
+    console.print()
+
+
 @cli.command()
 @click.option("--debug", "-d", is_flag=True, help="Enable debug mode (show prompts)")
-def chat(debug: bool) -> None:
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Show time spent per tool and model call when the chat ends",
+)
+def chat(debug: bool, profile: bool) -> None:
     """Start interactive chat with the chatbot."""
     # Lazy import heavy dependencies
     from macsdk.core import ConfigurationError, create_chatbot_graph, create_config
@@ -189,10 +234,14 @@ def chat(debug: bool) -> None:
             console.print("[yellow]🔍 Debug mode enabled[/]\n")
 
         graph = create_chatbot_graph(agents.register_all_agents, debug=debug_enabled)
-        run_cli_chatbot(
-            graph=graph,
-            title="Playground Chatbot",
-        )
+        try:
+            run_cli_chatbot(
+                graph=graph,
+                title="Playground Chatbot",
+            )
+        finally:
+            if profile:
+                _show_profile()
     except ConfigurationError as e:
         error_console.print(f"[red]✗ Configuration Error:[/] {e}")
         sys.exit(1)
@@ -202,17 +251,84 @@ def chat(debug: bool) -> None:
 @click.option("--host", "-h", default="0.0.0.0", help="Host to bind to")
 @click.option("--port", "-p", default=8000, help="Port to bind to")
 @click.option("--debug", "-d", is_flag=True, help="Enable debug mode (show prompts)")
-def web(host: str, port: int, debug: bool) -> None:
+@click.option(
+    "--metrics-port",
+    type=int,
+    default=None,
+    help="Port for the Prometheus /metrics endpoint (default: from config, 9464)",
+)
+@click.option(
+    "--fake-model",
+    is_flag=True,
+    help="Run offline: scripted model and local mock DevOps API (for load tests)",
+)
+@click.option(
+    "--fake-latency",
+    type=float,
+    default=0.0,
+    help="Seconds per fake model call (with --fake-model)",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=None,
+    help="Worker processes (default: from config, 1)",
+)
+@click.option(
+    "--max-requests",
+    type=int,
+    default=None,
+    help="Recycle a worker after this many connections (0 = never)",
+)
+@click.option(
+    "--max-memory",
+    type=int,
+    default=None,
+    help="Recycle a worker over this resident memory in MB (0 = never)",
+)
+def web(
+    host: str,
+    port: int,
+    debug: bool,
+    metrics_port: int | None,
+    fake_model: bool,
+    fake_latency: float,
+    workers: int | None,
+    max_requests: int | None,
+    max_memory: int | None,
+) -> None:
     """Start the web interface.
 
     Launches a FastAPI server with WebSocket support for real-time chat.
     Open your browser at http://localhost:PORT after starting.
+    Tool and model call metrics are served at http://localhost:METRICS_PORT/metrics.
+
+    With --workers N, N pre-forked processes serve the sessions and share
+    the API and answer caches; worker i serves its metrics on METRICS_PORT+i.
     """
     # Lazy import heavy dependencies
     from macsdk.core import ConfigurationError, create_chatbot_graph, create_config
     from macsdk.interfaces import run_web_server
 
     from . import agents
+    from .config import config as local_config
+
+    offline_model = None
+    if fake_model:
+        from .offline import (
+            QUERIES_FILE,
+            MockDevOpsAPI,
+            ScriptedChatModel,
+            install_offline,
+            load_scripts,
+        )
+
+        api = MockDevOpsAPI().start()
+        offline_model = ScriptedChatModel(
+            scripts=load_scripts(QUERIES_FILE), latency=fake_latency
+        )
+        install_offline(offline_model, api.base_url)
 
     try:
         _config = create_config(search_path=Path.cwd())
@@ -225,11 +341,28 @@ def web(host: str, port: int, debug: bool) -> None:
         static_path = Path.cwd() / "static"
         static_dir: Path | None = static_path if static_path.exists() else None
 
+        workers = workers or local_config.web_workers
+        metrics_port = metrics_port or local_config.metrics_port
+
+        # Metrics are served next to the web server, on their own port
+        metrics_msg = ""
+        if local_config.telemetry:
+            last_port = f"-{metrics_port + workers - 1}" if workers > 1 else ""
+            metrics_msg = (
+                f"[dim]Metrics at[/] "
+                f"[cyan]http://{host}:{metrics_port}{last_port}/metrics[/]\n"
+            )
+
         console.print()
         debug_msg = " [yellow](debug mode)[/]" if debug_enabled else ""
+        if fake_model:
+            debug_msg += " [yellow](offline: fake model)[/]"
+        if workers > 1:
+            debug_msg += f" [yellow]({workers} workers)[/]"
         console.print(
             Panel(
                 f"[dim]Starting server at[/] [cyan]http://{host}:{port}[/]{debug_msg}\n"
+                f"{metrics_msg}"
                 "[dim]Press[/] [white]Ctrl+C[/] [dim]to stop[/]",
                 title="[bold cyan]🌐 Web Interface[/]",
                 border_style="cyan",
@@ -237,17 +370,409 @@ def web(host: str, port: int, debug: bool) -> None:
         )
         console.print()
 
+        def serve(
+            serve_host: str,
+            serve_port: int,
+            worker_metrics_port: int,
+            refresh: bool = True,
+        ) -> None:
+            if local_config.telemetry:
+                from .workers import start_metrics
+
+                start_metrics(local_config.metrics_host, worker_metrics_port)
+            if refresh and local_config.api_refresh and local_config.api_cache:
+                from .local_agents.toolbox.refresher import refresher
+
+                refresher.start()
+            graph = create_chatbot_graph(
+                agents.register_all_agents, debug=debug_enabled
+            )
+            if offline_model is not None:
+                # Also replace the model factories imported while building it
+                install_offline(offline_model, api.base_url)
+            run_web_server(
+                graph=graph,
+                title="Playground Chatbot",
+                static_dir=static_dir,
+                host=serve_host,
+                port=serve_port,
+            )
+
+        if workers <= 1:
+            serve(host, port, metrics_port)
+            return
+
+        import tempfile
+
+        from .local_agents.toolbox.cache import share_caches
+        from .workers import WorkerPool, preload
+
+        if max_requests is None:
+            max_requests = local_config.worker_max_requests
+        if max_memory is None:
+            max_memory = local_config.worker_max_memory_mb
+
+        with tempfile.TemporaryDirectory(prefix="playground-chatbot-") as tmp:
+            if not local_config.shared_cache_path:
+                share_caches(Path(tmp) / "cache.sqlite")
+            preload()
+            WorkerPool(
+                # Workers serve on localhost; the pool balances the public port
+                # Only the first worker refreshes the (shared) API cache
+                target=lambda slot, worker_port: serve(
+                    "127.0.0.1", worker_port, metrics_port + slot, refresh=slot == 0
+                ),
+                workers=workers,
+                host=host,
+                port=port,
+                max_requests=max_requests,
+                max_memory_mb=max_memory,
+            ).run()
+    except ConfigurationError as e:
+        error_console.print(f"[red]✗ Configuration Error:[/] {e}")
+        sys.exit(1)
+
+
+def _free_port() -> int:
+    """Find a free local TCP port."""
+    import socket
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _wait_for_port(port: int, timeout: float) -> bool:
+    """Wait until a local TCP port accepts connections."""
+    import socket
+    import time
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+def _show_load_test_report(summary: dict) -> None:
+    """Show the results of a load test."""
+    table = Table(title="Load Test", title_style="bold cyan", border_style="dim")
+    table.add_column("Metric", style="green")
+    for column in ("p50", "p95", "p99", "mean", "max"):
+        table.add_column(column, justify="right")
+    for label, key in (("Latency", "latency_s"), ("Time to first token", "ttft_s")):
+        stats = summary[key]
+        table.add_row(label, *(f"{stats[c] * 1000:.0f}ms" for c in stats))
+
+    console.print()
+    console.print(table)
+    errors = ", ".join(f"{k}: {v}" for k, v in summary["errors"].items()) or "none"
+    throughput = summary["throughput_rps"]
+    console.print(
+        f"\n[bold]{summary['completed']}[/]/{summary['requests']} completed in "
+        f"{summary['duration_s']:.1f}s → [bold]{throughput:.2f}[/] req/s, "
+        f"error rate [bold]{summary['error_rate']:.1%}[/] ({errors})\n"
+    )
+
+
+@cli.command()
+@click.option(
+    "--url",
+    default="ws://localhost:8000/ws",
+    help="WebSocket URL of a running web server",
+)
+@click.option("--sessions", "-c", default=10, help="Concurrent WebSocket sessions")
+@click.option("--duration", "-t", default=60.0, help="Test duration in seconds")
+@click.option("--requests", "-n", type=int, default=None, help="Maximum queries")
+@click.option(
+    "--rate",
+    "-r",
+    default=0.0,
+    help="Target queries per second (open loop); 0 for closed loop",
+)
+@click.option(
+    "--think-time",
+    default=0.0,
+    help="Pause between queries of a session (closed loop)",
+)
+@click.option("--timeout", default=120.0, help="Per-query timeout in seconds")
+@click.option(
+    "--queries",
+    "queries_file",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Query mix: text file (one per line) or YAML corpus",
+)
+@click.option(
+    "--fake-model",
+    is_flag=True,
+    help="Start a local offline server (fake model, mock API) and test it",
+)
+@click.option(
+    "--fake-latency",
+    default=0.2,
+    help="Seconds per fake model call (with --fake-model)",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the summary and per-query results as JSON",
+)
+def loadtest(
+    url: str,
+    sessions: int,
+    duration: float,
+    requests: int | None,
+    rate: float,
+    think_time: float,
+    timeout: float,
+    queries_file: Path | None,
+    fake_model: bool,
+    fake_latency: float,
+    output: Path | None,
+) -> None:
+    """Load test the web interface over WebSocket.
+
+    Opens concurrent sessions against a running `web` server, replays a
+    query mix in closed loop (or at a target rate with --rate), and
+    reports throughput, latency and time-to-first-token percentiles, and
+    error rates. Use --fake-model to run fully offline.
+    """
+    import asyncio
+    import json
+    import subprocess
+    from dataclasses import asdict
+
+    from .loadtest import load_queries, run_load_test
+    from .offline import QUERIES_FILE
+
+    queries = load_queries(queries_file or QUERIES_FILE)
+    if not queries:
+        error_console.print("[red]✗ No queries to replay[/]")
+        sys.exit(1)
+
+    server = None
+    if fake_model:
+        port = _free_port()
+        url = f"ws://127.0.0.1:{port}/ws"
+        server = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "playground_chatbot",
+                "web",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(port),
+                "--metrics-port",
+                str(_free_port()),
+                "--fake-model",
+                "--fake-latency",
+                str(fake_latency),
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        if not _wait_for_port(port, timeout=60):
+            server.terminate()
+            error_console.print("[red]✗ The offline web server didn't start[/]")
+            sys.exit(1)
+
+    mode = f"open loop at {rate:g} req/s" if rate > 0 else "closed loop"
+    console.print(
+        f"\n[dim]Load testing[/] [cyan]{url}[/] [dim]with {sessions} sessions, "
+        f"{mode}, for {duration:g}s ({len(queries)} queries in the mix)[/]"
+    )
+    try:
+        report = asyncio.run(
+            run_load_test(
+                url,
+                queries,
+                sessions=sessions,
+                duration=duration,
+                max_requests=requests,
+                rate=rate,
+                think_time=think_time,
+                timeout=timeout,
+            )
+        )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    summary = report.summary()
+    _show_load_test_report(summary)
+    if output:
+        data = {
+            "summary": summary,
+            "results": [asdict(r) for r in report.results],
+        }
+        output.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        console.print(f"[dim]Results written to {output}[/]\n")
+
+
+def _show_batch_report(summary: dict, out: Console) -> None:
+    """Show the results of a batch."""
+    latency = summary["latency_s"]
+    errors = ", ".join(f"{k}: {v}" for k, v in summary["errors"].items()) or "none"
+    tools = ", ".join(f"{k}: {v}" for k, v in summary["tool_calls"].items()) or "none"
+    out.print(
+        f"\n[bold]{summary['completed']}[/]/{summary['queries']} completed in "
+        f"{summary['duration_s']:.1f}s → [bold]{summary['throughput_qps']:.2f}[/] "
+        f"queries/s, latency p50 {latency['p50']:.1f}s, p95 {latency['p95']:.1f}s, "
+        f"max {latency['max']:.1f}s\n[dim]Errors: {errors}\nTool calls: {tools}[/]\n"
+    )
+
+
+@cli.command()
+@click.argument(
+    "input_file", type=click.Path(exists=True, dir_okay=False, path_type=Path)
+)
+@click.option(
+    "--concurrency", "-c", default=4, help="Queries processed at the same time"
+)
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Results file (JSONL, default: stdout)",
+)
+@click.option(
+    "--ordered",
+    is_flag=True,
+    help="Write the results in input order (default: as they finish)",
+)
+@click.option(
+    "--timeout", type=float, default=300.0, help="Per-query timeout in seconds"
+)
+@click.option(
+    "--api-cache",
+    is_flag=True,
+    help="Cache API results across queries (overrides api_cache in config.yml)",
+)
+@click.option("--debug", "-d", is_flag=True, help="Enable debug mode (show prompts)")
+@click.option(
+    "--fake-model",
+    is_flag=True,
+    help="Run offline: scripted model and local mock DevOps API",
+)
+@click.option(
+    "--fake-latency",
+    type=float,
+    default=0.0,
+    help="Seconds per fake model call (with --fake-model)",
+)
+def batch(
+    input_file: Path,
+    concurrency: int,
+    output: Path | None,
+    ordered: bool,
+    timeout: float,
+    api_cache: bool,
+    debug: bool,
+    fake_model: bool,
+    fake_latency: float,
+) -> None:
+    """Answer a file of queries without an interface.
+
+    INPUT_FILE is JSONL: one {"query": ..., "id": ...} object (or a JSON
+    string) per line. The graph is built once, queries run concurrently,
+    and each result is written as a JSON line with its latency and tool
+    calls as soon as it finishes. With --api-cache (or api_cache in
+    config.yml), repeated API lookups across queries are served from the
+    API cache.
+    """
+    # Lazy import heavy dependencies
+    import asyncio
+
+    from macsdk.core import ConfigurationError, create_chatbot_graph, create_config
+
+    from . import agents
+    from .batch import load_batch, run_batch
+    from .config import config as local_config
+
+    if api_cache:
+        local_config.api_cache = True
+
+    # Keep stdout for the results when they're written there
+    out = console if output else error_console
+    try:
+        queries = load_batch(input_file)
+    except ValueError as e:
+        error_console.print(f"[red]✗ {e}[/]")
+        sys.exit(1)
+    if not queries:
+        error_console.print("[red]✗ No queries in the input file[/]")
+        sys.exit(1)
+
+    api = None
+    offline_model = None
+    if fake_model:
+        from .offline import (
+            QUERIES_FILE,
+            MockDevOpsAPI,
+            ScriptedChatModel,
+            install_offline,
+            load_scripts,
+        )
+
+        api = MockDevOpsAPI().start()
+        offline_model = ScriptedChatModel(
+            scripts=load_scripts(QUERIES_FILE), latency=fake_latency
+        )
+        install_offline(offline_model, api.base_url)
+
+    try:
+        _config = create_config(search_path=Path.cwd())
+        _config.validate_api_key()
+        debug_enabled = debug or _config.debug
+
         graph = create_chatbot_graph(agents.register_all_agents, debug=debug_enabled)
-        run_web_server(
-            graph=graph,
-            title="Playground Chatbot",
-            static_dir=static_dir,
-            host=host,
-            port=port,
+        if offline_model is not None and api is not None:
+            # Also replace the model factories imported while building it
+            install_offline(offline_model, api.base_url)
+
+        order = "in input order" if ordered else "as they finish"
+        out.print(
+            f"\n[dim]Processing {len(queries)} queries from[/] [cyan]{input_file}[/] "
+            f"[dim]with concurrency {concurrency}, writing results {order}[/]"
         )
+        stream = output.open("w", encoding="utf-8") if output else sys.stdout
+        try:
+            report = asyncio.run(
+                run_batch(
+                    graph,
+                    queries,
+                    stream,
+                    concurrency=concurrency,
+                    ordered=ordered,
+                    timeout=timeout or None,
+                    agent_tools={a["name"] for a in agents.get_registered_agents()},
+                )
+            )
+        finally:
+            if output:
+                stream.close()
     except ConfigurationError as e:
         error_console.print(f"[red]✗ Configuration Error:[/] {e}")
         sys.exit(1)
+    finally:
+        if api is not None:
+            api.stop()
+
+    summary = report.summary()
+    _show_batch_report(summary, out)
+    if output:
+        out.print(f"[dim]Results written to {output}[/]\n")
+    if summary["completed"] < summary["queries"]:
+        sys.exit(1)
 
 
 def main() -> None:
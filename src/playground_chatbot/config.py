@@ -6,6 +6,7 @@ Extend MACSDKConfig to add your own settings.
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Literal
 
 from pydantic_settings import SettingsConfigDict
 
@@ -51,6 +52,116 @@ class PlaygroundChatbotConfig(MACSDKConfig):
     # Facts directory (relative to project root or absolute path)
     facts_dir: str | None = None
 
+    # Tool-result compaction (keeps large api_get payloads out of the context)
+    tool_result_compaction: bool = True
+    tool_result_max_tokens: int = 2000
+    tool_result_array_sample: int = 3
+    # Field allowlists per endpoint pattern (e.g., {"/services": ["id", "status"]})
+    tool_result_fields: dict[str, list[str]] = {}
+    # API services whose results are sent as compact tables (uniform lists
+    # as a header plus tab-separated rows), e.g. ["devops"]
+    tool_result_tables: list[str] = []
+
+    # Session-scoped memoization of list_skills/list_facts/read_skill/read_fact
+    session_memo: bool = True
+    session_memo_max_sessions: int = 128
+
+    # Bounds of per-session memory (memoized results and the full payloads
+    # of compacted results): idle eviction, byte cap, and summary size of
+    # compacted payloads. With summarization_enabled, only the latest
+    # summarization_keep_messages outputs of a session are kept in full.
+    session_idle_ttl: float = 1800.0
+    session_max_bytes: int = 1_000_000
+    session_summary_tokens: int = 200
+
+    # API result cache (per-endpoint TTLs in seconds, e.g., {"/alerts": 15}).
+    # Opt-in: cached results may be up to a TTL old
+    api_cache: bool = False
+    api_cache_ttl: float = 30.0
+    api_cache_ttls: dict[str, float] = {}
+    api_cache_max_entries: int = 1024
+
+    # Answer cache for repeated questions (invalidated when the data changes).
+    # Opt-in, requires api_cache
+    answer_cache: bool = False
+    answer_cache_ttl: float = 300.0
+    answer_cache_max_entries: int = 256
+
+    # Fast-path recipes declared in skill frontmatter (executed without the LLM)
+    skill_recipes: bool = True
+
+    # Background refresh of hot API endpoints while `web` runs (requires
+    # api_cache): polled every interval (+/- jitter fraction), served while
+    # younger than max_age, with exponential backoff after errors
+    api_refresh: bool = False
+    api_refresh_endpoints: list[str] = ["/services", "/alerts"]
+    api_refresh_interval: float = 15.0
+    api_refresh_jitter: float = 0.2
+    api_refresh_max_age: float = 60.0
+    api_refresh_max_backoff: float = 300.0
+
+    # Limits for upstream API services: token bucket (calls/s and burst),
+    # concurrent calls, seconds a call waits for them, and a circuit breaker
+    # (consecutive failures to open it, seconds it stays open). 0 disables a
+    # limit. api_limits overrides them per service, e.g. {"devops": {"rate": 5}}
+    api_rate_limit: float = 10.0
+    api_rate_burst: int = 20
+    api_max_in_flight: int = 8
+    api_limit_max_wait: float = 2.0
+    api_breaker_failures: int = 5
+    api_breaker_reset: float = 30.0
+    api_limits: dict[str, dict[str, float]] = {}
+
+    # Speculative prefetch of the api_get calls referenced by a skill when read
+    prefetch: bool = True
+    prefetch_max_calls: int = 5
+    prefetch_ttl: float = 20.0
+
+    # Token accounting per prompt source, and an optional per-query budget
+    # (prompt tokens summed over all model calls of a toolbox request)
+    token_accounting: bool = True
+    token_budget: int | None = None
+
+    # Per-request deadline of the toolbox agent, in seconds (None = none).
+    # The last answer_reserve seconds are kept for the model to answer;
+    # past the deadline, a partial answer is returned
+    toolbox_deadline: float | None = 120.0
+    toolbox_answer_reserve: float = 10.0
+
+    # Have the toolbox agent answer in plain text when the supervisor calls
+    # it as a tool, skipping the structured-output step (run() callers can
+    # still ask for the structured response)
+    toolbox_plain_text: bool = False
+
+    # Stream toolbox progress (tool calls, model steps, answer tokens)
+    # through the supervisor to the web/CLI interfaces
+    stream_progress: bool = True
+
+    # Model tiering: the toolbox's tool-calling turns use a fast model
+    # (default: classifier_model), the final answer uses llm_model
+    model_tiering: bool = False
+    fast_model: str | None = None
+
+    # Record/replay cache of toolbox model responses:
+    # passthrough (off), record (replay hits, record misses), replay (hits only)
+    llm_cache_mode: Literal["passthrough", "record", "replay"] = "passthrough"
+    llm_cache_dir: str = ".llm_cache"
+
+    # Timing spans for tool and model calls, exported on /metrics by `web`
+    telemetry: bool = True
+    metrics_host: str = "0.0.0.0"
+    metrics_port: int = 9464
+
+    # Pre-forked `web` workers, recycled after a number of connections or
+    # over a resident memory limit (0 = never)
+    web_workers: int = 1
+    worker_max_requests: int = 0
+    worker_max_memory_mb: int = 0
+
+    # SQLite file for API and answer caches shared across processes
+    # (a temporary file is used by `web --workers` when not set)
+    shared_cache_path: str | None = None
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -100,5 +211,19 @@ class PlaygroundChatbotConfig(MACSDKConfig):
         # Default: facts/ in project root
         return _find_project_root() / "facts"
 
+    @property
+    def llm_cache_path(self) -> Path:
+        """Get the resolved directory of recorded model responses.
+
+        Relative paths are resolved from the project root.
+
+        Returns:
+            Resolved Path to the LLM cache directory.
+        """
+        cache_path = Path(self.llm_cache_dir)
+        if not cache_path.is_absolute():
+            return _find_project_root() / cache_path
+        return cache_path
+
 
 config = PlaygroundChatbotConfig()
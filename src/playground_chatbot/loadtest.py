@@ -0,0 +1,284 @@
+"""Load testing for the web interface.
+
+Opens concurrent WebSocket sessions against a running `web` server and
+replays a query mix, using the same protocol as the web UI:
+
+- The client sends {"message": "..."}.
+- The server answers with events: 'user_message' (echo), 'progress',
+  'bot_response', and 'complete' or 'error' when the query is done.
+
+Two modes are supported:
+
+- Closed loop (default): every session sends its next query as soon as
+  the previous one completes (plus an optional think time).
+- Open loop (rate > 0): queries are issued at a fixed target rate and
+  taken by the first free session. Latency is measured from the scheduled
+  time, so queueing delay is included when the server can't keep up.
+
+Time to first token is measured until the first 'progress' or
+'bot_response' event.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+
+@dataclass
+class RequestResult:
+    """Outcome of one query."""
+
+    session: int
+    query: str
+    scheduled: float
+    first_token: float | None = None
+    finished: float | None = None
+    error: str | None = None
+
+    @property
+    def latency(self) -> float | None:
+        """End-to-end latency in seconds."""
+        return None if self.finished is None else self.finished - self.scheduled
+
+    @property
+    def ttft(self) -> float | None:
+        """Time to first token in seconds."""
+        return None if self.first_token is None else self.first_token - self.scheduled
+
+
+@dataclass
+class LoadTestReport:
+    """Aggregated results of a load test."""
+
+    duration: float
+    results: list[RequestResult] = field(default_factory=list)
+
+    @property
+    def completed(self) -> list[RequestResult]:
+        """Queries that completed without errors."""
+        return [r for r in self.results if r.error is None and r.finished]
+
+    def summary(self) -> dict[str, Any]:
+        """Summarize throughput, latency percentiles and errors.
+
+        Returns:
+            Dict with requests, completed, errors (by type), error_rate,
+            throughput (completed per second), and latency/ttft percentiles.
+        """
+        completed = self.completed
+        errors = Counter(r.error for r in self.results if r.error)
+        return {
+            "duration_s": self.duration,
+            "requests": len(self.results),
+            "completed": len(completed),
+            "errors": dict(errors),
+            "error_rate": (
+                sum(errors.values()) / len(self.results) if self.results else 0.0
+            ),
+            "throughput_rps": len(completed) / self.duration if self.duration else 0.0,
+            "latency_s": percentiles([r.latency for r in completed if r.latency]),
+            "ttft_s": percentiles([r.ttft for r in completed if r.ttft]),
+        }
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    """Compute p50/p95/p99 (nearest rank), mean and max.
+
+    Args:
+        values: The samples.
+
+    Returns:
+        Dict of statistics (all 0.0 if there are no samples).
+    """
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0, "max": 0.0}
+    ordered = sorted(values)
+
+    def rank(q: float) -> float:
+        return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+    return {
+        "p50": rank(0.50),
+        "p95": rank(0.95),
+        "p99": rank(0.99),
+        "mean": statistics.fmean(ordered),
+        "max": ordered[-1],
+    }
+
+
+def load_queries(path: Path) -> list[str]:
+    """Load a query mix.
+
+    Supports plain text (one query per line) and the YAML corpus format
+    used by the offline mode (a 'queries' list with 'query' keys).
+
+    Args:
+        path: Path to the query file.
+
+    Returns:
+        List of queries.
+    """
+    text = path.read_text(encoding="utf-8")
+    if path.suffix in (".yml", ".yaml"):
+        data = yaml.safe_load(text) or {}
+        return [str(q["query"]) for q in data.get("queries", [])]
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+async def _ask(
+    ws: Any, session: int, query: str, scheduled: float, timeout: float
+) -> RequestResult:
+    """Send one query over an open WebSocket and wait for it to complete."""
+    result = RequestResult(session=session, query=query, scheduled=scheduled)
+    await ws.send(json.dumps({"message": query}))
+    deadline = time.perf_counter() + timeout
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            result.error = "timeout"
+            return result
+        try:
+            raw = await asyncio.wait_for(ws.recv(), timeout=remaining)
+        except TimeoutError:
+            result.error = "timeout"
+            return result
+        event = json.loads(raw)
+        kind = event.get("type")
+        now = time.perf_counter()
+        if kind in ("progress", "bot_response") and result.first_token is None:
+            result.first_token = now
+        if kind == "complete":
+            result.finished = now
+            return result
+        if kind == "error":
+            result.finished = now
+            result.error = "server_error"
+            return result
+
+
+async def _session(
+    url: str,
+    session: int,
+    next_query: Any,
+    results: list[RequestResult],
+    timeout: float,
+    think_time: float,
+) -> None:
+    """Run one WebSocket session until next_query() returns None."""
+    import websockets
+
+    ws = None
+    while True:
+        item = await next_query()
+        if item is None:
+            break
+        query, scheduled = item
+        try:
+            if ws is None:
+                ws = await websockets.connect(url, open_timeout=timeout)
+            result = await _ask(ws, session, query, scheduled, timeout)
+        except (OSError, websockets.WebSocketException) as e:
+            result = RequestResult(
+                session=session,
+                query=query,
+                scheduled=scheduled,
+                error=f"connection: {type(e).__name__}",
+            )
+            ws = None
+        if result.error == "timeout" and ws is not None:
+            # The late answer would be read as the next query's, reconnect
+            await ws.close()
+            ws = None
+        results.append(result)
+        if think_time:
+            await asyncio.sleep(think_time)
+    if ws is not None:
+        await ws.close()
+
+
+async def run_load_test(
+    url: str,
+    queries: list[str],
+    sessions: int = 10,
+    duration: float = 60.0,
+    max_requests: int | None = None,
+    rate: float = 0.0,
+    think_time: float = 0.0,
+    timeout: float = 120.0,
+    seed: int = 0,
+) -> LoadTestReport:
+    """Replay a query mix against a web server.
+
+    Args:
+        url: WebSocket URL of the server (e.g., ws://localhost:8000/ws).
+        queries: The query mix (sampled at random).
+        sessions: Number of concurrent WebSocket sessions.
+        duration: Test duration in seconds (no new queries after it).
+        max_requests: Optional maximum number of queries.
+        rate: Target queries per second (open loop), or 0 for closed loop.
+        think_time: Pause after each query per session (closed loop).
+        timeout: Per-query timeout in seconds.
+        seed: Random seed for the query mix.
+
+    Returns:
+        The load test report.
+    """
+    rng = random.Random(seed)
+    results: list[RequestResult] = []
+    start = time.perf_counter()
+    end = start + duration
+    issued = 0
+
+    def has_budget() -> bool:
+        return max_requests is None or issued < max_requests
+
+    if rate > 0:
+        # Open loop: a scheduler fills a queue at the target rate
+        queue: asyncio.Queue[tuple[str, float] | None] = asyncio.Queue()
+
+        async def schedule() -> None:
+            nonlocal issued
+            interval = 1.0 / rate
+            next_at = start
+            while next_at < end and has_budget():
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+                queue.put_nowait((rng.choice(queries), next_at))
+                issued += 1
+                next_at += interval
+            for _ in range(sessions):
+                queue.put_nowait(None)
+
+        async def next_query() -> tuple[str, float] | None:
+            return await queue.get()
+
+        scheduler = asyncio.create_task(schedule())
+    else:
+
+        async def next_query() -> tuple[str, float] | None:
+            nonlocal issued
+            if time.perf_counter() >= end or not has_budget():
+                return None
+            issued += 1
+            return rng.choice(queries), time.perf_counter()
+
+        scheduler = None
+
+    await asyncio.gather(
+        *(
+            _session(url, i, next_query, results, timeout, think_time)
+            for i in range(sessions)
+        )
+    )
+    if scheduler is not None:
+        await scheduler
+    return LoadTestReport(duration=time.perf_counter() - start, results=results)
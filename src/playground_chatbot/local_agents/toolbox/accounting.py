@@ -0,0 +1,207 @@
+"""Per-request token accounting for toolbox.
+
+Every model call re-sends the whole prompt, so the tokens a query costs
+are the sum of the prompts of all its model calls. Each prompt is split by
+source so it's clear where the tokens go:
+
+- system_prompt: the toolbox SYSTEM_PROMPT
+- todo_prompt: the TODO_PLANNING_SPECIALIST_PROMPT (when planning is enabled)
+- system_other: anything else in the system message (e.g., date context)
+- tool_schemas: the tool definitions sent with every call
+- skills / facts: list_skills/read_skill and list_facts/read_fact results
+- api: api_get, fetch_file and get_full_result results
+- tools: other tool results (e.g., calculate)
+- user / assistant: the query and the model's own messages
+
+Tokens are estimated (see compaction.estimate_tokens), which is enough to
+compare sources and to enforce a budget.
+"""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage, ToolMessage
+
+from playground_chatbot.telemetry import registry
+
+from .compaction import estimate_tokens
+from .prompts import SYSTEM_PROMPT, TODO_PLANNING_SPECIALIST_PROMPT
+
+# Source of each tool's results
+TOOL_SOURCES = {
+    "list_skills": "skills",
+    "read_skill": "skills",
+    "list_facts": "facts",
+    "read_fact": "facts",
+    "lookup_service": "facts",
+    "api_get": "api",
+    "fetch_file": "api",
+    "get_full_result": "api",
+    "impact_analysis": "api",
+}
+
+# Buckets for the tokens of a whole request
+TOKEN_BUCKETS = (1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+prompt_tokens = registry.counter(
+    "playground_prompt_tokens_total",
+    "Estimated prompt tokens sent to the model, by source.",
+)
+request_tokens = registry.histogram(
+    "playground_request_prompt_tokens",
+    "Estimated prompt tokens sent to the model per toolbox request.",
+    buckets=TOKEN_BUCKETS,
+)
+budget_exceeded = registry.counter(
+    "playground_token_budget_exceeded_total",
+    "Toolbox requests that exceeded their token budget.",
+)
+
+
+@dataclass
+class TokenUsage:
+    """Token usage of one request, accumulated over its model calls."""
+
+    by_source: Counter[str] = field(default_factory=Counter)
+    model_calls: int = 0
+    peak_context: int = 0
+    budget: int | None = None
+
+    @property
+    def total(self) -> int:
+        """Total prompt tokens of the request."""
+        return sum(self.by_source.values())
+
+    @property
+    def exceeded(self) -> bool:
+        """Whether the request is over its token budget."""
+        return self.budget is not None and self.total > self.budget
+
+    def add(self, breakdown: Counter[str]) -> None:
+        """Add the prompt breakdown of one model call."""
+        was_exceeded = self.exceeded
+        self.by_source.update(breakdown)
+        self.model_calls += 1
+        self.peak_context = max(self.peak_context, sum(breakdown.values()))
+        for source, tokens in breakdown.items():
+            prompt_tokens.inc(tokens, source=source)
+        if self.exceeded and not was_exceeded:
+            budget_exceeded.inc()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Get the usage as a plain dict (e.g., for responses and logs)."""
+        return {
+            "total": self.total,
+            "model_calls": self.model_calls,
+            "peak_context": self.peak_context,
+            "budget": self.budget,
+            "by_source": dict(self.by_source.most_common()),
+        }
+
+
+# Usage of the request being processed (set by run_toolbox)
+current_usage: ContextVar[TokenUsage | None] = ContextVar(
+    "toolbox_current_usage", default=None
+)
+
+
+def _text(message: BaseMessage) -> str:
+    """Get the text of a message, including its tool calls."""
+    content = message.content
+    text = content if isinstance(content, str) else str(content)
+    if isinstance(message, AIMessage) and message.tool_calls:
+        text += json.dumps(message.tool_calls, default=str)
+    return text
+
+
+def _tool_schema_text(tool: Any) -> str:
+    """Get the text of a tool definition as sent to the model."""
+    if isinstance(tool, dict):
+        return json.dumps(tool, default=str)
+    args = getattr(tool, "args", {})
+    return f"{tool.name} {tool.description} {json.dumps(args, default=str)}"
+
+
+def attribute_system(text: str) -> Counter[str]:
+    """Split a system message into the known prompts and the rest.
+
+    Args:
+        text: The system message text.
+
+    Returns:
+        Tokens per source.
+    """
+    breakdown: Counter[str] = Counter()
+    rest = text
+    for source, prompt in (
+        ("todo_prompt", TODO_PLANNING_SPECIALIST_PROMPT),
+        ("system_prompt", SYSTEM_PROMPT),
+    ):
+        if prompt and prompt in rest:
+            breakdown[source] += estimate_tokens(prompt)
+            rest = rest.replace(prompt, "", 1)
+    if rest.strip():
+        breakdown["system_other"] += estimate_tokens(rest)
+    return breakdown
+
+
+def attribute_prompt(
+    system_message: SystemMessage | None,
+    messages: list[BaseMessage],
+    tools: list[Any],
+) -> Counter[str]:
+    """Attribute the tokens of a model prompt to their sources.
+
+    Args:
+        system_message: The system message, if passed separately.
+        messages: The conversation messages.
+        tools: The tools bound to the model call.
+
+    Returns:
+        Tokens per source.
+    """
+    breakdown: Counter[str] = Counter()
+    if system_message is not None:
+        breakdown.update(attribute_system(_text(system_message)))
+    for message in messages:
+        text = _text(message)
+        if isinstance(message, SystemMessage):
+            breakdown.update(attribute_system(text))
+        elif isinstance(message, ToolMessage):
+            source = TOOL_SOURCES.get(message.name or "", "tools")
+            breakdown[source] += estimate_tokens(text)
+        elif isinstance(message, AIMessage):
+            breakdown["assistant"] += estimate_tokens(text)
+        else:
+            breakdown["user"] += estimate_tokens(text)
+    tool_text = "".join(_tool_schema_text(t) for t in tools)
+    if tool_text:
+        breakdown["tool_schemas"] += estimate_tokens(tool_text)
+    return breakdown
+
+
+def format_usage(usage: TokenUsage) -> str:
+    """Format a token usage summary for debug output.
+
+    Args:
+        usage: The usage to format.
+
+    Returns:
+        A one-line-per-source summary.
+    """
+    total = usage.total or 1
+    budget = f" / budget {usage.budget:,}" if usage.budget else ""
+    lines = [
+        (
+            f"Tokens: {usage.total:,}{budget} over {usage.model_calls} model "
+            f"call(s), peak context {usage.peak_context:,}"
+        )
+    ]
+    for source, tokens in usage.by_source.most_common():
+        lines.append(f"  {source:<14} {tokens:>8,}  {tokens / total:>5.1%}")
+    return "\n".join(lines)
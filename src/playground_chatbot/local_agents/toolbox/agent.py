@@ -9,10 +9,13 @@ the API schema described in the system prompt.
 
 from __future__ import annotations
 
+import asyncio
+import logging
 from typing import TYPE_CHECKING, Annotated, Any
 
 from langchain.agents import create_agent
 from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import merge_configs
 from langchain_core.tools import InjectedToolArg, tool
 
 from macsdk.core import config, get_answer_model, run_agent_with_tools
@@ -22,13 +25,40 @@ from macsdk.middleware import (
     TodoListMiddleware,
 )
 
+from playground_chatbot.config import config as local_config
+from playground_chatbot.telemetry import span
+
+from .accounting import TokenUsage, current_usage, format_usage, request_tokens
+from .cache import RunDependencies, answer_cache, current_dependencies
+from .deadline import Deadline, current_deadline, deadline_events, partial_response
+from .middleware import (
+    ApiCacheMiddleware,
+    ApiLimitsMiddleware,
+    DeadlineMiddleware,
+    LLMCacheMiddleware,
+    ModelTieringMiddleware,
+    ProgressMiddleware,
+    SessionMemoMiddleware,
+    SkillPrefetchMiddleware,
+    TelemetryMiddleware,
+    TokenAccountingMiddleware,
+    ToolCallLogMiddleware,
+    ToolResultCompactionMiddleware,
+)
 from .models import AgentResponse
+from .prefetch import prefetcher
+from .progress import AnswerStreamHandler, ProgressReporter, current_reporter
 from .prompts import SYSTEM_PROMPT, TODO_PLANNING_SPECIALIST_PROMPT
+from .recipes import RecipeError, match_recipe, run_recipe
+from .tiering import fast_variant
+from .tool_calls import ToolCallLog, current_tool_calls
 from .tools import get_tools
 
 if TYPE_CHECKING:
     from langchain_core.tools import BaseTool
 
+logger = logging.getLogger(__name__)
+
 
 CAPABILITIES = """DevOps monitoring assistant using generic SDK tools.
 
@@ -45,6 +75,7 @@ Uses api_get and fetch_file tools with API schema in the prompt."""
 def create_toolbox(
     debug: bool | None = None,
     enable_todo: bool | None = None,
+    structured: bool = True,
 ) -> tuple[Any, str]:
     """Create the toolbox agent.
 
@@ -53,6 +84,8 @@ def create_toolbox(
             If None, uses the config value (default: False).
         enable_todo: Whether to enable task planning middleware.
             If None, uses the config value (default: True).
+        structured: Whether the agent answers with a structured response
+            (AgentResponse). Otherwise its last message is the answer.
 
     Returns:
         Tuple of (configured agent instance, system prompt with optional planning).
@@ -89,22 +122,162 @@ def create_toolbox(
     if todo_enabled:
         middleware.append(TodoListMiddleware(enabled=True))
 
+    # Add token accounting per source (and the per-query token budget)
+    if local_config.token_accounting:
+        middleware.append(
+            TokenAccountingMiddleware(
+                budget=local_config.token_budget, show=debug_enabled
+            )
+        )
+
+    # Add progress events (tool calls and model steps) for the supervisor
+    if local_config.stream_progress:
+        middleware.append(ProgressMiddleware())
+
+    # Add the per-request deadline (tool timeouts, skipped calls)
+    middleware.append(DeadlineMiddleware())
+
+    # Log the tool calls the run executed (for tools_used)
+    middleware.append(ToolCallLogMiddleware())
+
+    # Add speculative prefetch of the API calls referenced by read skills
+    # (outside the session memo, so memoized skill reads prefetch too)
+    if local_config.prefetch and local_config.api_cache:
+        middleware.append(SkillPrefetchMiddleware())
+
+    # Add session memo for repeated skill/fact discovery calls
+    if local_config.session_memo:
+        middleware.append(SessionMemoMiddleware())
+
+    # Add tool-result compaction to keep large payloads out of the history
+    if local_config.tool_result_compaction:
+        middleware.append(ToolResultCompactionMiddleware())
+
+    # Add API result caching (also tracks the data each answer depends on)
+    if local_config.api_cache or local_config.answer_cache:
+        middleware.append(ApiCacheMiddleware())
+
+    # Add the per-service rate, concurrency and circuit limits (after the cache)
+    middleware.append(ApiLimitsMiddleware())
+
+    # Add model tiering: a fast model for the tool-calling turns
+    model = get_answer_model()
+    if local_config.model_tiering:
+        fast_model = local_config.fast_model or getattr(
+            config, "classifier_model", None
+        )
+        middleware.append(ModelTieringMiddleware(fast_variant(model, fast_model)))
+
+    # Add the record/replay cache of model responses
+    if local_config.llm_cache_mode != "passthrough":
+        middleware.append(LLMCacheMiddleware())
+
+    # Add timing spans last, so they measure the tools and the model only
+    if local_config.telemetry:
+        middleware.append(TelemetryMiddleware())
+
     agent = create_agent(
-        model=get_answer_model(),
+        model=model,
         tools=tools,
         middleware=middleware,
-        response_format=AgentResponse,
+        response_format=AgentResponse if structured else None,
     )
 
     return agent, system_prompt
 
 
+async def _run_recipe(query: str) -> dict | None:
+    """Answer a query with a skill recipe, without LLM planning.
+
+    Args:
+        query: User query to process.
+
+    Returns:
+        Agent response dictionary, or None if no recipe applies (or it failed).
+    """
+    if not local_config.skill_recipes:
+        return None
+    matched = match_recipe(query)
+    if matched is None:
+        return None
+    recipe, groups = matched
+    with span("recipe", recipe.skill) as current:
+        try:
+            return await run_recipe(recipe, groups)
+        except RecipeError as e:
+            current.error = "recipe_error"
+            logger.warning("%s. Falling back to the agent.", e)
+            return None
+
+
+def _start_deadline(seconds: float | None) -> Deadline | None:
+    """Start the deadline of a request, within any enclosing request's.
+
+    Args:
+        seconds: Time budget of the request (None or 0 for no budget).
+
+    Returns:
+        The deadline, or None if the request is unbounded. Within an
+        enclosing request that has less time left, its deadline (already
+        expired if it has no time left).
+    """
+    reserve = local_config.toolbox_answer_reserve
+    outer = current_deadline.get()
+    if outer is None or (seconds and seconds < outer.remaining()):
+        return Deadline(seconds=seconds, answer_reserve=reserve) if seconds else None
+    return Deadline(
+        seconds=outer.seconds, answer_reserve=reserve, expires_at=outer.expires_at
+    )
+
+
+async def _run_agent(
+    query: str,
+    context: dict | None,
+    run_config: RunnableConfig | None,
+    debug: bool | None,
+    enable_todo: bool | None,
+    structured: bool,
+) -> dict:
+    """Answer a query with a recipe, or else with the agent."""
+    result = await _run_recipe(query)
+    if result is not None:
+        return result
+    agent, system_prompt = create_toolbox(
+        debug=debug, enable_todo=enable_todo, structured=structured
+    )
+    reporter = current_reporter.get()
+    if reporter is not None:
+        # Stream the answer tokens to the supervisor's client
+        response_tool = AgentResponse.__name__ if structured else None
+        run_config = merge_configs(
+            run_config,
+            {"callbacks": [AnswerStreamHandler(reporter, response_tool)]},
+        )
+    with span("agent", "toolbox"):
+        result = await run_agent_with_tools(
+            agent=agent,
+            query=query,
+            system_prompt=system_prompt,
+            agent_name="toolbox",
+            context=context,
+            config=run_config,
+        )
+    # Report the tools that actually ran, not the ones the model listed
+    log = current_tool_calls.get()
+    if log is not None:
+        result["tools_used"] = list(log.tools_used)
+        result["tool_calls"] = log.as_dict()
+    return result
+
+
 async def run_toolbox(
     query: str,
     context: dict | None = None,
     run_config: RunnableConfig | None = None,
     debug: bool | None = None,
     enable_todo: bool | None = None,
+    deadline: float | None = None,
+    structured: bool = True,
 ) -> dict:
     """Run the toolbox agent.
 
@@ -116,19 +289,88 @@ async def run_toolbox(
             If None, uses the config value (default: False).
         enable_todo: Whether to enable task planning middleware.
             If None, uses the config value (default: True).
+        deadline: Time budget for the request in seconds (0 for none).
+            If None, uses the config value (default: 120). Past it, a
+            partial answer with the data gathered so far is returned.
+        structured: Whether the agent produces a structured response.
+            Without it, the agent's last message is the response text,
+            which saves the structured-output step.
 
     Returns:
-        Agent response dictionary.
+        Agent response dictionary (tools_used lists the tools that ran).
     """
-    agent, system_prompt = create_toolbox(debug=debug, enable_todo=enable_todo)
-    return await run_agent_with_tools(
-        agent=agent,
-        query=query,
-        system_prompt=system_prompt,
-        agent_name="toolbox",
-        context=context,
-        config=run_config,
+    reporter = current_reporter.get()
+
+    # Serve repeated questions while the data they depended on is unchanged
+    if local_config.answer_cache:
+        cached = answer_cache.get(query, context)
+        if cached is not None:
+            if reporter is not None and cached.get("response"):
+                await reporter.answer(str(cached["response"]), final=True)
+            return cached
+
+    deps = RunDependencies()
+    usage = TokenUsage(budget=local_config.token_budget)
+    tool_calls = ToolCallLog()
+    run_deadline = _start_deadline(
+        deadline if deadline is not None else local_config.toolbox_deadline
     )
+    token = current_dependencies.set(deps)
+    usage_token = current_usage.set(usage)
+    deadline_token = current_deadline.set(run_deadline)
+    tool_calls_token = current_tool_calls.set(tool_calls)
+    try:
+        work = _run_agent(query, context, run_config, debug, enable_todo, structured)
+        if run_deadline is None:
+            result = await work
+        else:
+            try:
+                # Cancels the model and tool calls still running at the deadline
+                result = await asyncio.wait_for(work, run_deadline.remaining())
+            except TimeoutError:
+                deadline_events.inc(outcome="partial")
+                logger.warning(
+                    "Toolbox request reached its %gs deadline; returning a "
+                    "partial answer",
+                    run_deadline.seconds,
+                )
+                result = {
+                    "response": partial_response(run_deadline),
+                    "agent_name": "toolbox",
+                    "tools_used": list(tool_calls.tools_used),
+                    "tool_calls": tool_calls.as_dict(),
+                }
+            if run_deadline.skipped or run_deadline.running:
+                # Incomplete answers aren't reused
+                deps.cacheable = False
+    finally:
+        current_tool_calls.reset(tool_calls_token)
+        current_deadline.reset(deadline_token)
+        current_usage.reset(usage_token)
+        current_dependencies.reset(token)
+
+    if reporter is not None and result.get("response"):
+        await reporter.answer(str(result["response"]), final=True)
+
+    if usage.model_calls:
+        request_tokens.observe(usage.total)
+        debug_enabled = debug if debug is not None else config.debug
+        if debug_enabled:
+            logger.debug("%s", format_usage(usage))
+        logger.info("Toolbox token usage: %s", usage.as_dict())
+
+    if local_config.answer_cache:
+        answer_cache.put(query, context, result, deps)
+    if local_config.prefetch and local_config.api_cache:
+        stats = prefetcher.stats()
+        logger.info(
+            "Prefetch: %d completed, %d hits, %d wasted (hit ratio %.0f%%)",
+            stats["completed"],
+            stats["hits"],
+            stats["wasted"],
+            stats["hit_ratio"] * 100,
+        )
+    return result
 
 
 class ToolboxAgent:
@@ -157,6 +399,8 @@ class ToolboxAgent:
         run_config: RunnableConfig | None = None,
         debug: bool | None = None,
         enable_todo: bool | None = None,
+        deadline: float | None = None,
+        structured: bool = True,
     ) -> dict:
         """Execute the agent.
 
@@ -166,17 +410,29 @@ class ToolboxAgent:
             run_config: Optional runnable configuration.
             debug: Whether to enable debug mode (shows prompts).
             enable_todo: Whether to enable task planning middleware.
+            deadline: Time budget for the request in seconds (0 for none).
+                If None, uses the config value.
+            structured: Whether the agent produces a structured response
+                (False returns the answer text without that step).
 
         Returns:
             Agent response dictionary.
         """
-        return await run_toolbox(query, context, run_config, debug, enable_todo)
+        return await run_toolbox(
+            query, context, run_config, debug, enable_todo, deadline, structured
+        )
 
-    def as_tool(self) -> "BaseTool":
+    def as_tool(self, deadline: float | None = None) -> "BaseTool":
         """Return this agent as a LangChain tool.
 
         This allows the supervisor to call this agent as a tool,
-        enabling dynamic agent orchestration.
+        enabling dynamic agent orchestration. The supervisor only needs the
+        answer text, so with toolbox_plain_text the agent skips the
+        structured-output step.
+
+        Args:
+            deadline: Time budget of each call in seconds (0 for none).
+                If None, uses the config value.
 
         Returns:
             A LangChain tool wrapping this agent.
@@ -197,7 +453,20 @@ class ToolboxAgent:
             Returns:
                 The agent's response text.
             """
-            result = await agent_instance.run(query, run_config=config)
+            # Stream progress to the supervisor's client while the agent runs
+            reporter = (
+                ProgressReporter(config) if local_config.stream_progress else None
+            )
+            reporter_token = current_reporter.set(reporter)
+            try:
+                result = await agent_instance.run(
+                    query,
+                    run_config=config,
+                    deadline=deadline,
+                    structured=not local_config.toolbox_plain_text,
+                )
+            finally:
+                current_reporter.reset(reporter_token)
             return str(result["response"])
 
         return toolbox
@@ -0,0 +1,464 @@
+"""Caches for toolbox.
+
+This module provides:
+- TTLCache: A small, thread-safe cache with per-entry expiration
+- SqliteStore: Storage for TTLCache shared by several processes
+- api_cache: Cached api_get results, with per-endpoint TTLs
+- answer_cache: Final agent answers, invalidated when the data they
+  depended on expires or changes
+
+Each cached API result gets an ETag (a hash of its content). An answer
+records the ETags of every API result it used, so it's only served while
+all of them are still cached and unchanged.
+
+Caches live in process memory unless share_caches() is called, which
+moves the API and answer caches to a local SQLite file so every `web`
+worker process sees the same entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Any
+
+from playground_chatbot.config import config
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with its ETag and expiration time."""
+
+    value: Any
+    etag: str
+    stored_at: float
+    expires_at: float
+
+    @property
+    def age(self) -> float:
+        """Seconds since the value was stored."""
+        return time.time() - self.stored_at
+
+    @property
+    def fresh(self) -> bool:
+        """Whether the entry hasn't expired yet."""
+        return time.time() < self.expires_at
+
+
+def make_etag(value: Any) -> str:
+    """Compute a content-based ETag for a value.
+
+    Args:
+        value: The value to fingerprint (strings are hashed as-is).
+
+    Returns:
+        A short hexadecimal hash.
+    """
+    text = value if isinstance(value, str) else json.dumps(value, sort_keys=True)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class SqliteStore:
+    """Cache storage in a SQLite table, shared by several processes.
+
+    Values are pickled. Each process (and thread) opens its own connection,
+    so a store created before fork() is safe to use in the children.
+    """
+
+    def __init__(self, path: Path, table: str, max_entries: int) -> None:
+        """Initialize the store.
+
+        Args:
+            path: Path to the SQLite database file (created if missing).
+            table: Table holding this cache's entries.
+            max_entries: Maximum number of entries (least recently used evicted).
+        """
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value BLOB, etag TEXT, "
+                "stored_at REAL, expires_at REAL, used_at REAL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this process and thread's connection."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            # WAL lets readers in other processes run during writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get a fresh entry (see TTLCache.get)."""
+        conn = self._connect()
+        row = conn.execute(
+            f"SELECT value, etag, stored_at, expires_at FROM {self.table} "
+            "WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        entry = CacheEntry(pickle.loads(row[0]), row[1], row[2], row[3])
+        if not entry.fresh:
+            self.delete(key)
+            return None
+        conn.execute(
+            f"UPDATE {self.table} SET used_at = ? WHERE key = ?", (time.time(), key)
+        )
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry, evicting the least recently used ones if full."""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    pickle.dumps(entry.value),
+                    entry.etag,
+                    entry.stored_at,
+                    entry.expires_at,
+                    entry.stored_at,
+                ),
+            )
+            conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM "
+                f"{self.table} ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        self._connect().execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._connect().execute(f"DELETE FROM {self.table}")
+
+    def __len__(self) -> int:
+        """Number of stored entries."""
+        row = self._connect().execute(f"SELECT COUNT(*) FROM {self.table}")
+        return int(row.fetchone()[0])
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry time-to-live."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (least recently used evicted).
+        """
+        self.max_entries = max_entries
+        self._items: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared: SqliteStore | None = None
+
+    def share(self, path: Path, table: str) -> None:
+        """Move the cache to a SQLite file shared with other processes.
+
+        Entries already in memory are dropped. Entries in the file are kept,
+        since other processes may be using them.
+
+        Args:
+            path: Path to the SQLite database file.
+            table: Table holding this cache's entries.
+        """
+        self._shared = SqliteStore(path, table, self.max_entries)
+        with self._lock:
+            self._items.clear()
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Get a fresh entry.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            The entry, or None if missing or expired.
+        """
+        if self._shared is not None:
+            return self._shared.get(key)
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                return None
+            if not entry.fresh:
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return entry
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: float,
+        etag: str | None = None,
+    ) -> CacheEntry:
+        """Store a value.
+
+        Args:
+            key: The cache key.
+            value: The value to store.
+            ttl: Time-to-live in seconds.
+            etag: Optional ETag (computed from the value if not given).
+
+        Returns:
+            The stored entry.
+        """
+        now = time.time()
+        entry = CacheEntry(
+            value=value,
+            etag=etag or make_etag(value),
+            stored_at=now,
+            expires_at=now + ttl,
+        )
+        if self._shared is not None:
+            self._shared.set(key, entry)
+            return entry
+        with self._lock:
+            self._items[key] = entry
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return entry
+
+    def delete(self, key: str) -> None:
+        """Remove an entry if present."""
+        if self._shared is not None:
+            self._shared.delete(key)
+            return
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        if self._shared is not None:
+            self._shared.clear()
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        """Number of stored entries (including expired ones not yet evicted)."""
+        if self._shared is not None:
+            return len(self._shared)
+        return len(self._items)
+
+
+# =============================================================================
+# API RESULT CACHE
+# =============================================================================
+
+api_cache = TTLCache(max_entries=config.api_cache_max_entries)
+
+
+def api_cache_key(args: dict[str, Any]) -> str:
+    """Build the cache key for an api_get call.
+
+    Args:
+        args: The api_get arguments (service, endpoint, and any others).
+
+    Returns:
+        A stable key, e.g. 'devops:/services/2' or 'devops:/alerts:{...}'.
+    """
+    extra = {k: v for k, v in args.items() if k not in ("service", "endpoint")}
+    key = f"{args.get('service', '')}:{args.get('endpoint', '')}"
+    if any(value is not None for value in extra.values()):
+        key += ":" + json.dumps(extra, sort_keys=True, default=str)
+    return key
+
+
+def api_cache_ttl(endpoint: str) -> float:
+    """Get the cache TTL configured for an endpoint.
+
+    Patterns in api_cache_ttls use shell-style wildcards (e.g., '/services/*').
+
+    Args:
+        endpoint: The endpoint path.
+
+    Returns:
+        TTL in seconds (api_cache_ttl if no pattern matches).
+    """
+    path = endpoint.split("?", 1)[0].rstrip("/") or "/"
+    for pattern, ttl in config.api_cache_ttls.items():
+        if fnmatch(path, pattern.rstrip("/") or "/"):
+            return float(ttl)
+    return config.api_cache_ttl
+
+
+# =============================================================================
+# ANSWER CACHE
+# =============================================================================
+
+
+@dataclass
+class RunDependencies:
+    """API results an agent run depended on."""
+
+    etags: dict[str, str] = field(default_factory=dict)
+    cacheable: bool = True
+
+
+# Dependencies of the agent run in the current context (set by run_toolbox)
+current_dependencies: ContextVar[RunDependencies | None] = ContextVar(
+    "toolbox_current_dependencies", default=None
+)
+
+
+def record_dependency(key: str, entry: CacheEntry | None) -> None:
+    """Record that the current run used an API result.
+
+    Args:
+        key: The api_cache key of the call.
+        entry: The cached entry used, or None if the call couldn't be cached
+            (which makes the run's answer uncacheable).
+    """
+    deps = current_dependencies.get()
+    if deps is None:
+        return
+    if entry is None:
+        deps.cacheable = False
+    else:
+        deps.etags[key] = entry.etag
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so near-identical questions share a cache key.
+
+    Args:
+        query: The user query.
+
+    Returns:
+        Lowercased query without punctuation and with collapsed whitespace.
+    """
+    return " ".join(re.sub(r"[^\w\s/-]", " ", query.lower()).split())
+
+
+class AnswerCache:
+    """Cache of agent answers keyed by normalized query and data fingerprint."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached answers.
+        """
+        self._answers = TTLCache(max_entries=max_entries)
+
+    @staticmethod
+    def _key(query: str, context: dict | None) -> str:
+        """Build the key for a query and its conversation context."""
+        key = normalize_query(query)
+        if context:
+            key += ":" + make_etag(json.dumps(context, sort_keys=True, default=str))
+        return key
+
+    def get(self, query: str, context: dict | None = None) -> dict | None:
+        """Get a cached answer whose data dependencies are still valid.
+
+        Args:
+            query: The user query.
+            context: Optional context from previous interactions.
+
+        Returns:
+            A copy of the cached agent response, or None.
+        """
+        key = self._key(query, context)
+        entry = self._answers.get(key)
+        if entry is None:
+            return None
+        response, etags = entry.value
+        for dep_key, etag in etags.items():
+            dep = api_cache.get(dep_key)
+            if dep is None or dep.etag != etag:
+                self._answers.delete(key)
+                return None
+        return dict(response)
+
+    def put(
+        self,
+        query: str,
+        context: dict | None,
+        response: dict,
+        deps: RunDependencies,
+    ) -> None:
+        """Cache an answer if all its dependencies were cacheable.
+
+        The answer expires with the first API result it depended on, and
+        never later than answer_cache_ttl.
+
+        Args:
+            query: The user query.
+            context: Optional context from previous interactions.
+            response: The agent response dictionary.
+            deps: The API results the answer depended on.
+        """
+        if not deps.cacheable:
+            return
+        ttl = config.answer_cache_ttl
+        for dep_key in deps.etags:
+            dep = api_cache.get(dep_key)
+            if dep is None:
+                return
+            ttl = min(ttl, dep.expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._answers.set(
+            self._key(query, context),
+            (dict(response), dict(deps.etags)),
+            ttl,
+            etag="-",
+        )
+
+    def share(self, path: Path) -> None:
+        """Move the cache to a SQLite file shared with other processes."""
+        self._answers.share(path, "answers")
+
+    def clear(self) -> None:
+        """Remove all cached answers."""
+        self._answers.clear()
+
+
+answer_cache = AnswerCache(max_entries=config.answer_cache_max_entries)
+
+
+def share_caches(path: Path | str) -> None:
+    """Share the API and answer caches with other processes via SQLite.
+
+    Call it before forking the processes that share them (e.g., the `web`
+    workers); it's also set up on import when shared_cache_path is set.
+
+    Args:
+        path: Path to the SQLite database file (created if missing).
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    api_cache.share(path, "api")
+    answer_cache.share(path)
+
+
+if config.shared_cache_path:
+    share_caches(config.shared_cache_path)
@@ -0,0 +1,187 @@
+"""Structured index of catalog-style facts for toolbox.
+
+Facts that describe services in sections like:
+
+    ## Service ID 4: Postgres Primary (postgres-primary)
+
+    **Owner**: Database Team (dba-team@example.com)
+
+    **Critical Dependencies**:
+    - Redis Cache (ID 5) for session storage
+
+    **SLA**: 99.99% uptime
+
+are compiled at load time into a table of service records, indexed by ID,
+slug and name. The lookup_service tool returns one record (or some of its
+fields), so the agent doesn't read and parse the whole fact for each
+question.
+
+Every `**Label**: value` line becomes a field (snake_case label). A label
+followed by a bulleted list becomes a list. Derived fields:
+
+- depends_on: IDs referenced as "(ID n)" in the critical dependencies
+- sla_percent: the SLA as a number
+- owner_email: the email in the owner field
+- tier: the priority tier, from "**Tier N ...**:" lists of "Service ID n"
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+_SERVICE_HEADING = re.compile(
+    r"^##\s+Service ID\s+(\d+):\s*(.+?)\s*\(([\w.-]+)\)\s*$", re.MULTILINE
+)
+_SECTION = re.compile(r"^##\s", re.MULTILINE)
+_FIELD = re.compile(r"^\*\*(.+?)\*\*:?\s*(.*)$")
+_ITEM = re.compile(r"^\s*[-*]\s+(.+)$")
+_ID_REFERENCE = re.compile(r"\(ID\s+(\d+)\)")
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_TIER = re.compile(r"^\*\*(Tier\s+\d+[^*]*)\*\*:?\s*$")
+_TIER_ITEM = re.compile(r"^\s*[-*]\s+Service ID\s+(\d+)\b")
+
+
+def _field_name(label: str) -> str:
+    """Turn a label (e.g., 'Critical Dependencies') into a field name."""
+    return re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+
+
+def _parse_fields(body: str) -> dict[str, Any]:
+    """Parse the `**Label**: value` fields (and their lists) of a section."""
+    fields: dict[str, Any] = {}
+    current: str | None = None
+    for line in body.splitlines():
+        match = _FIELD.match(line.strip())
+        if match:
+            current = _field_name(match.group(1))
+            fields[current] = match.group(2).strip()
+            continue
+        item = _ITEM.match(line)
+        if item and current is not None:
+            value = fields[current]
+            if not isinstance(value, list):
+                # Text before the list (usually empty) is dropped
+                value = fields[current] = []
+            value.append(item.group(1).strip())
+        elif line.strip().startswith("#"):
+            current = None
+    return fields
+
+
+def _derive(record: dict[str, Any]) -> None:
+    """Add the derived fields of a service record."""
+    dependencies = record.get("critical_dependencies")
+    if isinstance(dependencies, str):
+        # e.g. "None (foundational service)"
+        record["critical_dependencies"] = (
+            [] if dependencies.lower().startswith("none") else [dependencies]
+        )
+    record["depends_on"] = [
+        int(ref)
+        for dependency in record.get("critical_dependencies", [])
+        for ref in _ID_REFERENCE.findall(dependency)
+    ]
+    sla = _PERCENT.search(str(record.get("sla", "")))
+    if sla:
+        record["sla_percent"] = float(sla.group(1))
+    email = _EMAIL.search(str(record.get("owner", "")))
+    if email:
+        record["owner_email"] = email.group(0)
+
+
+def parse_catalog(content: str, source: str = "") -> list[dict[str, Any]]:
+    """Parse the service records of a catalog-style fact.
+
+    Args:
+        content: The fact's markdown (without frontmatter).
+        source: Path of the fact, stored in each record.
+
+    Returns:
+        The service records, in document order (empty if it's no catalog).
+    """
+    headings = list(_SERVICE_HEADING.finditer(content))
+    records: list[dict[str, Any]] = []
+    for heading in headings:
+        start = heading.end()
+        next_section = _SECTION.search(content, start)
+        end = next_section.start() if next_section else len(content)
+        record: dict[str, Any] = {
+            "id": int(heading.group(1)),
+            "name": heading.group(2).strip(),
+            "slug": heading.group(3),
+        }
+        record.update(_parse_fields(content[start:end]))
+        _derive(record)
+        if source:
+            record["source"] = source
+        records.append(record)
+
+    if records:
+        by_id = {r["id"]: r for r in records}
+        tier = None
+        for line in content.splitlines():
+            match = _TIER.match(line.strip())
+            if match:
+                tier = match.group(1).strip()
+                continue
+            item = _TIER_ITEM.match(line)
+            if item and tier and int(item.group(1)) in by_id:
+                by_id[int(item.group(1))]["tier"] = tier
+            elif line.startswith("#"):
+                tier = None
+    return records
+
+
+def _key(text: str) -> str:
+    """Normalize an ID, slug or name for lookups."""
+    return re.sub(r"[\s_]+", "-", text.strip().lower())
+
+
+@dataclass
+class ServiceCatalog:
+    """Service records indexed by ID, slug and name."""
+
+    services: dict[int, dict[str, Any]] = field(default_factory=dict)
+    _index: dict[str, dict[str, Any]] = field(default_factory=dict, repr=False)
+
+    def add(self, record: dict[str, Any]) -> None:
+        """Add a record (later records with the same ID replace earlier ones)."""
+        self.services[record["id"]] = record
+        for key in (str(record["id"]), record["slug"], record["name"]):
+            self._index[_key(key)] = record
+
+    def get(self, id_or_slug: str | int) -> dict[str, Any] | None:
+        """Get a service record by ID, slug or name.
+
+        Args:
+            id_or_slug: The service ID (e.g., 4 or '4'), slug or name.
+
+        Returns:
+            The record, or None if there's no such service.
+        """
+        key = _key(str(id_or_slug))
+        return self._index.get(key) or self._index.get(key.removeprefix("id-"))
+
+    def __len__(self) -> int:
+        """Number of services."""
+        return len(self.services)
+
+
+def build_catalog(documents: list[tuple[Path, str]]) -> ServiceCatalog:
+    """Build the catalog from documents.
+
+    Args:
+        documents: (relative path, content) of each fact.
+
+    Returns:
+        The catalog of all services found.
+    """
+    catalog = ServiceCatalog()
+    for path, content in documents:
+        for record in parse_catalog(content, str(path)):
+            catalog.add(record)
+    return catalog
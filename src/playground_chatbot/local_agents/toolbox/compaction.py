@@ -0,0 +1,235 @@
+"""Tool-result compaction for toolbox.
+
+Large api_get payloads are appended to the message history and re-sent
+to the LLM on every subsequent turn of the tool loop. The helpers in this
+module shrink a payload to a per-result token budget by:
+
+- Projecting objects to a per-endpoint field allowlist
+- Collapsing long arrays into a count plus a few sample items
+- Truncating whatever is still too large
+
+Optionally, uniform lists are rendered as compact tables (see tabular.py),
+which fits more rows in the same budget.
+
+The full payload is kept in the session store (see sessions.py) under a
+content-addressed reference, so the agent can retrieve it with the
+get_full_result tool.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from fnmatch import fnmatch
+from typing import Any
+
+from .tabular import encode_tables
+
+# Rough characters-per-token ratio used for budget estimations
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a text.
+
+    Uses a simple characters-per-token heuristic, which is good enough
+    for budgeting without pulling in a model-specific tokenizer.
+
+    Args:
+        text: The text to measure.
+
+    Returns:
+        Approximate number of tokens.
+    """
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+# =============================================================================
+# PAYLOAD REFERENCES
+# =============================================================================
+
+
+def payload_ref(content: str) -> str:
+    """Build the reference of a full tool result.
+
+    Args:
+        content: The full tool result.
+
+    Returns:
+        A short, content-addressed reference (e.g., 'res_1a2b3c4d5e').
+    """
+    return "res_" + hashlib.sha1(content.encode("utf-8")).hexdigest()[:10]
+
+
+# =============================================================================
+# COMPACTION
+# =============================================================================
+
+
+def _match_fields(endpoint: str, field_allowlists: dict[str, list[str]]) -> list[str]:
+    """Find the field allowlist configured for an endpoint.
+
+    Patterns use shell-style wildcards (e.g., '/services/*'). Query strings
+    are ignored when matching.
+
+    Args:
+        endpoint: The endpoint that was called.
+        field_allowlists: Mapping of endpoint patterns to allowed fields.
+
+    Returns:
+        The allowed fields, or an empty list if no pattern matches.
+    """
+    path = endpoint.split("?", 1)[0].rstrip("/") or "/"
+    for pattern, fields in field_allowlists.items():
+        if fnmatch(path, pattern.rstrip("/") or "/"):
+            return list(fields)
+    return []
+
+
+def _project(data: Any, fields: list[str]) -> Any:
+    """Keep only the allowed fields of an object or a list of objects.
+
+    An object without any allowed field is taken as a wrapper (e.g.,
+    {"services": [...], "total": 6}): its lists are projected and the rest
+    is kept as is.
+    """
+    if isinstance(data, dict):
+        if any(key in fields for key in data):
+            return {key: value for key, value in data.items() if key in fields}
+        return {
+            key: _project(value, fields) if isinstance(value, list) else value
+            for key, value in data.items()
+        }
+    if isinstance(data, list):
+        return [_project(item, fields) for item in data]
+    return data
+
+
+def _collapse_arrays(data: Any, sample_size: int) -> Any:
+    """Replace long arrays with their length and a few sample items."""
+    if isinstance(data, dict):
+        return {
+            key: _collapse_arrays(value, sample_size) for key, value in data.items()
+        }
+    if isinstance(data, list):
+        items = [_collapse_arrays(item, sample_size) for item in data[:sample_size]]
+        if len(data) > sample_size:
+            return {"_count": len(data), "_sample": items}
+        return items
+    return data
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut a text down to the token budget."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + f"... [truncated {len(text) - max_chars} chars]"
+
+
+def _render(data: Any, tables: bool) -> str:
+    """Serialize a payload as compact JSON, or with its lists as tables."""
+    if tables:
+        encoded = encode_tables(data)
+        if encoded is not None:
+            return encoded
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+def split_note(content: str) -> tuple[str, str]:
+    """Split a trailing note (a last line like '[...]') off a tool result.
+
+    Notes added by other middleware (e.g., a snapshot's age) are kept out
+    of the payload, so it can still be parsed and compacted as JSON.
+
+    Args:
+        content: The tool result.
+
+    Returns:
+        Tuple of (payload, note), with an empty note if there's none.
+    """
+    start = content.rfind("\n[")
+    if start < 0 or not content.endswith("]") or "\n" in content[start + 1 :]:
+        return content, ""
+    return content[:start], content[start:]
+
+
+def compact_payload(
+    content: str,
+    endpoint: str = "",
+    max_tokens: int = 2000,
+    sample_size: int = 3,
+    field_allowlists: dict[str, list[str]] | None = None,
+    tables: bool = False,
+) -> tuple[str, bool]:
+    """Compact a tool result to fit a token budget.
+
+    Field projection is applied whenever an allowlist matches the endpoint.
+    Array collapsing and truncation are applied only while the result is
+    still over budget. Table encoding doesn't drop data, so it alone
+    doesn't count as compaction.
+
+    Args:
+        content: The raw tool result.
+        endpoint: The endpoint the result came from (for allowlist matching).
+        max_tokens: Per-result token budget.
+        sample_size: Number of items kept when collapsing long arrays.
+        field_allowlists: Mapping of endpoint patterns to allowed fields.
+        tables: Whether to encode uniform lists as tables.
+
+    Returns:
+        Tuple of (compacted_content, was_compacted).
+    """
+    try:
+        data = json.loads(content)
+    except (ValueError, TypeError):
+        if estimate_tokens(content) <= max_tokens:
+            return content, False
+        return _truncate(content, max_tokens), True
+
+    fields = _match_fields(endpoint, field_allowlists or {})
+    if not fields and not tables and estimate_tokens(content) <= max_tokens:
+        return content, False
+    if fields:
+        data = _project(data, fields)
+
+    text = _render(data, tables)
+    if estimate_tokens(text) <= max_tokens:
+        return text, bool(fields)
+    text = _render(_collapse_arrays(data, sample_size), tables)
+    if estimate_tokens(text) > max_tokens:
+        text = _truncate(text, max_tokens)
+
+    return text, True
+
+
+def select_path(content: str, path: str) -> str:
+    """Select a sub-element of a JSON payload using a dotted path.
+
+    Args:
+        content: The full JSON payload.
+        path: Dotted path with keys and list indexes (e.g., '2.issues').
+
+    Returns:
+        The selected element serialized as JSON.
+
+    Raises:
+        ValueError: If the payload is not JSON or the path doesn't exist.
+    """
+    try:
+        data = json.loads(content)
+    except (ValueError, TypeError) as e:
+        raise ValueError("result is not JSON, request it without a path") from e
+
+    for part in path.split("."):
+        if isinstance(data, list) and part.lstrip("-").isdigit():
+            index = int(part)
+            if not -len(data) <= index < len(data):
+                raise ValueError(f"index {index} out of range in '{path}'")
+            data = data[index]
+        elif isinstance(data, dict) and part in data:
+            data = data[part]
+        else:
+            raise ValueError(f"'{part}' not found in '{path}'")
+
+    return json.dumps(data, ensure_ascii=False)
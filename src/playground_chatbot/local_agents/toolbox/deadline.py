@@ -0,0 +1,124 @@
+"""Per-request deadlines for toolbox.
+
+A toolbox request (run_toolbox) gets a time budget, which bounds its
+response time regardless of how many steps the agent takes:
+
+- Tool calls are bounded by the time left before the answer reserve (the
+  last seconds of the budget, kept for the model to write its answer).
+  Calls that time out are cancelled, and new calls made during the
+  reserve are skipped, telling the model to answer with what it has.
+- Direct API calls (recipes, prefetch) are bounded by the time left.
+- When the budget runs out, the whole run is cancelled and a partial
+  answer is built from the tool results gathered so far, saying what
+  was skipped.
+
+Nested runs share the earliest deadline.
+"""
+
+from __future__ import annotations
+
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from playground_chatbot.telemetry import registry
+
+from .compaction import _truncate
+
+# Tokens kept of each tool result quoted in a partial answer
+EXCERPT_TOKENS = 100
+
+deadline_events = registry.counter(
+    "playground_deadline_total",
+    "Toolbox requests that ran out of time, by outcome (wrap_up, partial).",
+)
+
+
+@dataclass
+class Deadline:
+    """Time budget of a toolbox request and what it got done."""
+
+    seconds: float
+    answer_reserve: float = 0.0
+    expires_at: float = 0.0
+    gathered: list[tuple[str, str]] = field(default_factory=list)
+    running: dict[str, str] = field(default_factory=dict)
+    skipped: list[str] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        """Start the clock (unless an expiry time was given)."""
+        if not self.expires_at:
+            self.expires_at = time.monotonic() + self.seconds
+        # Never reserve most of a short budget
+        self.answer_reserve = min(self.answer_reserve, self.seconds / 4)
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline (0 once expired)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def tool_time(self) -> float:
+        """Seconds left for tool calls, before the answer reserve."""
+        return max(0.0, self.remaining() - self.answer_reserve)
+
+    @property
+    def wrapping_up(self) -> bool:
+        """Whether the answer reserve has started (no more tool calls)."""
+        return self.tool_time() <= 0
+
+    def start(self, call_id: str, detail: str) -> None:
+        """Record a tool call that started."""
+        self.running[call_id] = detail
+
+    def finish(self, call_id: str, name: str, content: str | None) -> None:
+        """Record a tool call that finished (content None if it failed)."""
+        detail = self.running.pop(call_id, name)
+        if content is not None:
+            self.gathered.append((detail, content))
+
+    def skip(self, call_id: str, detail: str) -> None:
+        """Record a tool call that was skipped or cancelled."""
+        self.running.pop(call_id, None)
+        self.skipped.append(detail)
+
+
+# Deadline of the toolbox request in the current context (set by run_toolbox)
+current_deadline: ContextVar[Deadline | None] = ContextVar(
+    "toolbox_current_deadline", default=None
+)
+
+
+def remaining_time() -> float | None:
+    """Get the seconds left for the current request (None if unbounded)."""
+    deadline = current_deadline.get()
+    return deadline.remaining() if deadline is not None else None
+
+
+def partial_response(deadline: Deadline) -> str:
+    """Build a best-effort answer for a request that ran out of time.
+
+    Args:
+        deadline: The request's deadline, with what it gathered.
+
+    Returns:
+        The partial answer: the data gathered and the work left undone.
+    """
+    lines = [
+        (
+            f"[Partial answer: the {deadline.seconds:g}s time limit for this "
+            "request was reached before the analysis was complete.]"
+        ),
+        "",
+    ]
+    if deadline.gathered:
+        lines.append("Data gathered before the deadline:")
+        for detail, content in deadline.gathered:
+            lines.append(f"- {detail}: {_truncate(content, EXCERPT_TOKENS)}")
+    else:
+        lines.append("No data was gathered before the deadline.")
+    not_done = [f"{d} (skipped)" for d in deadline.skipped] + [
+        f"{d} (cancelled)" for d in deadline.running.values()
+    ]
+    if not_done:
+        lines += ["", "Not completed:"]
+        lines += [f"- {detail}" for detail in not_done]
+    return "\n".join(lines)
@@ -0,0 +1,197 @@
+"""Service dependency graph and impact analysis for toolbox.
+
+The graph is built from the service catalog (see catalog.py): an edge
+A → B for every service B that A lists in its critical dependencies. For a
+service, the impact analysis computes in-process:
+
+- Blast radius (downstream): the services that depend on it, directly or
+  transitively, with their distance
+- Upstream: the services it depends on, directly or transitively
+- Critical paths: the dependency chains from each entry point (a service
+  nothing depends on, e.g. the web frontend) down to the service, with the
+  combined SLA of the chain (the product of its services' SLAs, as they
+  are all needed in series)
+- Effective SLA: the service's SLA combined with all of its upstream
+
+With live statuses (from the /services endpoint), services that aren't
+healthy are marked, along with the paths that go through them.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any
+
+from .catalog import ServiceCatalog
+
+HEALTHY_STATUSES = ("healthy", "ok", "up")
+
+
+def _bfs(start: int, edges: dict[int, list[int]]) -> dict[int, int]:
+    """Get the distance to every node reachable from a start node."""
+    distances: dict[int, int] = {}
+    queue = deque([(start, 0)])
+    while queue:
+        node, distance = queue.popleft()
+        for neighbor in edges.get(node, []):
+            if neighbor != start and neighbor not in distances:
+                distances[neighbor] = distance + 1
+                queue.append((neighbor, distance + 1))
+    return distances
+
+
+@dataclass
+class DependencyGraph:
+    """Services and the critical dependencies between them."""
+
+    services: dict[int, dict[str, Any]]
+    depends_on: dict[int, list[int]] = field(default_factory=dict)
+    dependents: dict[int, list[int]] = field(default_factory=dict)
+
+    @classmethod
+    def from_catalog(cls, catalog: ServiceCatalog) -> DependencyGraph:
+        """Build the graph from the catalog's depends_on fields.
+
+        Args:
+            catalog: The service catalog.
+
+        Returns:
+            The dependency graph (references to unknown IDs are ignored).
+        """
+        graph = cls(services=dict(catalog.services))
+        for service_id, record in catalog.services.items():
+            targets = [d for d in record.get("depends_on", []) if d in graph.services]
+            graph.depends_on[service_id] = targets
+            for target in targets:
+                graph.dependents.setdefault(target, []).append(service_id)
+        return graph
+
+    def downstream(self, service_id: int) -> dict[int, int]:
+        """Get the services affected when a service fails, with their distance."""
+        return _bfs(service_id, self.dependents)
+
+    def upstream(self, service_id: int) -> dict[int, int]:
+        """Get the services a service needs, with their distance."""
+        return _bfs(service_id, self.depends_on)
+
+    def critical_paths(self, service_id: int) -> list[list[int]]:
+        """Get the dependency chains from each entry point down to a service.
+
+        Args:
+            service_id: The service.
+
+        Returns:
+            Each path as a list of IDs, from the entry point to the service.
+        """
+        paths: list[list[int]] = []
+
+        def walk(node: int, path: list[int]) -> None:
+            callers = [c for c in self.dependents.get(node, []) if c not in path]
+            if not callers:
+                paths.append(list(reversed(path)))
+                return
+            for caller in callers:
+                walk(caller, [*path, caller])
+
+        walk(service_id, [service_id])
+        return sorted(paths, key=len, reverse=True)
+
+    def sla(self, service_id: int) -> float | None:
+        """Get a service's SLA as a fraction, if the catalog has it."""
+        percent = self.services[service_id].get("sla_percent")
+        return percent / 100 if percent is not None else None
+
+    def combined_sla(self, service_ids: list[int] | set[int]) -> float | None:
+        """Get the availability of services needed together (in series).
+
+        Args:
+            service_ids: The services.
+
+        Returns:
+            The product of their SLAs, as a percentage (None if any is unknown).
+        """
+        slas = [self.sla(s) for s in service_ids]
+        if any(s is None for s in slas):
+            return None
+        return round(math.prod(slas) * 100, 4)  # type: ignore[arg-type]
+
+
+def _is_healthy(status: str | None) -> bool:
+    """Whether a live status counts as healthy (unknown counts as healthy)."""
+    return status is None or status.lower() in HEALTHY_STATUSES
+
+
+def analyze_impact(
+    graph: DependencyGraph,
+    service_id: int,
+    statuses: dict[int, str] | None = None,
+) -> dict[str, Any]:
+    """Compute the impact analysis of a service.
+
+    Args:
+        graph: The dependency graph.
+        service_id: The service to analyze.
+        statuses: Live status by service ID (e.g., from /services).
+
+    Returns:
+        Blast radius, upstream, critical paths and SLAs, with live statuses.
+    """
+    statuses = statuses or {}
+
+    def describe(node: int, distance: int | None = None) -> dict[str, Any]:
+        record = graph.services[node]
+        info: dict[str, Any] = {"id": node, "slug": record["slug"]}
+        if distance is not None:
+            info["distance"] = distance
+        if record.get("tier"):
+            info["tier"] = record["tier"]
+        if node in statuses:
+            info["status"] = statuses[node]
+        return info
+
+    downstream = graph.downstream(service_id)
+    upstream = graph.upstream(service_id)
+    paths = []
+    for path in graph.critical_paths(service_id):
+        entry: dict[str, Any] = {
+            "path": [graph.services[n]["slug"] for n in path],
+            "combined_sla_percent": graph.combined_sla(path),
+        }
+        unhealthy = [
+            graph.services[n]["slug"] for n in path if not _is_healthy(statuses.get(n))
+        ]
+        if unhealthy:
+            entry["unhealthy"] = unhealthy
+        paths.append(entry)
+
+    result: dict[str, Any] = {
+        "service": describe(service_id),
+        "blast_radius": [
+            describe(n, d) for n, d in sorted(downstream.items(), key=lambda i: i[1])
+        ],
+        "upstream": [
+            describe(n, d) for n, d in sorted(upstream.items(), key=lambda i: i[1])
+        ],
+        "critical_paths": paths,
+        "sla_percent": graph.services[service_id].get("sla_percent"),
+        "effective_sla_percent": graph.combined_sla({service_id, *upstream}),
+    }
+    if statuses:
+        result["unhealthy_upstream"] = [
+            describe(n, d)
+            for n, d in sorted(upstream.items(), key=lambda i: i[1])
+            if not _is_healthy(statuses.get(n))
+        ]
+        result["unhealthy_downstream"] = [
+            describe(n, d)
+            for n, d in sorted(downstream.items(), key=lambda i: i[1])
+            if not _is_healthy(statuses.get(n))
+        ]
+    slug = graph.services[service_id]["slug"]
+    result["summary"] = (
+        f"{slug} failing affects {len(downstream)} service(s) through "
+        f"{len(paths)} path(s); it depends on {len(upstream)} service(s)."
+    )
+    return result
@@ -0,0 +1,292 @@
+"""Per-service limits for upstream API calls.
+
+Many concurrent sessions (and the SDK's retries) can stampede an upstream
+service during a brownout. Each registered service gets a guard with:
+
+- A token bucket: at most `rate` calls per second, with bursts of `burst`
+- A cap of `max_in_flight` concurrent calls
+- A circuit breaker: after `failure_threshold` consecutive upstream
+  failures, calls fail fast for `reset_timeout` seconds; then one trial
+  call is let through, which closes the circuit if it succeeds
+
+A call waits up to `max_wait` seconds for the bucket or a free slot, then
+fails with Throttled. Calls refused by an open circuit fail with
+CircuitOpen. Both messages tell the agent what to do instead of waiting.
+
+The guards work across threads and event loops (the background refresher
+runs its own loop), so they use locks and polling instead of asyncio
+primitives.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+
+from playground_chatbot.config import config
+from playground_chatbot.telemetry import registry
+
+# Seconds between checks for a free concurrency slot
+POLL_INTERVAL = 0.05
+
+# Client errors (4xx) say nothing about the upstream's health
+_CLIENT_ERROR = re.compile(r"\b4\d\d\b")
+
+limited_calls = registry.counter(
+    "playground_api_limited_total",
+    "Upstream API calls refused by the service limits, by service and reason.",
+)
+
+
+class Throttled(Exception):
+    """A call exceeded its service's rate or concurrency limit."""
+
+
+class CircuitOpen(Exception):
+    """A call was refused because its service's circuit is open."""
+
+
+def is_upstream_failure(error: str) -> bool:
+    """Whether an error message looks like an upstream failure (not 4xx).
+
+    Args:
+        error: The error message of a failed call.
+
+    Returns:
+        True for server errors, timeouts and connection errors.
+    """
+    return _CLIENT_ERROR.search(error) is None
+
+
+class ServiceGuard:
+    """Rate limit, concurrency cap and circuit breaker of one service."""
+
+    def __init__(
+        self,
+        service: str,
+        rate: float = 10.0,
+        burst: int = 20,
+        max_in_flight: int = 8,
+        max_wait: float = 2.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        """Initialize the guard.
+
+        Args:
+            service: The service name (for messages and metrics).
+            rate: Calls per second (0 = unlimited).
+            burst: Calls allowed at once when the bucket is full.
+            max_in_flight: Maximum concurrent calls (0 = unlimited).
+            max_wait: Seconds a call waits for the bucket or a free slot.
+            failure_threshold: Consecutive failures that open the circuit
+                (0 = no circuit breaker).
+            reset_timeout: Seconds the circuit stays open.
+        """
+        self.service = service
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.max_in_flight = max_in_flight
+        self.max_wait = max_wait
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._refilled = time.monotonic()
+        self._in_flight = 0
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial = False
+
+    # -------------------------------------------------------------------------
+    # Circuit breaker
+    # -------------------------------------------------------------------------
+
+    @property
+    def state(self) -> str:
+        """Circuit state: 'closed', 'open' or 'half_open'."""
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        """Get the circuit state (called with the lock held)."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def _check_circuit(self) -> bool:
+        """Refuse a call while the circuit is open (one trial when half open).
+
+        Returns:
+            True if the call is the trial call of a half open circuit.
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            retry_in = self.reset_timeout
+            if self._opened_at is not None:
+                retry_in -= time.monotonic() - self._opened_at
+        limited_calls.inc(service=self.service, reason="circuit_open")
+        raise CircuitOpen(
+            f"Circuit open: the '{self.service}' API is failing and calls are "
+            f"paused for {max(retry_in, 1):.0f}s. Don't retry it now; answer "
+            "with the data you have and say it's unavailable."
+        )
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a call (opens or closes the circuit).
+
+        Args:
+            success: Whether the upstream answered (client errors count).
+        """
+        with self._lock:
+            self._trial = False
+            if success:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or (
+                self.failure_threshold and self._failures >= self.failure_threshold
+            ):
+                # Opens, or re-opens after a failed trial call
+                self._opened_at = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    # Rate and concurrency limits
+    # -------------------------------------------------------------------------
+
+    def _take_token(self) -> float:
+        """Take a token, or get the seconds until one is available."""
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._refilled) * self.rate
+        )
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _take_slot(self) -> bool:
+        """Take a concurrency slot if one is free."""
+        if self.max_in_flight and self._in_flight >= self.max_in_flight:
+            return False
+        self._in_flight += 1
+        return True
+
+    def _throttled(self, reason: str) -> Throttled:
+        """Build the error of a throttled call."""
+        limited_calls.inc(service=self.service, reason=reason)
+        what = "rate limit" if reason == "rate" else "concurrent call limit"
+        return Throttled(
+            f"Throttled: the '{self.service}' API {what} was reached. Use the "
+            "data you already have, or make fewer calls (e.g., one list "
+            "endpoint instead of one call per item)."
+        )
+
+    async def _acquire(self) -> None:
+        """Wait for a token and a concurrency slot (up to max_wait)."""
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            with self._lock:
+                wait = self._take_token()
+            if not wait:
+                break
+            if time.monotonic() + wait > deadline:
+                raise self._throttled("rate")
+            await asyncio.sleep(wait)
+        while True:
+            with self._lock:
+                if self._take_slot():
+                    return
+            if time.monotonic() + POLL_INTERVAL > deadline:
+                raise self._throttled("concurrency")
+            await asyncio.sleep(POLL_INTERVAL)
+
+    @asynccontextmanager
+    async def call(self) -> AsyncIterator[None]:
+        """Guard one call to the service.
+
+        The caller reports the outcome with record(). A trial call that
+        raises instead (e.g., cancelled at the request's deadline) gives up
+        the trial without an outcome, so the next call can be the trial.
+
+        Raises:
+            CircuitOpen: If the circuit is open.
+            Throttled: If no token or slot was available within max_wait.
+        """
+        trial = self._check_circuit()
+        try:
+            await self._acquire()
+        except Throttled:
+            if trial:
+                # A throttled trial call doesn't count as the trial
+                self._release_trial()
+            raise
+        try:
+            yield
+        except BaseException:
+            if trial:
+                self._release_trial()
+            raise
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _release_trial(self) -> None:
+        """Let another call be the trial of a half open circuit."""
+        with self._lock:
+            self._trial = False
+
+    def stats(self) -> dict[str, Any]:
+        """Get the guard's current state."""
+        with self._lock:
+            return {
+                "state": self._state(),
+                "in_flight": self._in_flight,
+                "failures": self._failures,
+                "tokens": round(self._tokens, 2),
+            }
+
+
+_guards: dict[str, ServiceGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(service: str) -> ServiceGuard:
+    """Get the guard of a service, created from the configuration.
+
+    Args:
+        service: The registered service name.
+
+    Returns:
+        The service's guard (shared by all calls in this process).
+    """
+    with _guards_lock:
+        guard = _guards.get(service)
+        if guard is None:
+            settings: dict[str, Any] = {
+                "rate": config.api_rate_limit,
+                "burst": config.api_rate_burst,
+                "max_in_flight": config.api_max_in_flight,
+                "max_wait": config.api_limit_max_wait,
+                "failure_threshold": config.api_breaker_failures,
+                "reset_timeout": config.api_breaker_reset,
+            }
+            settings.update(config.api_limits.get(service, {}))
+            guard = _guards[service] = ServiceGuard(service, **settings)
+        return guard
@@ -0,0 +1,211 @@
+"""Record/replay cache of model responses for toolbox.
+
+Every model call of the toolbox agent is keyed by a hash of the model and
+its parameters, the messages (system prompt included), the tool schemas
+and the response format. Responses are stored as JSON files, one per key,
+so they can be inspected, deleted or committed for CI runs.
+
+Modes (llm_cache_mode):
+
+- passthrough: the cache is off (default)
+- record: recorded responses are replayed; other calls go to the model
+  and their responses are recorded
+- replay: only recorded responses are used; any other call fails with
+  LLMCacheMiss, which makes evaluation runs deterministic
+
+Dates and times in system messages (e.g., the datetime context) are left
+out of the key, so recordings keep matching on later days.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    SystemMessage,
+    messages_from_dict,
+    messages_to_dict,
+)
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import BaseModel
+
+from playground_chatbot.telemetry import registry
+
+MODES = ("passthrough", "record", "replay")
+
+# Bumped when the key or the file format changes
+FORMAT_VERSION = 1
+
+_DATETIME_PATTERNS = (
+    re.compile(
+        r"\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?"
+        r"(?:Z|[+-]\d{2}:?\d{2})?)?"
+    ),
+    re.compile(
+        r"\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.? "
+        r"\d{1,2}(?:st|nd|rd|th)?,? \d{4}\b"
+    ),
+    re.compile(r"\b\d{1,2}:\d{2}(?::\d{2})?(?:\s?[AP]M)?\b"),
+    re.compile(r"\b(?:Mon|Tues|Wednes|Thurs|Fri|Satur|Sun)day\b"),
+)
+
+llm_cache_calls = registry.counter(
+    "playground_llm_cache_total",
+    "Toolbox model calls by record/replay cache result (hit, recorded).",
+)
+
+
+class LLMCacheMiss(Exception):
+    """A model call has no recorded response in replay mode."""
+
+
+def _strip_datetimes(text: str) -> str:
+    """Replace dates and times so they don't change the key."""
+    for pattern in _DATETIME_PATTERNS:
+        text = pattern.sub("<datetime>", text)
+    return text
+
+
+def _message_key(message: BaseMessage) -> dict[str, Any]:
+    """Get the parts of a message that matter to the model (no IDs)."""
+    content = message.content
+    if isinstance(message, SystemMessage):
+        content = _strip_datetimes(
+            content if isinstance(content, str) else json.dumps(content)
+        )
+    key: dict[str, Any] = {"type": message.type, "content": content}
+    if isinstance(message, AIMessage) and message.tool_calls:
+        key["tool_calls"] = [
+            {"name": call["name"], "args": call["args"], "id": call.get("id")}
+            for call in message.tool_calls
+        ]
+    for attr in ("tool_call_id", "name"):
+        value = getattr(message, attr, None)
+        if value:
+            key[attr] = value
+    return key
+
+
+def _tool_key(tool: Any) -> Any:
+    """Get the schema of a tool as sent to the model."""
+    try:
+        return convert_to_openai_tool(tool)
+    except Exception:
+        # Provider-specific tool dicts are passed through as-is
+        return tool if isinstance(tool, dict) else repr(tool)
+
+
+def _schema(response_format: Any) -> Any:
+    """Get the schema class of a response format (or strategy)."""
+    return getattr(response_format, "schema", response_format)
+
+
+def request_key(request: ModelRequest) -> str:
+    """Hash everything that determines a model's response to a request.
+
+    Args:
+        request: The model request.
+
+    Returns:
+        A hexadecimal SHA-256 key.
+    """
+    model = request.model
+    messages = list(request.messages)
+    if request.system_message is not None:
+        messages.insert(0, request.system_message)
+    schema = _schema(request.response_format)
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        schema = schema.model_json_schema()
+    payload = {
+        "version": FORMAT_VERSION,
+        "model": type(model).__name__,
+        "params": getattr(model, "_identifying_params", {}),
+        "settings": request.model_settings,
+        "tool_choice": request.tool_choice,
+        "tools": [_tool_key(t) for t in request.tools],
+        "response_format": schema,
+        "messages": [_message_key(m) for m in messages],
+    }
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """Model responses stored as JSON files, one per request key."""
+
+    def __init__(self, directory: Path) -> None:
+        """Initialize the cache.
+
+        Args:
+            directory: Directory holding the recorded responses.
+        """
+        self.directory = directory
+
+    def _path(self, key: str) -> Path:
+        """Get the file of a key (sharded by its first two characters)."""
+        return self.directory / key[:2] / f"{key}.json"
+
+    def load(self, key: str, request: ModelRequest) -> ModelResponse | None:
+        """Load a recorded response.
+
+        Args:
+            key: The request key.
+            request: The request (to rebuild its structured response).
+
+        Returns:
+            The recorded response, or None if there's none.
+        """
+        try:
+            data = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        structured = data.get("structured_response")
+        schema = _schema(request.response_format)
+        if (
+            structured is not None
+            and isinstance(schema, type)
+            and issubclass(schema, BaseModel)
+        ):
+            structured = schema.model_validate(structured)
+        return ModelResponse(
+            result=messages_from_dict(data["result"]),
+            structured_response=structured,
+        )
+
+    def save(self, key: str, request: ModelRequest, response: ModelResponse) -> None:
+        """Record a response (atomically, so concurrent writers are safe).
+
+        Args:
+            key: The request key.
+            request: The request (a summary is stored for inspection).
+            response: The model response.
+        """
+        structured = response.structured_response
+        if isinstance(structured, BaseModel):
+            structured = structured.model_dump(mode="json")
+        last = request.messages[-1] if request.messages else None
+        data = {
+            "version": FORMAT_VERSION,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "model": type(request.model).__name__,
+            "messages": len(request.messages),
+            "last_message": str(last.content)[:200] if last is not None else None,
+            "result": messages_to_dict(response.result),
+            "structured_response": structured,
+        }
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp, path)
@@ -0,0 +1,1046 @@
+"""Middleware for toolbox.
+
+Middleware in this module is added to the agent chain built by
+create_toolbox(). Each one intercepts tool calls to keep the message
+history (and therefore every subsequent LLM turn) small and fast.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from langchain.agents.middleware import AgentMiddleware, ModelResponse
+from langchain_core.messages import AIMessage, ToolMessage
+
+from playground_chatbot.config import config
+from playground_chatbot.telemetry import Span, span
+
+from .accounting import TOOL_SOURCES, TokenUsage, attribute_prompt, current_usage
+from .cache import api_cache, api_cache_key, api_cache_ttl, record_dependency
+from .compaction import (
+    _truncate,
+    compact_payload,
+    estimate_tokens,
+    payload_ref,
+    split_note,
+)
+from .deadline import current_deadline, deadline_events
+from .limits import CircuitOpen, Throttled, get_guard, is_upstream_failure
+from .llm_cache import (
+    MODES,
+    LLMCacheMiss,
+    LLMResponseCache,
+    llm_cache_calls,
+    request_key,
+)
+from .prefetch import prefetcher
+from .progress import current_reporter, quiet_model_calls, tool_detail
+from .refresher import refresher
+from .sessions import SessionStore, session_store
+from .tiering import FAST_MODEL_ERRORS, invalid_tool_calls, model_tiers
+from .tool_calls import current_tool_calls
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from langchain.agents.middleware import ModelRequest
+    from langchain_core.language_models import BaseChatModel
+    from langgraph.prebuilt.tool_node import ToolCallRequest
+    from langgraph.types import Command
+
+logger = logging.getLogger(__name__)
+
+
+def _session_id(request: ToolCallRequest) -> str:
+    """Get the conversation (thread) ID of a tool call, or 'default'."""
+    runtime_config = getattr(request.runtime, "config", None) or {}
+    configurable = runtime_config.get("configurable") or {}
+    return str(configurable.get("thread_id") or "default")
+
+
+def _call_key(tool_call: dict[str, Any]) -> str:
+    """Build a stable key for a tool call from its name and arguments."""
+    args = json.dumps(tool_call.get("args") or {}, sort_keys=True, default=str)
+    return f"{tool_call['name']}:{args}"
+
+
+class SessionMemoMiddleware(AgentMiddleware):
+    """Memoize discovery tools (skills and facts) per conversation.
+
+    Repeated calls within a session are served from memory without any disk
+    work. If the same call was already answered in the current message
+    history, a short marker pointing to that turn is returned instead of
+    repeating the content.
+
+    Memoized results live in the bounded session store (see sessions.py),
+    which drops them first when a session needs to free memory.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore | None = None,
+        tool_names: tuple[str, ...] = (
+            "list_skills",
+            "list_facts",
+            "read_skill",
+            "read_fact",
+        ),
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            store: Where results are memoized.
+                If None, uses the shared session store.
+            tool_names: Names of the tools to memoize.
+        """
+        super().__init__()
+        self.store = store if store is not None else session_store
+        self.tool_names = tool_names
+
+    @classmethod
+    def clear(cls) -> None:
+        """Forget all memoized results (e.g., after skills or facts change)."""
+        session_store.clear()
+
+    def _lookup(self, session: str, key: str) -> str | None:
+        """Get a memoized result for a session."""
+        entry = self.store.get(session, key)
+        return None if entry is None else entry.content
+
+    def _store(self, session: str, key: str, content: str) -> None:
+        """Memoize a result for a session."""
+        self.store.put(session, key, content)
+
+    @staticmethod
+    def _previous_turn(request: ToolCallRequest, key: str) -> int | None:
+        """Find the turn in the current history where this call was answered.
+
+        Args:
+            request: The tool call request (with the agent state).
+            key: The call key of the current tool call.
+
+        Returns:
+            The 1-based turn number, or None if not found in the history.
+        """
+        messages = request.state.get("messages", []) if request.state else []
+        answered = {
+            msg.tool_call_id
+            for msg in messages
+            if isinstance(msg, ToolMessage) and msg.status != "error"
+        }
+        turn = 0
+        for msg in messages:
+            if not isinstance(msg, AIMessage):
+                continue
+            turn += 1
+            for call in msg.tool_calls:
+                if call["id"] == request.tool_call["id"]:
+                    continue
+                if call["id"] in answered and _call_key(call) == key:
+                    return turn
+        return None
+
+    def _from_memo(self, request: ToolCallRequest) -> ToolMessage | None:
+        """Answer a tool call from the history or the session memo."""
+        tool_call = request.tool_call
+        key = _call_key(tool_call)
+
+        turn = self._previous_turn(request, key)
+        if turn is not None:
+            return ToolMessage(
+                content=f"[Already provided above (turn {turn}). Reuse that result.]",
+                tool_call_id=tool_call["id"],
+                name=tool_call["name"],
+            )
+
+        content = self._lookup(_session_id(request), key)
+        if content is None:
+            return None
+        return ToolMessage(
+            content=content,
+            tool_call_id=tool_call["id"],
+            name=tool_call["name"],
+        )
+
+    def _remember(self, request: ToolCallRequest, result: Any) -> None:
+        """Memoize a successful tool result."""
+        if not isinstance(result, ToolMessage) or result.status == "error":
+            return
+        if not isinstance(result.content, str) or result.content.startswith("Error"):
+            return
+        self._store(_session_id(request), _call_key(request.tool_call), result.content)
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Serve repeated discovery calls from memory."""
+        if request.tool_call["name"] not in self.tool_names:
+            return handler(request)
+        cached = self._from_memo(request)
+        if cached is not None:
+            return cached
+        result = handler(request)
+        self._remember(request, result)
+        return result
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Serve repeated discovery calls from memory."""
+        if request.tool_call["name"] not in self.tool_names:
+            return await handler(request)
+        cached = self._from_memo(request)
+        if cached is not None:
+            return cached
+        result = await handler(request)
+        self._remember(request, result)
+        return result
+
+
+class ToolResultCompactionMiddleware(AgentMiddleware):
+    """Enforce a per-result token budget on API and file tool results.
+
+    Results are projected to the field allowlist configured for their
+    endpoint, long arrays are collapsed to counts plus samples, and the
+    rest is truncated. When a result is compacted, the full payload is
+    stored and a reference is appended so the agent can retrieve it with
+    get_full_result(). Results of the services in table_services have
+    their uniform lists encoded as tables.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int | None = None,
+        sample_size: int | None = None,
+        field_allowlists: dict[str, list[str]] | None = None,
+        tool_names: tuple[str, ...] = ("api_get", "fetch_file"),
+        table_services: list[str] | None = None,
+    ) -> None:
+        """Initialize the middleware.
+
+        Args:
+            max_tokens: Per-result token budget.
+                If None, uses the config value (default: 2000).
+            sample_size: Items kept when collapsing long arrays.
+                If None, uses the config value (default: 3).
+            field_allowlists: Mapping of endpoint patterns to allowed fields.
+                If None, uses the config value (default: no projection).
+            tool_names: Names of the tools whose results are compacted.
+            table_services: API services whose results use table encoding.
+                If None, uses the config value (default: none).
+        """
+        super().__init__()
+        self.max_tokens = (
+            max_tokens if max_tokens is not None else config.tool_result_max_tokens
+        )
+        self.sample_size = (
+            sample_size if sample_size is not None else config.tool_result_array_sample
+        )
+        self.field_allowlists = (
+            field_allowlists
+            if field_allowlists is not None
+            else config.tool_result_fields
+        )
+        self.tool_names = tool_names
+        self.table_services = set(
+            table_services if table_services is not None else config.tool_result_tables
+        )
+
+    def _summarize(self, content: str) -> str:
+        """Summarize a full payload when its session needs to free memory."""
+        summary, _ = compact_payload(
+            content,
+            max_tokens=config.session_summary_tokens,
+            sample_size=1,
+        )
+        return summary
+
+    def _compact(self, request: ToolCallRequest, result: Any) -> Any:
+        """Compact a tool result if it's a text ToolMessage over budget."""
+        if not isinstance(result, ToolMessage) or not isinstance(result.content, str):
+            return result
+        if result.status == "error":
+            return result
+
+        args = request.tool_call["args"]
+        endpoint = str(args.get("endpoint", ""))
+        payload, inner_note = split_note(result.content)
+        content, compacted = compact_payload(
+            payload,
+            endpoint=endpoint,
+            max_tokens=self.max_tokens,
+            sample_size=self.sample_size,
+            field_allowlists=self.field_allowlists,
+            tables=request.tool_call["name"] == "api_get"
+            and args.get("service") in self.table_services,
+        )
+        if not compacted:
+            if content == payload:
+                return result
+            # Only re-encoded (tables), nothing to retrieve
+            return result.model_copy(update={"content": content + inner_note})
+
+        ref = payload_ref(payload)
+        session_store.put(_session_id(request), ref, payload, summarize=self._summarize)
+        note = (
+            f"\n[Result compacted to fit the context budget. "
+            f'Full result: get_full_result(ref="{ref}")]'
+        )
+        return result.model_copy(update={"content": content + inner_note + note})
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Compact the result of a synchronous tool call."""
+        result = handler(request)
+        if request.tool_call["name"] not in self.tool_names:
+            return result
+        return self._compact(request, result)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Compact the result of an asynchronous tool call."""
+        result = await handler(request)
+        if request.tool_call["name"] not in self.tool_names:
+            return result
+        return self._compact(request, result)
+
+
+class ApiCacheMiddleware(AgentMiddleware):
+    """Cache api_get results with per-endpoint TTLs.
+
+    Every API result used by the run is recorded as a dependency of the
+    final answer (see cache.answer_cache). Results that can't be cached,
+    like failed calls or fetch_file downloads, make the answer uncacheable.
+    """
+
+    def __init__(self, serve_cached: bool | None = None) -> None:
+        """Initialize the middleware.
+
+        Args:
+            serve_cached: Whether to answer api_get calls from the cache.
+                If False, results are only recorded (for answer invalidation).
+                If None, uses the config value (default: True).
+        """
+        super().__init__()
+        self.serve_cached = (
+            serve_cached if serve_cached is not None else config.api_cache
+        )
+
+    def _from_cache(self, request: ToolCallRequest) -> ToolMessage | None:
+        """Answer an api_get call from the cache, if fresh."""
+        if not self.serve_cached:
+            return None
+        key = api_cache_key(request.tool_call["args"])
+        entry = api_cache.get(key)
+        if entry is None:
+            return None
+        record_dependency(key, entry)
+        prefetcher.claim(key, entry)
+        content = entry.value
+        if config.api_refresh and refresher.covers(key):
+            content += f"\n[Snapshot from {entry.age:.0f}s ago]"
+        return ToolMessage(
+            content=content,
+            tool_call_id=request.tool_call["id"],
+            name=request.tool_call["name"],
+        )
+
+    def _store(self, request: ToolCallRequest, result: Any) -> None:
+        """Cache a successful api_get result and record it as a dependency."""
+        args = request.tool_call["args"]
+        key = api_cache_key(args)
+        if (
+            not isinstance(result, ToolMessage)
+            or result.status == "error"
+            or not isinstance(result.content, str)
+            or result.content.startswith("Error")
+        ):
+            record_dependency(key, None)
+            return
+        ttl = api_cache_ttl(str(args.get("endpoint", "")))
+        record_dependency(key, api_cache.set(key, result.content, ttl))
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Serve api_get calls from the cache and record dependencies."""
+        name = request.tool_call["name"]
+        if name == "fetch_file":
+            record_dependency(name, None)
+        if name != "api_get":
+            return handler(request)
+        cached = self._from_cache(request)
+        if cached is not None:
+            return cached
+        result = handler(request)
+        self._store(request, result)
+        return result
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Serve api_get calls from the cache and record dependencies."""
+        name = request.tool_call["name"]
+        if name == "fetch_file":
+            record_dependency(name, None)
+        if name != "api_get":
+            return await handler(request)
+        if self.serve_cached:
+            # A speculative fetch of this call may be about to complete
+            await prefetcher.wait(api_cache_key(request.tool_call["args"]))
+        cached = self._from_cache(request)
+        if cached is not None:
+            return cached
+        result = await handler(request)
+        self._store(request, result)
+        return result
+
+
+class ApiLimitsMiddleware(AgentMiddleware):
+    """Apply the per-service rate, concurrency and circuit limits to api_get.
+
+    Added after the API cache, so cached results don't count against the
+    limits. Refused calls return a "Throttled" or "Circuit open" message at
+    once, so the agent can adapt instead of waiting. The toolbox runs
+    asynchronously, so only the async hook applies the limits.
+    """
+
+    @staticmethod
+    def _succeeded(result: ToolMessage | Command) -> bool:
+        """Whether the upstream answered (client errors count as answers)."""
+        if not isinstance(result, ToolMessage):
+            return True
+        content = result.content if isinstance(result.content, str) else ""
+        if result.status != "error" and not content.startswith("Error"):
+            return True
+        return not is_upstream_failure(content)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Run an api_get call within its service's limits."""
+        if request.tool_call["name"] != "api_get":
+            return await handler(request)
+        guard = get_guard(str(request.tool_call["args"].get("service", "")))
+        try:
+            async with guard.call():
+                result = await handler(request)
+        except (Throttled, CircuitOpen) as e:
+            return ToolMessage(
+                content=f"[{e}]",
+                tool_call_id=request.tool_call["id"],
+                name=request.tool_call["name"],
+                status="error",
+            )
+        guard.record(success=self._succeeded(result))
+        return result
+
+
+class SkillPrefetchMiddleware(AgentMiddleware):
+    """Prefetch the API calls referenced by a skill when it's read.
+
+    The fetches run in the background while the model decides its next
+    step, so the api_get calls that follow are served from the cache.
+    """
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Pass through (prefetching needs an event loop)."""
+        return handler(request)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Start prefetching after a skill is read successfully."""
+        result = await handler(request)
+        if (
+            request.tool_call["name"] == "read_skill"
+            and isinstance(result, ToolMessage)
+            and result.status != "error"
+        ):
+            prefetcher.schedule(str(request.tool_call["args"].get("path", "")))
+        return result
+
+
+class TokenAccountingMiddleware(AgentMiddleware):
+    """Attribute the prompt tokens of every model call to their sources.
+
+    Usage is accumulated in the request's TokenUsage (see accounting). Once
+    the request is over its token budget, tools that add context (skills,
+    facts, API results) are refused, and earlier tool results are shortened
+    before being sent to the model again.
+    """
+
+    # Tokens kept of each earlier tool result once over budget
+    SHORTENED_RESULT_TOKENS = 150
+
+    def __init__(self, budget: int | None = None, show: bool = False) -> None:
+        """Initialize the middleware.
+
+        Args:
+            budget: Per-request prompt token budget (None for no budget).
+            show: Whether to log the breakdown after every model call (debug).
+        """
+        super().__init__()
+        self.budget = budget
+        self.show = show
+        # Used when the agent runs outside run_toolbox()
+        self._fallback = TokenUsage(budget=budget)
+
+    def _usage(self) -> TokenUsage:
+        """Get the usage of the current request."""
+        usage = current_usage.get()
+        if usage is None:
+            return self._fallback
+        if usage.budget is None:
+            usage.budget = self.budget
+        return usage
+
+    def _shorten(self, messages: list[Any]) -> list[Any]:
+        """Shorten the tool results before the model's last turn."""
+        last_ai = max(
+            (i for i, m in enumerate(messages) if isinstance(m, AIMessage)),
+            default=-1,
+        )
+        shortened = []
+        for i, message in enumerate(messages):
+            if (
+                i < last_ai
+                and isinstance(message, ToolMessage)
+                and isinstance(message.content, str)
+                and estimate_tokens(message.content) > self.SHORTENED_RESULT_TOKENS
+            ):
+                content = _truncate(message.content, self.SHORTENED_RESULT_TOKENS)
+                message = message.model_copy(
+                    update={"content": content + " [shortened: token budget]"}
+                )
+            shortened.append(message)
+        return shortened
+
+    def _prepare(self, request: ModelRequest) -> ModelRequest:
+        """Shorten the prompt if over budget and account for its tokens."""
+        usage = self._usage()
+        if usage.exceeded:
+            request = request.override(messages=self._shorten(request.messages))
+        breakdown = attribute_prompt(
+            request.system_message, request.messages, request.tools
+        )
+        usage.add(breakdown)
+        if self.show:
+            parts = ", ".join(f"{k} {v:,}" for k, v in breakdown.most_common())
+            logger.debug(
+                "[Tokens] call %d: %s (%s); request total %s",
+                usage.model_calls,
+                f"{sum(breakdown.values()):,}",
+                parts,
+                f"{usage.total:,}",
+            )
+        return request
+
+    def _refusal(self, request: ToolCallRequest) -> ToolMessage | None:
+        """Refuse a context-expanding tool call when over budget."""
+        usage = self._usage()
+        if not usage.exceeded or request.tool_call["name"] not in TOOL_SOURCES:
+            return None
+        return ToolMessage(
+            content=(
+                f"[Token budget exceeded: {usage.total:,} of {usage.budget:,} "
+                "tokens used. Don't fetch more data; answer now with the "
+                "information you already have.]"
+            ),
+            tool_call_id=request.tool_call["id"],
+            name=request.tool_call["name"],
+        )
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        """Account for (and possibly shorten) a synchronous model call."""
+        return handler(self._prepare(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        """Account for (and possibly shorten) an asynchronous model call."""
+        return await handler(self._prepare(request))
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Refuse context-expanding tool calls when over budget."""
+        return self._refusal(request) or handler(request)
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Refuse context-expanding tool calls when over budget."""
+        return self._refusal(request) or await handler(request)
+
+
+class ModelTieringMiddleware(AgentMiddleware):
+    """Send tool-calling turns to a fast model (see tiering.py).
+
+    Each turn first goes to the fast model without the response format.
+    Its tool calls are used if they are all valid, and so is its answer
+    when the agent has no response format. Otherwise (it wants to write the
+    structured answer, makes invalid tool calls, or fails with one of
+    FAST_MODEL_ERRORS) the main model redoes the turn with the full
+    request. Added before the record/replay cache, so recorded turns are
+    keyed by the model that produced them.
+    """
+
+    def __init__(self, fast_model: BaseChatModel) -> None:
+        """Initialize the middleware.
+
+        Args:
+            fast_model: The model for tool-calling turns.
+        """
+        super().__init__()
+        self.fast_model = fast_model
+
+    def _fast_request(self, request: ModelRequest) -> ModelRequest:
+        """Build the fast model's version of a request."""
+        return request.override(model=self.fast_model, response_format=None)
+
+    @staticmethod
+    def _escalation(
+        request: ModelRequest, response: ModelResponse
+    ) -> tuple[str, str] | None:
+        """Get the reason the main model must redo a turn, if any.
+
+        Returns:
+            Tuple of (reason, detail), or None if the fast turn can be used.
+        """
+        message = next(
+            (m for m in reversed(response.result) if isinstance(m, AIMessage)), None
+        )
+        if message is None:
+            return "no_message", "no AI message in the response"
+        if not message.tool_calls and not message.invalid_tool_calls:
+            if request.response_format is None:
+                return None
+            return "final_answer", "the structured answer is the main model's"
+        problems = invalid_tool_calls(message, request.tools)
+        if problems:
+            return "invalid_tool_call", "; ".join(problems)
+        return None
+
+    def _use_fast(self, response: ModelResponse) -> ModelResponse:
+        """Count a turn answered by the fast model."""
+        model_tiers.inc(tier="fast")
+        return response
+
+    @staticmethod
+    def _escalate(reason: str, detail: str) -> None:
+        """Count and log a turn the main model has to redo."""
+        model_tiers.inc(tier="main", reason=reason)
+        logger.info(
+            "Model tiering: main model redoes the turn (%s: %s)", reason, detail
+        )
+
+    @staticmethod
+    def _unexpected(error: Exception) -> None:
+        """Log a fast model error that isn't retried (it's raised)."""
+        logger.warning(
+            "Model tiering: unexpected fast model error, not retried (%s: %s)",
+            type(error).__name__,
+            error,
+        )
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        """Try a synchronous turn with the fast model, escalating if needed."""
+        # Its output may be thrown away, so it isn't streamed as the answer
+        quiet = quiet_model_calls.set(True)
+        try:
+            response = handler(self._fast_request(request))
+        except FAST_MODEL_ERRORS as e:
+            escalation = ("error", f"{type(e).__name__}: {e}")
+        except Exception as e:
+            self._unexpected(e)
+            raise
+        else:
+            escalation = self._escalation(request, response)
+            if escalation is None:
+                return self._use_fast(response)
+        finally:
+            quiet_model_calls.reset(quiet)
+        self._escalate(*escalation)
+        return handler(request)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        """Try an asynchronous turn with the fast model, escalating if needed."""
+        # Its output may be thrown away, so it isn't streamed as the answer
+        quiet = quiet_model_calls.set(True)
+        try:
+            response = await handler(self._fast_request(request))
+        except FAST_MODEL_ERRORS as e:
+            escalation = ("error", f"{type(e).__name__}: {e}")
+        except Exception as e:
+            self._unexpected(e)
+            raise
+        else:
+            escalation = self._escalation(request, response)
+            if escalation is None:
+                return self._use_fast(response)
+        finally:
+            quiet_model_calls.reset(quiet)
+        self._escalate(*escalation)
+        return await handler(request)
+
+
+class LLMCacheMiddleware(AgentMiddleware):
+    """Record model responses and replay them (see llm_cache.py).
+
+    Added right before the telemetry middleware, so the key covers the
+    request exactly as the model would get it (after budget shortening),
+    and replayed calls don't produce model spans.
+    """
+
+    def __init__(self, mode: str | None = None, directory: Path | None = None) -> None:
+        """Initialize the middleware.
+
+        Args:
+            mode: 'record' or 'replay' ('passthrough' disables the cache).
+                If None, uses the config value (default: passthrough).
+            directory: Directory of the recorded responses.
+                If None, uses the config value (default: .llm_cache).
+        """
+        super().__init__()
+        self.mode = mode or config.llm_cache_mode
+        if self.mode not in MODES:
+            raise ValueError(f"Unknown llm_cache_mode '{self.mode}', use {MODES}")
+        self.cache = LLMResponseCache(directory or config.llm_cache_path)
+
+    def _lookup(self, request: ModelRequest) -> tuple[str, ModelResponse | None]:
+        """Get the key of a request and its recorded response, if any."""
+        key = request_key(request)
+        response = self.cache.load(key, request)
+        if response is not None:
+            llm_cache_calls.inc(result="hit")
+        elif self.mode == "replay":
+            raise LLMCacheMiss(
+                f"No recorded model response for this call (key {key[:12]}). "
+                "Run with llm_cache_mode: record to record it."
+            )
+        return key, response
+
+    def _record(
+        self, key: str, request: ModelRequest, response: ModelResponse | AIMessage
+    ) -> ModelResponse:
+        """Record a model response."""
+        if isinstance(response, AIMessage):
+            response = ModelResponse(result=[response])
+        self.cache.save(key, request, response)
+        llm_cache_calls.inc(result="recorded")
+        return response
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        """Replay or record a synchronous model call."""
+        if self.mode == "passthrough":
+            return handler(request)
+        key, cached = self._lookup(request)
+        if cached is not None:
+            return cached
+        return self._record(key, request, handler(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        """Replay or record an asynchronous model call."""
+        if self.mode == "passthrough":
+            return await handler(request)
+        key, cached = self._lookup(request)
+        if cached is not None:
+            return cached
+        return self._record(key, request, await handler(request))
+
+
+class ProgressMiddleware(AgentMiddleware):
+    """Report tool calls and model steps while the agent runs.
+
+    Events go to the reporter set for the run by the supervisor (see
+    progress.py); without one, calls pass through untouched. The toolbox
+    runs asynchronously, so only the async hooks report.
+    """
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Report a tool call when it starts and when it finishes."""
+        reporter = current_reporter.get()
+        if reporter is None:
+            return await handler(request)
+        name = request.tool_call["name"]
+        detail = tool_detail(name, request.tool_call.get("args") or {})
+        await reporter.emit("tool_start", f"→ {detail}", tool=name)
+        start = time.perf_counter()
+        result = await handler(request)
+        seconds = time.perf_counter() - start
+        failed = isinstance(result, ToolMessage) and result.status == "error"
+        await reporter.emit(
+            "tool_end",
+            f"{'✗' if failed else '✓'} {detail} ({seconds:.1f}s)",
+            tool=name,
+            seconds=seconds,
+            error=failed,
+        )
+        return result
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        """Report each model step."""
+        reporter = current_reporter.get()
+        if reporter is not None:
+            step = 1 + sum(isinstance(m, AIMessage) for m in request.messages)
+            await reporter.emit("thinking", f"thinking (step {step})", step=step)
+        return await handler(request)
+
+
+class DeadlineMiddleware(AgentMiddleware):
+    """Keep tool calls within the request's deadline (see deadline.py).
+
+    Added right after the progress middleware, so cached results count as
+    gathered data and the progress shows skipped calls as failed. Without
+    a deadline for the run, calls pass through untouched.
+    """
+
+    @staticmethod
+    def _skipped(request: ToolCallRequest, reason: str) -> ToolMessage:
+        """Build the result of a tool call left undone."""
+        return ToolMessage(
+            content=(
+                f"[Skipped: {reason}. Don't call more tools; answer now with "
+                "the information you already have, and say what's missing.]"
+            ),
+            tool_call_id=request.tool_call["id"],
+            name=request.tool_call["name"],
+            status="error",
+        )
+
+    def _before(self, request: ToolCallRequest) -> ToolMessage | None:
+        """Skip a tool call once the answer reserve has started."""
+        deadline = current_deadline.get()
+        if deadline is None:
+            return None
+        name = request.tool_call["name"]
+        detail = tool_detail(name, request.tool_call.get("args") or {})
+        if deadline.wrapping_up:
+            deadline.skip(request.tool_call["id"], detail)
+            deadline_events.inc(outcome="wrap_up")
+            return self._skipped(request, "the time limit is almost reached")
+        deadline.start(request.tool_call["id"], detail)
+        return None
+
+    @staticmethod
+    def _after(request: ToolCallRequest, result: ToolMessage | Command) -> None:
+        """Record the result of a finished tool call."""
+        deadline = current_deadline.get()
+        if deadline is None:
+            return
+        content = None
+        if isinstance(result, ToolMessage) and result.status != "error":
+            content = str(result.content)
+        deadline.finish(request.tool_call["id"], request.tool_call["name"], content)
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Skip a synchronous tool call once out of time (it can't be bounded)."""
+        skipped = self._before(request)
+        if skipped is not None:
+            return skipped
+        result = handler(request)
+        self._after(request, result)
+        return result
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Bound an asynchronous tool call by the time left for tools."""
+        skipped = self._before(request)
+        if skipped is not None:
+            return skipped
+        deadline = current_deadline.get()
+        if deadline is None:
+            return await handler(request)
+        try:
+            result = await asyncio.wait_for(handler(request), deadline.tool_time())
+        except TimeoutError:
+            deadline.skip(
+                request.tool_call["id"],
+                deadline.running.get(request.tool_call["id"], ""),
+            )
+            deadline_events.inc(outcome="wrap_up")
+            return self._skipped(request, "timed out at the time limit")
+        self._after(request, result)
+        return result
+
+
+class ToolCallLogMiddleware(AgentMiddleware):
+    """Log the tool calls the run executed (see tool_calls.py).
+
+    Added right after the deadline middleware, so calls skipped for time
+    aren't logged while memoized and cached results are.
+    """
+
+    @staticmethod
+    def _record(request: ToolCallRequest, result: ToolMessage | Command) -> None:
+        """Record a finished tool call in the run's log."""
+        log = current_tool_calls.get()
+        if log is None:
+            return
+        failed = isinstance(result, ToolMessage) and result.status == "error"
+        log.record(request.tool_call["name"], ok=not failed)
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Log a tool call."""
+        result = handler(request)
+        self._record(request, result)
+        return result
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Log a tool call."""
+        result = await handler(request)
+        self._record(request, result)
+        return result
+
+
+class TelemetryMiddleware(AgentMiddleware):
+    """Time every tool call and model call in a span (see telemetry.span).
+
+    Added last, so it's the innermost middleware: spans measure the tool or
+    the model itself, and calls answered by other middleware (e.g., from the
+    API cache) don't produce tool spans.
+    """
+
+    @staticmethod
+    def _tool_result(current: Span, result: Any) -> None:
+        """Record the payload size and error status of a tool result."""
+        if not isinstance(result, ToolMessage):
+            return
+        content = result.content if isinstance(result.content, str) else ""
+        current.payload_bytes = len(content.encode("utf-8"))
+        if result.status == "error" or content.startswith("Error"):
+            current.error = "tool_error"
+
+    @staticmethod
+    def _model_name(request: ModelRequest) -> str:
+        """Get the model name of a model call."""
+        model = request.model
+        return str(
+            getattr(model, "model_name", None)
+            or getattr(model, "model", None)
+            or type(model).__name__
+        )
+
+    @staticmethod
+    def _prompt_bytes(request: ModelRequest) -> int:
+        """Estimate the size of the prompt sent to the model."""
+        return sum(len(str(m.content).encode("utf-8")) for m in request.messages)
+
+    def wrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], ToolMessage | Command],
+    ) -> ToolMessage | Command:
+        """Time a synchronous tool call."""
+        with span("tool", request.tool_call["name"]) as current:
+            result = handler(request)
+            self._tool_result(current, result)
+        return result
+
+    async def awrap_tool_call(
+        self,
+        request: ToolCallRequest,
+        handler: Callable[[ToolCallRequest], Awaitable[ToolMessage | Command]],
+    ) -> ToolMessage | Command:
+        """Time an asynchronous tool call."""
+        with span("tool", request.tool_call["name"]) as current:
+            result = await handler(request)
+            self._tool_result(current, result)
+        return result
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], ModelResponse],
+    ) -> ModelResponse:
+        """Time a synchronous model call."""
+        with span("model", self._model_name(request)) as current:
+            current.payload_bytes = self._prompt_bytes(request)
+            return handler(request)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        """Time an asynchronous model call."""
+        with span("model", self._model_name(request)) as current:
+            current.payload_bytes = self._prompt_bytes(request)
+            return await handler(request)
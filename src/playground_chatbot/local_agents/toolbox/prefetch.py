@@ -0,0 +1,203 @@
+"""Speculative prefetch of API calls referenced by skills.
+
+When the agent reads a skill whose body contains api_get(...) examples,
+it almost always issues those calls next. The skills are indexed once to
+extract those calls, and when a skill is read they are fetched in the
+background into the API cache with a short TTL. The agent's own api_get
+calls are then served from the cache (see ApiCacheMiddleware).
+
+Prefetch statistics (issued, completed, hits, wasted) are kept to measure
+how many speculative fetches are actually used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+import threading
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+from playground_chatbot.config import config
+
+from .cache import CacheEntry, api_cache, api_cache_key, api_cache_ttl
+from .tools import SKILLS_DIR, _read_file_content, call_api
+
+logger = logging.getLogger(__name__)
+
+# Matches literal calls like: api_get(service="devops", endpoint="/services/2")
+# Endpoints with placeholders (e.g., "/services/{id}") are ignored.
+API_CALL_PATTERN = re.compile(
+    r"api_get\(\s*service\s*=\s*[\"'](?P<service>[\w-]+)[\"']\s*,"
+    r"\s*endpoint\s*=\s*[\"'](?P<endpoint>/[^\"'{}]*)[\"']\s*\)"
+)
+
+
+def parse_api_calls(content: str) -> list[dict[str, str]]:
+    """Extract the literal api_get calls from a skill body.
+
+    Args:
+        content: The skill content.
+
+    Returns:
+        Unique calls in order of appearance, as api_get argument dicts.
+    """
+    calls: list[dict[str, str]] = []
+    for match in API_CALL_PATTERN.finditer(content):
+        call = {"service": match["service"], "endpoint": match["endpoint"]}
+        if call not in calls:
+            calls.append(call)
+    return calls
+
+
+def build_index(directory: Path) -> dict[str, list[dict[str, str]]]:
+    """Index the api_get calls referenced by every skill in a directory.
+
+    Args:
+        directory: The skills directory.
+
+    Returns:
+        Mapping of skill path (relative, POSIX style) to its api_get calls.
+    """
+    index: dict[str, list[dict[str, str]]] = {}
+    for file in directory.rglob("*.md"):
+        try:
+            _, content = _read_file_content(file)
+        except (OSError, ValueError) as e:
+            logger.debug("Skipping unreadable skill '%s': %s", file, e)
+            continue
+        calls = parse_api_calls(content)
+        if calls:
+            index[file.relative_to(directory).as_posix()] = calls
+    return index
+
+
+class Prefetcher:
+    """Speculatively fetch the API calls of skills into the API cache."""
+
+    def __init__(
+        self,
+        directory: Path,
+        max_calls: int = 5,
+        ttl: float = 20.0,
+    ) -> None:
+        """Initialize the prefetcher.
+
+        Args:
+            directory: The skills directory to index.
+            max_calls: Maximum number of calls prefetched per skill read.
+            ttl: Maximum lifetime of a prefetched result in seconds.
+        """
+        self.directory = directory
+        self.max_calls = max_calls
+        self.ttl = ttl
+        self._index: dict[str, list[dict[str, str]]] | None = None
+        self._inflight: dict[str, asyncio.Task[None]] = {}
+        self._unused: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = {"issued": 0, "completed": 0, "failed": 0, "hits": 0}
+
+    @property
+    def index(self) -> dict[str, list[dict[str, str]]]:
+        """The skill index, built on first use."""
+        if self._index is None:
+            self._index = build_index(self.directory)
+        return self._index
+
+    def schedule(self, skill_path: str) -> int:
+        """Start background fetches for the calls referenced by a skill.
+
+        Calls already cached or in flight are skipped. Must be called from
+        a running event loop; otherwise nothing is prefetched.
+
+        Args:
+            skill_path: The skill path as passed to read_skill().
+
+        Returns:
+            Number of fetches started.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return 0
+
+        path = PurePosixPath(skill_path.replace("\\", "/")).as_posix().lstrip("/")
+        started = 0
+        for args in self.index.get(path, [])[: self.max_calls]:
+            key = api_cache_key(args)
+            with self._lock:
+                if key in self._inflight or api_cache.get(key) is not None:
+                    continue
+                self._stats["issued"] += 1
+                self._inflight[key] = loop.create_task(self._fetch(key, args))
+            started += 1
+        return started
+
+    async def _fetch(self, key: str, args: dict[str, Any]) -> None:
+        """Fetch one call into the API cache."""
+        try:
+            content = await call_api(args)
+        except Exception as e:
+            logger.debug("Prefetch of %s failed: %s", key, e)
+            with self._lock:
+                self._stats["failed"] += 1
+            return
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+        ttl = min(self.ttl, api_cache_ttl(args["endpoint"]))
+        entry = api_cache.set(key, content, ttl)
+        with self._lock:
+            self._stats["completed"] += 1
+            self._unused[key] = entry.stored_at
+
+    async def wait(self, key: str) -> None:
+        """Wait for an in-flight prefetch of a call, if any.
+
+        Args:
+            key: The api_cache key of the call.
+        """
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            await asyncio.shield(task)
+
+    def claim(self, key: str, entry: CacheEntry) -> bool:
+        """Mark a prefetched result as used.
+
+        Args:
+            key: The api_cache key of the call served from the cache.
+            entry: The cache entry that was served.
+
+        Returns:
+            True if the entry came from a prefetch not used before.
+        """
+        with self._lock:
+            if self._unused.get(key) != entry.stored_at:
+                return False
+            del self._unused[key]
+            self._stats["hits"] += 1
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        """Get prefetch statistics.
+
+        Returns:
+            Dict with issued, completed, failed, hits, wasted and hit_ratio
+            (hits / completed prefetches).
+        """
+        with self._lock:
+            stats: dict[str, Any] = dict(self._stats)
+        stats["wasted"] = stats["completed"] - stats["hits"]
+        stats["hit_ratio"] = (
+            stats["hits"] / stats["completed"] if stats["completed"] else 0.0
+        )
+        return stats
+
+
+prefetcher = Prefetcher(
+    SKILLS_DIR,
+    max_calls=config.prefetch_max_calls,
+    ttl=config.prefetch_ttl,
+)
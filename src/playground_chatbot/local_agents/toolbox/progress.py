@@ -0,0 +1,257 @@
+"""Progress of toolbox runs, streamed through the supervisor to the client.
+
+When the supervisor calls the toolbox (see ToolboxAgent.as_tool), a
+ProgressReporter is set for the run. It forwards:
+
+- Tool calls as they start and finish (ProgressMiddleware)
+- Model steps ("thinking")
+- The final answer while it's being generated (AnswerStreamHandler). With
+  a structured response, only its response_text is streamed, as the model
+  writes it. In plain-text mode a turn's text is only known to be the
+  answer once the turn ends without tool calls, so it's sent then. Model
+  calls whose output may be discarded (see quiet_model_calls) are never
+  streamed
+
+Every event is written to the supervisor's LangGraph stream (the "custom"
+stream mode the interfaces show as progress) as a short text, and is also
+dispatched as a LangChain custom event named PROGRESS_EVENT with its data
+(for astream_events consumers).
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextvars import ContextVar
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import AsyncCallbackHandler, adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVENT = "playground_progress"
+
+# Arguments shown for a tool call, in order of preference
+_DETAIL_ARGS = ("endpoint", "path", "url", "expression", "ref")
+
+_RESPONSE_FIELD = re.compile(r'"response_text"\s*:\s*"')
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f"}
+
+
+def _get_writer() -> Callable[[Any], None] | None:
+    """Get the stream writer of the current LangGraph run, if any."""
+    try:
+        from langgraph.config import get_stream_writer
+
+        return get_stream_writer()
+    except (ImportError, RuntimeError, KeyError):
+        return None
+
+
+def tool_detail(name: str, args: dict[str, Any]) -> str:
+    """Describe a tool call in a few words (e.g., 'api_get /alerts').
+
+    Args:
+        name: The tool name.
+        args: The tool call arguments.
+
+    Returns:
+        The tool name and its most telling argument.
+    """
+    for arg in _DETAIL_ARGS:
+        value = args.get(arg)
+        if value:
+            text = str(value)
+            return f"{name} {text[:60]}{'…' if len(text) > 60 else ''}"
+    return name
+
+
+def partial_response_text(args: str) -> str | None:
+    """Extract response_text from (possibly incomplete) structured output JSON.
+
+    Args:
+        args: The arguments streamed so far for the structured output tool.
+
+    Returns:
+        The response text decoded so far, or None if it hasn't started.
+    """
+    match = _RESPONSE_FIELD.search(args)
+    if match is None:
+        return None
+    raw = args[match.end() :]
+    out = []
+    i = 0
+    while i < len(raw):
+        char = raw[i]
+        if char == '"':
+            break
+        if char != "\\":
+            out.append(char)
+            i += 1
+            continue
+        if i + 1 >= len(raw):
+            break
+        escaped = raw[i + 1]
+        if escaped == "u":
+            if i + 6 > len(raw):
+                break
+            out.append(chr(int(raw[i + 2 : i + 6], 16)))
+            i += 6
+            continue
+        out.append(_ESCAPES.get(escaped, escaped))
+        i += 2
+    return "".join(out)
+
+
+class ProgressReporter:
+    """Send progress events of a toolbox run to the supervisor's stream."""
+
+    def __init__(
+        self,
+        config: RunnableConfig | None = None,
+        agent: str = "toolbox",
+        min_interval: float = 0.1,
+    ) -> None:
+        """Initialize the reporter.
+
+        Must be created in the supervisor's context (e.g., in the tool that
+        calls the toolbox), so it writes to the supervisor's stream.
+
+        Args:
+            config: The supervisor's runnable configuration (for custom events).
+            agent: Name of the agent shown in the progress messages.
+            min_interval: Minimum seconds between two answer updates.
+        """
+        self.config = config
+        self.agent = agent
+        self.min_interval = min_interval
+        self.writer = _get_writer()
+        self._last_answer = 0.0
+
+    async def emit(self, kind: str, text: str, **data: Any) -> None:
+        """Send a progress event.
+
+        Args:
+            kind: Event kind ('tool_start', 'tool_end', 'thinking', 'answer').
+            text: Human-readable progress text.
+            **data: Extra event data (for custom event consumers).
+        """
+        if self.writer is not None:
+            try:
+                self.writer(f"{self.agent}: {text}")
+            except Exception:
+                logger.debug("Progress stream writer failed", exc_info=True)
+        event = {"agent": self.agent, "kind": kind, "text": text, **data}
+        try:
+            await adispatch_custom_event(PROGRESS_EVENT, event, config=self.config)
+        except RuntimeError:
+            # Not running inside a callback context (e.g., direct calls)
+            pass
+
+    async def answer(self, text: str, final: bool = False) -> None:
+        """Send the answer generated so far (throttled unless final)."""
+        now = time.monotonic()
+        if not final and now - self._last_answer < self.min_interval:
+            return
+        self._last_answer = now
+        await self.emit("answer", text, final=final)
+
+
+# Reporter of the toolbox run being processed (set by ToolboxAgent.as_tool)
+current_reporter: ContextVar[ProgressReporter | None] = ContextVar(
+    "toolbox_current_reporter", default=None
+)
+
+
+# Set while a model call runs whose output may be discarded (e.g., a fast
+# model turn that the main model may redo), so it isn't streamed
+quiet_model_calls: ContextVar[bool] = ContextVar(
+    "toolbox_quiet_model_calls", default=False
+)
+
+
+class AnswerStreamHandler(AsyncCallbackHandler):
+    """Forward the toolbox model's answer tokens to a progress reporter.
+
+    Having the tap_output_* methods makes it a streaming callback handler,
+    so chat models stream their responses when it's attached.
+    """
+
+    def __init__(
+        self, reporter: ProgressReporter, response_tool: str | None = None
+    ) -> None:
+        """Initialize the handler.
+
+        Args:
+            reporter: Where the answer is sent.
+            response_tool: Name of the structured response tool, whose
+                response_text is streamed (also when it comes as text). If
+                None (plain-text mode), the text of a turn that ends
+                without tool calls is sent.
+        """
+        self.reporter = reporter
+        self.response_tool = response_tool
+        self._quiet: set[UUID] = set()
+        self._text: dict[UUID, str] = {}
+        self._tool_turns: set[UUID] = set()
+        self._names: dict[tuple[UUID, int], str] = {}
+        self._args: dict[tuple[UUID, int], str] = {}
+
+    async def on_chat_model_start(
+        self, serialized: dict, messages: Any, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Skip model calls whose output may be discarded."""
+        if quiet_model_calls.get():
+            self._quiet.add(run_id)
+
+    async def on_llm_new_token(
+        self, token: str, *, chunk: Any = None, run_id: UUID, **kwargs: Any
+    ) -> None:
+        """Accumulate a token and send the structured answer so far."""
+        if run_id in self._quiet:
+            return
+        message = getattr(chunk, "message", None)
+        tool_chunks = getattr(message, "tool_call_chunks", None) or []
+        if tool_chunks:
+            self._tool_turns.add(run_id)
+        elif token:
+            self._text[run_id] = self._text.get(run_id, "") + token
+        if self.response_tool is None:
+            return
+        # Native structured output comes as text, tool strategies as a call
+        answer = partial_response_text(self._text.get(run_id, ""))
+        for tool_chunk in tool_chunks:
+            key = (run_id, tool_chunk.get("index") or 0)
+            if tool_chunk.get("name"):
+                self._names[key] = tool_chunk["name"]
+            self._args[key] = self._args.get(key, "") + (tool_chunk.get("args") or "")
+            if self._names.get(key) == self.response_tool:
+                answer = partial_response_text(self._args[key]) or answer
+        if answer:
+            await self.reporter.answer(answer)
+
+    async def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Send a plain-text answer, and forget the tokens of the call."""
+        text = self._text.pop(run_id, None)
+        tool_turn = run_id in self._tool_turns
+        self._tool_turns.discard(run_id)
+        self._quiet.discard(run_id)
+        for key in [k for k in self._args if k[0] == run_id]:
+            del self._args[key]
+            self._names.pop(key, None)
+        if text and not tool_turn and self.response_tool is None:
+            await self.reporter.answer(text)
+
+    def tap_output_aiter(
+        self, run_id: UUID, output: AsyncIterator[Any]
+    ) -> AsyncIterator[Any]:
+        """Pass streamed output through unchanged."""
+        return output
+
+    def tap_output_iter(self, run_id: UUID, output: Iterator[Any]) -> Iterator[Any]:
+        """Pass streamed output through unchanged."""
+        return output
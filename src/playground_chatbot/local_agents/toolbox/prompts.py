@@ -45,6 +45,9 @@ You have access to these tools:
 - **read_skill**: Get detailed instructions for a specific task
 - **list_facts**: Discover available contextual information
 - **read_fact**: Get detailed information about a topic
+- **lookup_service**: Get a service's catalog record (owner, SLA, dependencies) by ID or slug
+- **impact_analysis**: Get what breaks if a service fails (blast radius, critical paths, combined SLA, live status)
+- **get_full_result**: Get the complete data of a compacted tool result
 
 ## CRITICAL: Mathematical Calculations
 
@@ -90,7 +93,7 @@ LLMs are notoriously unreliable at math. Never calculate in your head or provide
    - Skills tell you which tools to use and how to use them
 
 4. **Get context**: Use `list_facts()` and `read_fact()` for background information
-   - Example: If working with services, read the services catalog for details
+   - Example: If working with services, use `lookup_service()` for a service's owner, SLA or dependencies
    - Facts provide accurate, up-to-date information about the infrastructure
 
 5. **Execute the task**: Follow the skill instructions using the appropriate tools
@@ -105,6 +108,7 @@ LLMs are notoriously unreliable at math. Never calculate in your head or provide
 - **Always check for skills first** - Don't try to figure out the API on your own
 - **Use facts for accuracy** - Reference facts for names, policies, and technical details
 - **Skills over guessing** - If there's a skill for the task, follow it exactly
+- **Compacted results** - Large API results may show `_count`/`_sample` instead of full arrays; use `get_full_result(ref)` only when you really need the omitted data
 - **Be concise** - Summarize important information, don't overwhelm the user
 - **Verify with facts** - When mentioning services, people, or policies, check the relevant facts
 
@@ -0,0 +1,231 @@
+"""Deterministic fast-path recipes for toolbox.
+
+Skills can optionally declare an executable recipe in their frontmatter.
+When a user query matches one of the recipe's intent patterns, the recipe
+is executed directly (API calls, calculations and a response template)
+without any LLM planning. Queries that match no recipe, or recipes that
+fail, fall back to the toolbox agent.
+
+Example frontmatter:
+---
+name: check-service-health-api-gateway
+description: ...
+recipe:
+  intents:
+    - "^is (the )?api[ -]?gateway (healthy|up)$"
+  calls:
+    service: {service: devops, endpoint: /services/2}
+  compute:
+    sla: "'met' if service['uptime_percent'] >= 99.95 else 'missed'"
+  template: "API Gateway is {service[status]} (SLA {sla})."
+---
+
+Intent patterns are regular expressions matched against the normalized
+query (lowercase, no punctuation). Named groups are available to the call
+arguments, the calculations and the template. Calculations are evaluated
+with simpleeval, with call results and previous calculations as names.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from simpleeval import EvalWithCompoundTypes  # type: ignore[import-untyped]
+
+from .cache import normalize_query
+from .tools import (
+    SAFE_CONSTANTS,
+    SAFE_MATH_FUNCTIONS,
+    SKILLS_DIR,
+    _read_file_content,
+    cached_api_get,
+)
+
+logger = logging.getLogger(__name__)
+
+# Extra functions available to recipe calculations
+RECIPE_FUNCTIONS = {
+    **SAFE_MATH_FUNCTIONS,
+    "len": len,
+    "str": str,
+    "int": int,
+    "float": float,
+    "sorted": sorted,
+}
+
+
+class RecipeError(Exception):
+    """Raised when a recipe can't be executed (the agent is used instead)."""
+
+
+@dataclass
+class Recipe:
+    """An executable recipe declared in a skill's frontmatter."""
+
+    skill: str
+    path: str
+    intents: list[re.Pattern[str]]
+    calls: dict[str, dict[str, Any]]
+    template: str
+    compute: dict[str, str] = field(default_factory=dict)
+
+    def match(self, query: str) -> dict[str, str] | None:
+        """Match a normalized query against the recipe's intents.
+
+        Args:
+            query: The normalized user query.
+
+        Returns:
+            The named groups of the first matching intent, or None.
+        """
+        for pattern in self.intents:
+            match = pattern.search(query)
+            if match:
+                return {k: v for k, v in match.groupdict().items() if v is not None}
+        return None
+
+
+def _parse_recipe(frontmatter: dict[str, Any], path: str) -> Recipe | None:
+    """Build a recipe from a skill's frontmatter, if it declares one.
+
+    Args:
+        frontmatter: The parsed frontmatter of the skill.
+        path: The skill path relative to the skills directory.
+
+    Returns:
+        The recipe, or None if the skill has no (valid) recipe.
+    """
+    spec = frontmatter.get("recipe")
+    if not isinstance(spec, dict):
+        return None
+    try:
+        intents = [re.compile(str(p)) for p in spec.get("intents") or []]
+        calls = {str(k): dict(v) for k, v in (spec.get("calls") or {}).items()}
+        compute = {str(k): str(v) for k, v in (spec.get("compute") or {}).items()}
+        template = str(spec["template"])
+    except (KeyError, TypeError, ValueError, re.error) as e:
+        logger.warning("Ignoring invalid recipe in skill '%s': %s", path, e)
+        return None
+    if not intents:
+        return None
+    return Recipe(
+        skill=str(frontmatter.get("name", path)),
+        path=path,
+        intents=intents,
+        calls=calls,
+        compute=compute,
+        template=template,
+    )
+
+
+def load_recipes(directory: Path) -> list[Recipe]:
+    """Load the recipes declared by all skills in a directory.
+
+    Args:
+        directory: The skills directory.
+
+    Returns:
+        List of recipes, sorted by skill path.
+    """
+    recipes = []
+    for file in sorted(directory.rglob("*.md")):
+        try:
+            frontmatter, _ = _read_file_content(file)
+        except (OSError, ValueError) as e:
+            logger.debug("Skipping unreadable skill '%s': %s", file, e)
+            continue
+        recipe = _parse_recipe(frontmatter, str(file.relative_to(directory)))
+        if recipe is not None:
+            recipes.append(recipe)
+    return recipes
+
+
+_recipes: list[Recipe] | None = None
+
+
+def get_recipes() -> list[Recipe]:
+    """Get the recipes index, loading it from the skills directory on first use.
+
+    Returns:
+        List of recipes.
+    """
+    global _recipes
+    if _recipes is None:
+        _recipes = load_recipes(SKILLS_DIR)
+    return _recipes
+
+
+def reload_recipes() -> None:
+    """Forget the recipes index so it's reloaded on next use."""
+    global _recipes
+    _recipes = None
+
+
+def match_recipe(query: str) -> tuple[Recipe, dict[str, str]] | None:
+    """Find the recipe for a query.
+
+    Args:
+        query: The user query.
+
+    Returns:
+        Tuple of (recipe, named_groups), or None if no recipe matches.
+    """
+    normalized = normalize_query(query)
+    for recipe in get_recipes():
+        groups = recipe.match(normalized)
+        if groups is not None:
+            return recipe, groups
+    return None
+
+
+async def run_recipe(recipe: Recipe, groups: dict[str, str] | None = None) -> dict:
+    """Execute a recipe: API calls, calculations and response template.
+
+    Args:
+        recipe: The recipe to execute.
+        groups: Named groups from the intent match.
+
+    Returns:
+        Agent response dictionary (response, agent_name, tools_used).
+
+    Raises:
+        RecipeError: If any call, calculation or template substitution fails.
+    """
+    names: dict[str, Any] = {**SAFE_CONSTANTS, **(groups or {})}
+
+    try:
+        call_args = {
+            name: {
+                key: value.format_map(names) if isinstance(value, str) else value
+                for key, value in args.items()
+            }
+            for name, args in recipe.calls.items()
+        }
+        results = await asyncio.gather(
+            *(cached_api_get(**args) for args in call_args.values())
+        )
+        for name, content in zip(call_args, results):
+            names[name] = json.loads(content)
+
+        evaluator = EvalWithCompoundTypes(functions=RECIPE_FUNCTIONS, names=names)
+        for name, expression in recipe.compute.items():
+            names[name] = evaluator.eval(expression)
+
+        response = recipe.template.format_map(names).strip()
+    except Exception as e:
+        raise RecipeError(f"Recipe '{recipe.skill}' failed: {e}") from e
+
+    tools_used = (["api_get"] if recipe.calls else []) + (
+        ["calculate"] if recipe.compute else []
+    )
+    return {
+        "response": response,
+        "agent_name": "toolbox",
+        "tools_used": tools_used,
+    }
@@ -0,0 +1,163 @@
+"""Background refresh of hot DevOps API endpoints for toolbox.
+
+With api_refresh, the `web` server keeps a warm snapshot of a few
+endpoints (api_refresh_endpoints, /services and /alerts by default), so
+the first question after a quiet period doesn't pay the upstream latency:
+
+- Each endpoint is polled every api_refresh_interval seconds, with random
+  jitter so the polls don't line up
+- Results are stored in the API cache for api_refresh_max_age seconds, so
+  api_get serves them only while they're fresh enough, with a note giving
+  the snapshot's age
+- After an upstream error the endpoint's polling backs off exponentially
+  (up to api_refresh_max_backoff seconds), and recovers on the next success
+
+The refresher runs its own event loop in a daemon thread, next to the web
+server. With `web --workers`, only the first worker runs it; the others
+see its snapshots through the shared API cache.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+
+from playground_chatbot.config import config
+from playground_chatbot.telemetry import registry
+
+from .cache import api_cache, api_cache_key
+from .tools import call_api
+
+logger = logging.getLogger(__name__)
+
+refreshes = registry.counter(
+    "playground_api_refresh_total",
+    "Background refreshes of API endpoints, by endpoint and result.",
+)
+
+
+class ApiRefresher:
+    """Poll API endpoints in the background into the API cache."""
+
+    def __init__(
+        self,
+        endpoints: list[str],
+        service: str = "devops",
+        interval: float = 15.0,
+        jitter: float = 0.2,
+        max_age: float = 60.0,
+        max_backoff: float = 300.0,
+    ) -> None:
+        """Initialize the refresher.
+
+        Args:
+            endpoints: Endpoint paths to keep warm (e.g., '/services').
+            service: The registered API service.
+            interval: Seconds between polls of an endpoint.
+            jitter: Random variation of the interval, as a fraction of it.
+            max_age: Seconds a snapshot is served for.
+            max_backoff: Maximum seconds between polls after errors.
+        """
+        self.endpoints = endpoints
+        self.service = service
+        self.interval = interval
+        self.jitter = jitter
+        self.max_age = max_age
+        self.max_backoff = max_backoff
+        self.keys = {
+            api_cache_key({"service": service, "endpoint": e}) for e in endpoints
+        }
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stop: asyncio.Event | None = None
+
+    def covers(self, key: str) -> bool:
+        """Whether an api_cache key is kept warm by the refresher."""
+        return key in self.keys
+
+    def _delay(self, failures: int) -> float:
+        """Get the seconds until the next poll, with jitter and backoff."""
+        delay = min(self.interval * 2**failures, max(self.max_backoff, self.interval))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def refresh(self, endpoint: str) -> bool:
+        """Fetch an endpoint into the API cache.
+
+        Args:
+            endpoint: The endpoint path.
+
+        Returns:
+            Whether the fetch succeeded.
+        """
+        args = {"service": self.service, "endpoint": endpoint}
+        try:
+            content = await call_api(args)
+        except RuntimeError as e:
+            refreshes.inc(endpoint=endpoint, result="error")
+            logger.debug("Refresh of %s failed: %s", endpoint, e)
+            return False
+        api_cache.set(api_cache_key(args), content, self.max_age)
+        refreshes.inc(endpoint=endpoint, result="ok")
+        return True
+
+    async def _poll(self, endpoint: str, stop: asyncio.Event) -> None:
+        """Keep an endpoint warm until stopped."""
+        failures = 0
+        # Spread the first polls over the interval
+        delay = random.uniform(0, self.interval * self.jitter)
+        while True:
+            try:
+                await asyncio.wait_for(stop.wait(), delay)
+                return
+            except TimeoutError:
+                pass
+            if await self.refresh(endpoint):
+                if failures:
+                    logger.info("Refresh of %s recovered", endpoint)
+                failures = 0
+            else:
+                failures += 1
+                if failures == 1:
+                    logger.warning("Refresh of %s failed, backing off", endpoint)
+            delay = self._delay(failures)
+
+    async def run(self) -> None:
+        """Poll every endpoint until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        await asyncio.gather(*(self._poll(e, self._stop) for e in self.endpoints))
+
+    def start(self) -> None:
+        """Start polling in a daemon thread (with its own event loop)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.run()),
+            name="api-refresher",
+            daemon=True,
+        )
+        self._thread.start()
+        logger.info(
+            "Refreshing %s every %gs in the background",
+            ", ".join(self.endpoints),
+            self.interval,
+        )
+
+    def stop(self) -> None:
+        """Stop polling."""
+        if self._loop is not None and self._stop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+            self._thread = None
+
+
+refresher = ApiRefresher(
+    endpoints=config.api_refresh_endpoints,
+    interval=config.api_refresh_interval,
+    jitter=config.api_refresh_jitter,
+    max_age=config.api_refresh_max_age,
+    max_backoff=config.api_refresh_max_backoff,
+)
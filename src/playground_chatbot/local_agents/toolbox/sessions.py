@@ -0,0 +1,252 @@
+"""Bounded per-session memory for toolbox.
+
+Each conversation (session) keeps tool outputs between agent runs:
+
+- Memoized discovery results (list_skills, read_skill, read_fact, ...),
+  see SessionMemoMiddleware
+- Full api_get/fetch_file payloads behind compacted results, retrieved
+  with get_full_result(ref), see ToolResultCompactionMiddleware
+
+The store is bounded so long-running `web` deployments don't grow without
+limit:
+
+- At most max_sessions sessions (least recently used evicted)
+- Sessions idle for longer than idle_ttl are evicted
+- Each session holds at most max_bytes. Over the cap, and for outputs
+  older than the keep_full most recent ones, payloads are compacted into
+  summaries and memoized results (cheap to recompute) are dropped
+
+Live sessions and retained bytes are exported on /metrics.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from playground_chatbot.config import config
+from playground_chatbot.telemetry import registry
+
+# Seconds between sweeps for idle sessions
+SWEEP_INTERVAL = 10.0
+
+live_sessions = registry.gauge(
+    "playground_sessions",
+    "Sessions with tool outputs kept in memory.",
+)
+retained_bytes = registry.gauge(
+    "playground_session_bytes",
+    "Bytes of tool outputs kept in memory by all sessions.",
+)
+evicted_sessions = registry.counter(
+    "playground_session_evictions_total",
+    "Sessions evicted from memory, by reason (idle, capacity).",
+)
+compacted_outputs = registry.counter(
+    "playground_session_compactions_total",
+    "Tool outputs summarized or dropped to bound session memory, by action.",
+)
+
+
+@dataclass
+class SessionEntry:
+    """A tool output kept by a session."""
+
+    content: str
+    summarize: Callable[[str], str] | None = None
+    summarized: bool = False
+
+    @property
+    def size(self) -> int:
+        """Approximate memory used by the content, in bytes."""
+        return len(self.content)
+
+
+@dataclass
+class Session:
+    """Tool outputs of one session, oldest first."""
+
+    entries: OrderedDict[str, SessionEntry] = field(default_factory=OrderedDict)
+    size: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SessionStore:
+    """Thread-safe store of tool outputs per session, with memory bounds."""
+
+    def __init__(
+        self,
+        max_sessions: int = 128,
+        idle_ttl: float = 1800.0,
+        max_bytes: int = 1_000_000,
+        keep_full: int | None = None,
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            max_sessions: Maximum number of sessions (least recently used
+                evicted).
+            idle_ttl: Seconds without activity before a session is evicted
+                (0 = never).
+            max_bytes: Maximum bytes of tool outputs per session.
+            keep_full: Number of most recent outputs per session kept in
+                full (None = all, within max_bytes).
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.max_bytes = max_bytes
+        self.keep_full = keep_full
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._last_sweep = time.monotonic()
+
+    def get(self, session: str, key: str) -> SessionEntry | None:
+        """Get a tool output of a session.
+
+        Args:
+            session: The session (thread) ID.
+            key: The output key.
+
+        Returns:
+            The entry (check .summarized), or None if not kept.
+        """
+        with self._lock:
+            self._sweep()
+            current = self._sessions.get(session)
+            if current is None:
+                return None
+            current.last_used = time.monotonic()
+            self._sessions.move_to_end(session)
+            return current.entries.get(key)
+
+    def put(
+        self,
+        session: str,
+        key: str,
+        content: str,
+        summarize: Callable[[str], str] | None = None,
+    ) -> None:
+        """Keep a tool output for a session.
+
+        Args:
+            session: The session (thread) ID.
+            key: The output key.
+            content: The tool output.
+            summarize: Builds a summary when the output has to be compacted.
+                Outputs without one are dropped instead.
+        """
+        with self._lock:
+            self._sweep()
+            current = self._sessions.get(session)
+            if current is None:
+                current = self._sessions[session] = Session()
+            previous = current.entries.pop(key, None)
+            if previous is not None:
+                self._resize(current, -previous.size)
+            entry = SessionEntry(content=content, summarize=summarize)
+            current.entries[key] = entry
+            self._resize(current, entry.size)
+            current.last_used = time.monotonic()
+            self._sessions.move_to_end(session)
+            self._enforce(current)
+            while len(self._sessions) > self.max_sessions:
+                self._evict(next(iter(self._sessions)), "capacity")
+            self._export()
+
+    def drop(self, session: str) -> None:
+        """Forget all tool outputs of a session."""
+        with self._lock:
+            if session in self._sessions:
+                self._evict(session, None)
+                self._export()
+
+    def clear(self) -> None:
+        """Forget all sessions."""
+        with self._lock:
+            self._sessions.clear()
+            self._size = 0
+            self._export()
+
+    def stats(self) -> dict[str, int]:
+        """Get the number of live sessions and the bytes they retain."""
+        with self._lock:
+            return {"sessions": len(self._sessions), "bytes": self._size}
+
+    # -------------------------------------------------------------------------
+    # Bounds (called with the lock held)
+    # -------------------------------------------------------------------------
+
+    def _resize(self, current: Session, delta: int) -> None:
+        """Account for a change in a session's size."""
+        current.size += delta
+        self._size += delta
+
+    def _compact(self, current: Session, key: str, entry: SessionEntry) -> None:
+        """Summarize an output, or drop it if it can't be summarized."""
+        if entry.summarize is None:
+            del current.entries[key]
+            self._resize(current, -entry.size)
+            compacted_outputs.inc(action="dropped")
+            return
+        summary = entry.summarize(entry.content)
+        self._resize(current, len(summary) - entry.size)
+        entry.content = summary
+        entry.summarized = True
+        compacted_outputs.inc(action="summarized")
+
+    def _enforce(self, current: Session) -> None:
+        """Compact a session's oldest outputs to respect its bounds."""
+        if self.keep_full is not None:
+            full = [k for k, e in current.entries.items() if not e.summarized]
+            for key in full[: max(0, len(full) - self.keep_full)]:
+                self._compact(current, key, current.entries[key])
+        for key, entry in list(current.entries.items()):
+            if current.size <= self.max_bytes:
+                return
+            if not entry.summarized:
+                self._compact(current, key, entry)
+        # Still over the cap with only summaries left: drop the oldest
+        while current.size > self.max_bytes and current.entries:
+            _, entry = current.entries.popitem(last=False)
+            self._resize(current, -entry.size)
+            compacted_outputs.inc(action="dropped")
+
+    def _evict(self, session: str, reason: str | None) -> None:
+        """Remove a session."""
+        current = self._sessions.pop(session)
+        self._size -= current.size
+        if reason:
+            evicted_sessions.inc(reason=reason)
+
+    def _sweep(self) -> None:
+        """Evict idle sessions (at most every SWEEP_INTERVAL seconds)."""
+        now = time.monotonic()
+        if not self.idle_ttl or now - self._last_sweep < SWEEP_INTERVAL:
+            return
+        self._last_sweep = now
+        # Sessions are kept in least recently used order
+        while self._sessions:
+            session, current = next(iter(self._sessions.items()))
+            if now - current.last_used <= self.idle_ttl:
+                break
+            self._evict(session, "idle")
+        self._export()
+
+    def _export(self) -> None:
+        """Update the session metrics."""
+        live_sessions.set(len(self._sessions))
+        retained_bytes.set(self._size)
+
+
+session_store = SessionStore(
+    max_sessions=config.session_memo_max_sessions,
+    idle_ttl=config.session_idle_ttl,
+    max_bytes=config.session_max_bytes,
+    keep_full=(
+        config.summarization_keep_messages if config.summarization_enabled else None
+    ),
+)
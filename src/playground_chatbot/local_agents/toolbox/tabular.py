@@ -0,0 +1,119 @@
+"""Compact tabular encoding of API results for toolbox.
+
+Endpoints like /services, /alerts and /pipelines return arrays of objects
+with the same keys, and as JSON every key is repeated in every row, which
+roughly doubles the tokens a result costs in the context. For the services
+enabled in tool_result_tables, such lists are sent to the model as a
+header plus tab-separated rows instead (tabs shown as spaces):
+
+    [2 rows, tab-separated; empty cell = null or missing]
+    id  name          status   issues
+    1   web-frontend  healthy  []
+    2   api-gateway   warning  ["High latency detected"]
+
+A list is encoded when it has at least two objects with mostly the same
+keys (optional keys may be missing, which leaves their cell empty) and
+every value is a scalar or a list of scalars (written as compact JSON in
+its cell). Lists inside an object are encoded under their key; anything
+else (nested objects, irregular rows) stays JSON.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Rows a list needs to be worth a header
+MIN_ROWS = 2
+
+# Fraction of the columns every row must have (fewer makes it irregular)
+MIN_FILL = 0.5
+
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _is_cell(value: Any) -> bool:
+    """Whether a value fits in a table cell (a scalar or a list of scalars)."""
+    if isinstance(value, list):
+        return all(isinstance(item, _SCALARS) for item in value)
+    return isinstance(value, _SCALARS)
+
+
+def _columns(rows: list[dict[str, Any]]) -> list[str]:
+    """Get the keys of all rows, in the order they first appear."""
+    return list(dict.fromkeys(key for row in rows for key in row))
+
+
+def is_uniform(data: Any) -> bool:
+    """Whether a value is a list of flat objects with mostly the same keys.
+
+    Args:
+        data: A parsed JSON value.
+
+    Returns:
+        True if it can be encoded as a table.
+    """
+    if not isinstance(data, list) or len(data) < MIN_ROWS:
+        return False
+    if not all(isinstance(row, dict) and row for row in data):
+        return False
+    columns = len(_columns(data))
+    return all(
+        len(row) >= columns * MIN_FILL and all(_is_cell(v) for v in row.values())
+        for row in data
+    )
+
+
+def _cell(value: Any) -> str:
+    """Render a value as a table cell."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str):
+        return value.replace("\t", " ").replace("\r", " ").replace("\n", " ")
+    if isinstance(value, list):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return str(value)
+
+
+def encode_table(rows: list[dict[str, Any]]) -> str:
+    """Encode a uniform list (see is_uniform) as a header plus rows.
+
+    Args:
+        rows: The objects.
+
+    Returns:
+        The table, with a first line saying how to read it.
+    """
+    keys = _columns(rows)
+    lines = [f"[{len(rows)} rows, tab-separated; empty cell = null or missing]"]
+    lines.append("\t".join(_cell(key) for key in keys))
+    lines.extend("\t".join(_cell(row.get(key)) for key in keys) for row in rows)
+    return "\n".join(lines)
+
+
+def encode_tables(data: Any) -> str | None:
+    """Encode the uniform lists of a JSON value as tables.
+
+    Args:
+        data: A parsed JSON value (e.g., an api_get result).
+
+    Returns:
+        The encoded text, or None if there's nothing to encode (the value
+        is better sent as JSON).
+    """
+    if is_uniform(data):
+        return encode_table(data)
+    if not isinstance(data, dict):
+        return None
+    tables = {key: value for key, value in data.items() if is_uniform(value)}
+    if not tables:
+        return None
+    parts = []
+    rest = {key: value for key, value in data.items() if key not in tables}
+    if rest:
+        parts.append(json.dumps(rest, ensure_ascii=False, separators=(",", ":")))
+    for key, rows in tables.items():
+        parts.append(f"{key}: {encode_table(rows)}")
+    return "\n".join(parts)
@@ -0,0 +1,137 @@
+"""Model tiering for toolbox.
+
+Most turns of the tool loop are simple decisions ("call read_skill next"),
+so with model_tiering they go to a fast model (fast_model, or the
+classifier_model by default). The main model (llm_model) still writes the
+final structured answer, and takes over a turn whenever the fast model's
+output can't be used:
+
+- It wants to answer while the agent has a response format (the
+  structured answer is the main model's job). Without one, the fast
+  model's answer is used as is
+- It calls unknown tools, or with arguments that don't match their schema
+- Its call fails with a recoverable error (FAST_MODEL_ERRORS): unparsable
+  output, a timeout, or a connection or API error of the provider
+
+See ModelTieringMiddleware. The tier of every turn is exported on /metrics.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.tools import BaseTool
+from pydantic import BaseModel, ValidationError
+
+from playground_chatbot.telemetry import registry
+
+logger = logging.getLogger(__name__)
+
+
+def _optional_errors(*names: tuple[str, str]) -> tuple[type[Exception], ...]:
+    """Get the exception classes of optional provider packages.
+
+    Args:
+        *names: Tuples of (module, class name). Missing ones are skipped.
+
+    Returns:
+        The classes that could be imported.
+    """
+    errors = []
+    for module_name, class_name in names:
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:  # pragma: no cover - optional dependency
+            continue
+        error = getattr(module, class_name, None)
+        if isinstance(error, type) and issubclass(error, Exception):
+            errors.append(error)
+    return tuple(errors)
+
+
+# Errors of a fast model turn that the main model retries: unparsable
+# output, timeouts, connection errors and the provider's API errors (e.g.,
+# rate limits of the fast model). Anything else is logged and raised, so a
+# bug isn't hidden behind a second model call.
+FAST_MODEL_ERRORS: tuple[type[Exception], ...] = (
+    OutputParserException,
+    TimeoutError,
+    OSError,
+    *_optional_errors(
+        ("httpx", "TransportError"),
+        ("google.api_core.exceptions", "GoogleAPIError"),
+        ("google.genai.errors", "APIError"),
+        ("langchain_google_genai.chat_models", "ChatGoogleGenerativeAIError"),
+    ),
+)
+
+model_tiers = registry.counter(
+    "playground_model_tier_total",
+    "Toolbox model turns by tier (fast, main) and escalation reason.",
+)
+
+
+def fast_variant(model: BaseChatModel, name: str | None) -> BaseChatModel:
+    """Get a copy of a chat model that uses another model name.
+
+    The copy keeps the provider, credentials and settings of the original.
+
+    Args:
+        model: The main chat model.
+        name: The fast model name (None to use the main model).
+
+    Returns:
+        The fast model, or the main model if its name can't be changed.
+    """
+    if not name:
+        return model
+    for field in ("model", "model_name"):
+        if field in type(model).model_fields:
+            return model.model_copy(update={field: name})
+    logger.warning(
+        "Can't set the model name of %s; tiering uses the main model",
+        type(model).__name__,
+    )
+    return model
+
+
+def _tool_name(tool: dict[str, Any]) -> str | None:
+    """Get the name of a provider (dict) tool."""
+    return tool.get("name") or (tool.get("function") or {}).get("name")
+
+
+def invalid_tool_calls(message: AIMessage, tools: Sequence[Any]) -> list[str]:
+    """Find the tool calls of a model turn that can't be executed.
+
+    Args:
+        message: The model's message.
+        tools: The tools offered to the model.
+
+    Returns:
+        A description of each unusable call (empty if all are valid).
+    """
+    by_name = {t.name: t for t in tools if isinstance(t, BaseTool)}
+    provider_tools = {_tool_name(t) for t in tools if isinstance(t, dict)}
+    problems = [
+        f"{call.get('name')}: {call.get('error') or 'unparsable arguments'}"
+        for call in message.invalid_tool_calls
+    ]
+    for call in message.tool_calls:
+        tool = by_name.get(call["name"])
+        if tool is None:
+            if call["name"] not in provider_tools:
+                problems.append(f"{call['name']}: unknown tool")
+            continue
+        schema = tool.tool_call_schema
+        if isinstance(schema, type) and issubclass(schema, BaseModel):
+            try:
+                schema.model_validate(call["args"])
+            except ValidationError as e:
+                problems.append(f"{call['name']}: {e.error_count()} invalid arguments")
+    return problems
@@ -0,0 +1,47 @@
+"""Record of the tool calls a toolbox run executed.
+
+The tools_used of a structured response is written by the model, which
+can list tools it never called (or forget some it did), and a plain-text
+answer has no such field at all. Each run keeps a log of its tool calls
+instead, and run_toolbox reports tools_used from it: the tools that
+returned a result, in the order they were first used. Calls skipped
+before running (deadline, token budget) aren't logged; calls refused by
+the API limits are logged as failed.
+"""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+
+@dataclass
+class ToolCallLog:
+    """Tool calls of one toolbox run."""
+
+    tools_used: list[str] = field(default_factory=list)
+    calls: int = 0
+    failed: int = 0
+
+    def record(self, name: str, ok: bool) -> None:
+        """Record a finished tool call.
+
+        Args:
+            name: The tool name.
+            ok: Whether it returned a result (not an error).
+        """
+        self.calls += 1
+        if not ok:
+            self.failed += 1
+        elif name not in self.tools_used:
+            self.tools_used.append(name)
+
+    def as_dict(self) -> dict[str, int]:
+        """Get the call counts as a plain dict (e.g., for responses and logs)."""
+        return {"calls": self.calls, "failed": self.failed}
+
+
+# Log of the toolbox run being processed (set by run_toolbox)
+current_tool_calls: ContextVar[ToolCallLog | None] = ContextVar(
+    "toolbox_current_tool_calls", default=None
+)
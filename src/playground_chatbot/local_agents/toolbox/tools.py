@@ -10,18 +10,33 @@ decide which endpoints to call based on user queries.
 
 from __future__ import annotations
 
+import asyncio
+import json
+import logging
 import math
 from pathlib import Path
-from typing import Any
+from typing import Annotated, Any
 
 import yaml
-from langchain_core.tools import tool
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import InjectedToolArg, tool
 from simpleeval import simple_eval  # type: ignore[import-untyped]
 
 # Import generic tools from MACSDK
 from macsdk.tools import api_get, fetch_file
 
 from playground_chatbot.config import config
+from playground_chatbot.telemetry import span
+
+from .cache import api_cache, api_cache_key, api_cache_ttl, record_dependency
+from .catalog import ServiceCatalog, build_catalog
+from .compaction import select_path
+from .deadline import remaining_time
+from .impact import DependencyGraph, analyze_impact
+from .limits import CircuitOpen, Throttled, get_guard, is_upstream_failure
+from .sessions import session_store
+
+logger = logging.getLogger(__name__)
 
 # =============================================================================
 # SERVICE REGISTRATION
@@ -133,9 +148,15 @@ def _parse_frontmatter(content: str) -> tuple[dict[str, Any], str]:
     return frontmatter, content_without
 
 
+# Parsed documents by path, with the mtime they were read at
+_documents: dict[Path, tuple[int, tuple[dict[str, Any], str]]] = {}
+
+
 def _read_file_content(file_path: Path) -> tuple[dict[str, Any], str]:
     """Read a file and return its frontmatter and content.
 
+    Parsed files are kept in memory and re-read only when they change.
+
     Args:
         file_path: Path to the file to read.
 
@@ -145,13 +166,35 @@ def _read_file_content(file_path: Path) -> tuple[dict[str, Any], str]:
     Raises:
         FileNotFoundError: If the file doesn't exist.
     """
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
+    try:
+        mtime = file_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File not found: {file_path}") from None
+
+    cached = _documents.get(file_path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
 
     with open(file_path, "r", encoding="utf-8") as f:
         content = f.read()
 
-    return _parse_frontmatter(content)
+    parsed = _parse_frontmatter(content)
+    _documents[file_path] = (mtime, parsed)
+    return parsed
+
+
+def preload_documents() -> int:
+    """Read and parse every skill and fact into memory.
+
+    Used by `web --workers` before forking, so the workers share the
+    parsed documents instead of each reading them.
+
+    Returns:
+        Number of documents loaded.
+    """
+    documents = sum(len(_list_documents(d)) for d in (SKILLS_DIR, FACTS_DIR))
+    get_catalog()
+    return documents
 
 
 def _list_documents(directory: Path) -> list[dict[str, str]]:
@@ -206,6 +249,141 @@ def _read_document(base_dir: Path, path: str, doc_type: str) -> str:
         return f"Error: Invalid path - {e}"
 
 
+_catalog: ServiceCatalog | None = None
+_graph: DependencyGraph | None = None
+
+
+def get_catalog() -> ServiceCatalog:
+    """Get the service catalog, compiling it from the facts on first use.
+
+    Returns:
+        The services of every catalog-style fact.
+    """
+    global _catalog
+    if _catalog is None:
+        documents = []
+        for file in sorted(FACTS_DIR.rglob("*.md")):
+            try:
+                _, content = _read_file_content(file)
+            except (OSError, ValueError) as e:
+                logger.debug("Skipping unreadable fact '%s': %s", file, e)
+                continue
+            documents.append((file.relative_to(FACTS_DIR), content))
+        _catalog = build_catalog(documents)
+    return _catalog
+
+
+def get_dependency_graph() -> DependencyGraph:
+    """Get the service dependency graph, built from the catalog on first use.
+
+    Returns:
+        The graph of the catalog's critical dependencies.
+    """
+    global _graph
+    if _graph is None:
+        _graph = DependencyGraph.from_catalog(get_catalog())
+    return _graph
+
+
+def reload_catalog() -> None:
+    """Forget the service catalog so it's compiled again on next use."""
+    global _catalog, _graph
+    _catalog = None
+    _graph = None
+
+
+async def _live_statuses() -> dict[int, str]:
+    """Get the live status of every service from the DevOps API.
+
+    Raises:
+        RuntimeError: If the API call fails.
+    """
+    data = json.loads(await cached_api_get("devops", "/services"))
+    if isinstance(data, dict):
+        data = data.get("services", [])
+    return {
+        int(s["id"]): str(s["status"])
+        for s in data
+        if isinstance(s, dict) and "id" in s and "status" in s
+    }
+
+
+async def call_api(args: dict[str, Any]) -> str:
+    """Call api_get directly (outside the agent loop), without caching.
+
+    Args:
+        args: The api_get arguments (service, endpoint, ...).
+
+    Returns:
+        The result as text (JSON for structured responses).
+
+    Raises:
+        RuntimeError: If the API call fails.
+    """
+    _ensure_api_registered()
+    guard = get_guard(str(args.get("service", "")))
+    with span("tool", "api_get") as current:
+        try:
+            async with guard.call():
+                # Bounded by the current request's deadline, if any
+                result = await asyncio.wait_for(api_get.ainvoke(args), remaining_time())
+        except (Throttled, CircuitOpen) as e:
+            current.error = "limited"
+            raise RuntimeError(f"Error: {e}") from e
+        except TimeoutError as e:
+            current.error = "deadline"
+            raise RuntimeError("Error: API call failed - time limit reached") from e
+        except Exception as e:
+            guard.record(success=False)
+            raise RuntimeError(f"Error: API call failed - {e}") from e
+        if isinstance(result, str):
+            content = result
+        else:
+            content = json.dumps(result, ensure_ascii=False)
+        current.payload_bytes = len(content.encode("utf-8"))
+        failed = content.startswith("Error")
+        guard.record(success=not failed or not is_upstream_failure(content))
+        if failed:
+            current.error = "tool_error"
+            raise RuntimeError(content)
+    return content
+
+
+async def cached_api_get(service: str, endpoint: str, **kwargs: Any) -> str:
+    """Call api_get directly (outside the agent loop), using the API cache.
+
+    Results are cached with the endpoint's TTL and recorded as dependencies
+    of the current run, exactly like api_get calls made by the agent.
+
+    Args:
+        service: The registered service name (e.g., 'devops').
+        endpoint: The endpoint path (e.g., '/services/2').
+        **kwargs: Any other api_get arguments.
+
+    Returns:
+        The result as text (JSON for structured responses).
+
+    Raises:
+        RuntimeError: If the API call fails.
+    """
+    args: dict[str, Any] = {"service": service, "endpoint": endpoint, **kwargs}
+    key = api_cache_key(args)
+
+    entry = api_cache.get(key) if config.api_cache else None
+    if entry is not None:
+        record_dependency(key, entry)
+        return str(entry.value)
+
+    try:
+        content = await call_api(args)
+    except RuntimeError:
+        record_dependency(key, None)
+        raise
+
+    record_dependency(key, api_cache.set(key, content, api_cache_ttl(endpoint)))
+    return content
+
+
 # =============================================================================
 # MATH CALCULATION SETUP
 # =============================================================================
@@ -373,6 +551,126 @@ def read_fact(path: str) -> str:
     return _read_document(FACTS_DIR, path, "fact")
 
 
+@tool
+def lookup_service(id_or_slug: str, fields: list[str] | None = None) -> str:
+    """Look up a service in the services catalog (owner, SLA, dependencies...).
+
+    Faster and more precise than reading the whole catalog fact: returns only
+    the record of one service, or only the fields you ask for.
+
+    Args:
+        id_or_slug: The service ID (e.g., '4'), slug (e.g., 'postgres-primary')
+                    or name (e.g., 'Postgres Primary').
+        fields: Optional fields to return (e.g., ['owner', 'sla']). Common
+                fields: name, slug, purpose, technology, owner, owner_email,
+                critical_dependencies, depends_on (service IDs), sla,
+                sla_percent, typical_issues, tier.
+
+    Returns:
+        The service record as JSON, or an error message.
+    """
+    catalog = get_catalog()
+    record = catalog.get(id_or_slug)
+    if record is None:
+        known = ", ".join(f"{r['id']} ({r['slug']})" for r in catalog.services.values())
+        return (
+            f"Error: Service '{id_or_slug}' not found. "
+            f"Known services: {known or 'none'}."
+        )
+    if fields:
+        unknown = [f for f in fields if f not in record]
+        if unknown:
+            return (
+                f"Error: Unknown fields {unknown}. "
+                f"Available fields: {', '.join(record)}."
+            )
+        record = {"id": record["id"], **{f: record[f] for f in fields}}
+    return json.dumps(record, ensure_ascii=False)
+
+
+@tool
+async def impact_analysis(service: str, live_status: bool = True) -> str:
+    """Analyze what breaks if a service fails or degrades, in one call.
+
+    Computes from the services catalog's critical dependencies: the blast
+    radius (services that depend on it, directly or not), what it depends
+    on, the critical paths from entry points down to it with their combined
+    SLA, and its effective SLA. With live_status, the current status of
+    every service (from /services) marks the unhealthy services and paths.
+
+    Use it for questions like "what breaks if postgres-primary degrades?"
+    or "why is auth-service having issues?" instead of reading the catalog
+    and each service's skills.
+
+    Args:
+        service: The service ID (e.g., '4'), slug (e.g., 'postgres-primary')
+                 or name.
+        live_status: Whether to include the live status of the services.
+
+    Returns:
+        The impact analysis as JSON, or an error message.
+    """
+    record = get_catalog().get(service)
+    if record is None:
+        return f"Error: Service '{service}' not found. Use lookup_service() IDs."
+    statuses: dict[int, str] = {}
+    live_error = None
+    if live_status:
+        try:
+            statuses = await _live_statuses()
+        except (RuntimeError, ValueError, TypeError) as e:
+            live_error = str(e)
+    result = analyze_impact(get_dependency_graph(), record["id"], statuses)
+    if live_error:
+        result["live_status_error"] = live_error
+    return json.dumps(result, ensure_ascii=False)
+
+
+@tool
+def get_full_result(
+    ref: str,
+    config: Annotated[RunnableConfig, InjectedToolArg],
+    path: str | None = None,
+) -> str:
+    """Retrieve the full content of a tool result that was compacted.
+
+    Large API results are compacted to save context (long arrays are replaced
+    by a count and a few samples, fields may be filtered). When a result
+    says it was compacted, use this tool with the given reference to get
+    the complete data, or only the part you need.
+
+    Args:
+        ref: The reference from the compacted result (e.g., 'res_1a2b3c4d5e').
+        config: Runnable configuration (injected automatically).
+        path: Optional dotted path to select part of a JSON result
+              (e.g., '3' for the fourth item, '3.issues' for its issues).
+
+    Returns:
+        The full result (or the selected part), or an error message.
+    """
+    # Only the caller's own conversation (thread) is searched
+    configurable = (config or {}).get("configurable") or {}
+    session = str(configurable.get("thread_id") or "default")
+    entry = session_store.get(session, ref)
+    if entry is None:
+        return (
+            f"Error: Result '{ref}' not found or expired. Call the original tool again."
+        )
+    content = entry.content
+    if entry.summarized:
+        # The full result was dropped to bound the session's memory
+        return (
+            content + "\n[Only a summary of this result is kept. "
+            "Call the original tool again for the full data.]"
+        )
+    if not path:
+        return content
+    try:
+        return select_path(content, path)
+    except ValueError as e:
+        return f"Error: Invalid path - {e}"
+
+
 def get_tools() -> list:
     """Get the tools for this agent, ensuring API is registered.
 
@@ -388,6 +686,9 @@ def get_tools() -> list:
         list_facts,
         read_skill,
         read_fact,
+        lookup_service,
+        impact_analysis,
+        get_full_result,
     ]
 
 
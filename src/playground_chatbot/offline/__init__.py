@@ -0,0 +1,65 @@
+"""Offline mode: run the chatbot without an LLM or the remote DevOps API.
+
+- ScriptedChatModel replays a scripted plan per query (see queries.yml)
+  instead of calling a real model.
+- MockDevOpsAPI serves fixture JSON for the DevOps API on localhost.
+
+install_offline() points the toolbox and the supervisor at both. It's
+used by the benchmarks, `web --fake-model` and `loadtest --fake-model`.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+
+from .fake_model import ModelUsage, QueryScript, ScriptedChatModel, load_scripts
+from .mock_api import FIXTURES_DIR, MockDevOpsAPI
+
+QUERIES_FILE = Path(__file__).parent / "queries.yml"
+
+
+def install_offline(model: ScriptedChatModel, api_base_url: str) -> None:
+    """Point the toolbox and the supervisor at a fake model and a local API.
+
+    Call it again after building the supervisor graph, so model factories
+    imported while building it are replaced too.
+
+    Args:
+        model: The model returned by every model factory.
+        api_base_url: Base URL of the DevOps API stand-in.
+    """
+    # Dummy key so the SDK's configuration checks pass; it's never used
+    os.environ.setdefault("GOOGLE_API_KEY", "offline")
+
+    from macsdk.core.api_registry import register_api_service
+
+    from playground_chatbot.local_agents.toolbox import agent as toolbox_agent
+    from playground_chatbot.local_agents.toolbox import tools as toolbox_tools
+
+    register_api_service(
+        name="devops", base_url=api_base_url, timeout=10, max_retries=0
+    )
+    toolbox_tools._api_registered = True
+
+    # Replace every model factory already imported by the SDK and the agent
+    toolbox_agent.get_answer_model = lambda *args, **kwargs: model
+    for name, module in list(sys.modules.items()):
+        if not name.startswith("macsdk") or module is None:
+            continue
+        for attr in dir(module):
+            if attr.startswith("get_") and attr.endswith("_model"):
+                setattr(module, attr, lambda *args, **kwargs: model)
+
+
+__all__ = [
+    "FIXTURES_DIR",
+    "QUERIES_FILE",
+    "MockDevOpsAPI",
+    "ModelUsage",
+    "QueryScript",
+    "ScriptedChatModel",
+    "install_offline",
+    "load_scripts",
+]
@@ -0,0 +1,258 @@
+"""Scripted tool-calling chat model for offline runs.
+
+The model replays a scripted plan per query instead of calling a real LLM:
+
+- As the toolbox agent (when the toolbox tools are bound), it issues the
+  scripted tool calls step by step, then returns the scripted answer.
+- As the supervisor (when a 'toolbox' tool is bound), it delegates the
+  query to the toolbox tool, then returns the tool result as its answer.
+
+Structured output (response_format) is answered by calling the extra
+schema tool that the agent binds, filling string fields with the answer
+and list fields with the tools used.
+
+Queries without a script get a canned answer, so any query mix can be
+served (e.g., by load tests). Token counts are estimated for every call so
+benchmarks can report the tokens moved per query, and an artificial
+latency can be configured to emulate a real model.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections import Counter
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import yaml
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+from playground_chatbot.local_agents.toolbox.cache import normalize_query
+from playground_chatbot.local_agents.toolbox.compaction import estimate_tokens
+
+SUPERVISOR_TOOL = "toolbox"
+
+
+@dataclass
+class QueryScript:
+    """Scripted plan for one query."""
+
+    id: str
+    query: str
+    steps: list[list[dict[str, Any]]] = field(default_factory=list)
+    answer: str = ""
+
+
+@dataclass
+class ModelUsage:
+    """Usage counters accumulated by the scripted model."""
+
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+    tool_calls: Counter[str] = field(default_factory=Counter)
+
+
+def load_scripts(path: Path) -> list[QueryScript]:
+    """Load a query corpus (see queries.yml).
+
+    Args:
+        path: Path to the YAML corpus.
+
+    Returns:
+        The scripted plans, in file order.
+    """
+    data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    return [
+        QueryScript(
+            id=q["id"],
+            query=q["query"],
+            steps=q.get("steps") or [],
+            answer=q.get("answer", ""),
+        )
+        for q in data["queries"]
+    ]
+
+
+def _text(message: BaseMessage) -> str:
+    """Get the text content of a message."""
+    content = message.content
+    return content if isinstance(content, str) else str(content)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model that replays scripted tool calls per query."""
+
+    scripts: list[QueryScript]
+    latency: float = 0.0
+
+    _usage: ModelUsage = PrivateAttr(default_factory=ModelUsage)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-fake"
+
+    @property
+    def usage(self) -> ModelUsage:
+        """Usage counters since the last reset."""
+        return self._usage
+
+    def reset_usage(self) -> None:
+        """Reset the usage counters."""
+        self._usage = ModelUsage()
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> Any:
+        """Bind tools, converted to OpenAI function specs."""
+        specs = [convert_to_openai_tool(t)["function"] for t in tools]
+        return self.bind(tools=specs, **kwargs)
+
+    def _find_script(self, messages: list[BaseMessage]) -> QueryScript | None:
+        """Find the script whose query appears in the human messages."""
+        human = " ".join(
+            normalize_query(_text(m)) for m in messages if isinstance(m, HumanMessage)
+        )
+        # Prefer the longest query, in case one query contains another
+        matches = [s for s in self.scripts if normalize_query(s.query) in human]
+        return max(matches, key=lambda s: len(s.query), default=None)
+
+    @staticmethod
+    def _structured_args(
+        spec: dict[str, Any], answer: str, tools: list[str]
+    ) -> dict[str, Any]:
+        """Fill the arguments of a structured-output schema tool."""
+        args: dict[str, Any] = {}
+        properties = spec.get("parameters", {}).get("properties", {})
+        for name, prop in properties.items():
+            kind = prop.get("type")
+            if kind == "array":
+                args[name] = tools
+            elif kind == "string" or "anyOf" in prop:
+                args[name] = answer
+        return args
+
+    def _final(
+        self,
+        answer: str,
+        specs: list[dict[str, Any]],
+        tool_names: set[str],
+        messages: list[BaseMessage],
+    ) -> AIMessage:
+        """Build the final answer, as structured output if requested."""
+        schema_tools = [s for s in specs if s["name"] not in tool_names]
+        if not schema_tools:
+            return AIMessage(content=answer)
+        used = sorted(
+            {m.name for m in messages if isinstance(m, ToolMessage) and m.name}
+        )
+        spec = schema_tools[0]
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": spec["name"],
+                    "args": self._structured_args(spec, answer, used),
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                }
+            ],
+        )
+
+    def _respond(self, messages: list[BaseMessage], specs: list[dict]) -> AIMessage:
+        """Decide the next message for the conversation so far."""
+        script = self._find_script(messages)
+        last_human = max(
+            (i for i, m in enumerate(messages) if isinstance(m, HumanMessage)),
+            default=-1,
+        )
+        step = sum(1 for m in messages[last_human + 1 :] if isinstance(m, AIMessage))
+        names = {s["name"] for s in specs}
+        is_supervisor = SUPERVISOR_TOOL in names
+
+        if script is None:
+            # Unscripted queries are delegated, then answered with a canned text
+            query = _text(messages[last_human]) if last_human >= 0 else ""
+            script = QueryScript(
+                id="unscripted", query=query, answer=f"Offline answer to: {query}"
+            )
+
+        if is_supervisor:
+            tool_names = {SUPERVISOR_TOOL}
+            if step == 0:
+                calls = [{"name": SUPERVISOR_TOOL, "args": {"query": script.query}}]
+            else:
+                results = [_text(m) for m in messages if isinstance(m, ToolMessage)]
+                answer = results[-1] if results else ""
+                return self._final(answer, specs, tool_names, messages)
+        else:
+            # Structured-output schema tools are named after their (CamelCase)
+            # model class; the real tools are snake_case
+            tool_names = {n for n in names if not n[:1].isupper()}
+            if step >= len(script.steps):
+                return self._final(script.answer, specs, tool_names, messages)
+            calls = script.steps[step]
+
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": call["name"],
+                    "args": dict(call.get("args") or {}),
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                }
+                for call in calls
+            ],
+        )
+
+    def _record(
+        self, messages: list[BaseMessage], specs: list[dict], reply: AIMessage
+    ) -> None:
+        """Accumulate estimated token usage for one call."""
+        prompt = "".join(_text(m) for m in messages) + str(specs)
+        output = _text(reply) + str(reply.tool_calls)
+        self._usage.calls += 1
+        # Structured-output calls are the final answer, not tool calls
+        self._usage.tool_calls.update(
+            call["name"] for call in reply.tool_calls if not call["name"][:1].isupper()
+        )
+        self._usage.input_tokens += estimate_tokens(prompt)
+        self._usage.output_tokens += estimate_tokens(output)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        specs = kwargs.get("tools") or []
+        reply = self._respond(messages, specs)
+        self._record(messages, specs, reply)
+        self._usage.seconds += time.perf_counter() - start
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        start = time.perf_counter()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        specs = kwargs.get("tools") or []
+        reply = self._respond(messages, specs)
+        self._record(messages, specs, reply)
+        self._usage.seconds += time.perf_counter() - start
+        return ChatResult(generations=[ChatGeneration(message=reply)])
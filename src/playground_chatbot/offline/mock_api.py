@@ -0,0 +1,140 @@
+"""Local stand-in for the DevOps mock API.
+
+Serves the JSON fixtures in fixtures/devops/ with json-server semantics,
+like the upstream my-json-server.typicode.com API:
+
+- GET /<resource>            → the whole list (e.g., /services)
+- GET /<resource>/<id>       → a single item (e.g., /services/2)
+- GET /<resource>?field=val  → items whose field matches (e.g., ?severity=critical)
+
+Request and byte counters are kept so benchmarks can report how much data
+each query moved.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "devops"
+
+
+def _matches(item: dict[str, Any], filters: list[tuple[str, str]]) -> bool:
+    """Check json-server style equality filters against an item."""
+    for field, value in filters:
+        actual = item.get(field)
+        if isinstance(actual, bool):
+            actual = "true" if actual else "false"
+        if str(actual) != value:
+            return False
+    return True
+
+
+class MockDevOpsAPI:
+    """Threaded HTTP server serving the DevOps fixtures on localhost."""
+
+    def __init__(
+        self,
+        fixtures_dir: Path = FIXTURES_DIR,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+    ) -> None:
+        """Initialize the server.
+
+        Args:
+            fixtures_dir: Directory with one <resource>.json file per resource.
+            host: Host to bind to.
+            port: Port to bind to (0 picks a free port).
+            latency: Artificial delay per request in seconds.
+        """
+        self.resources = {
+            path.stem: json.loads(path.read_text(encoding="utf-8"))
+            for path in fixtures_dir.glob("*.json")
+        }
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL of the running server."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def reset_counters(self) -> None:
+        """Reset the request and byte counters."""
+        with self._lock:
+            self.requests = 0
+            self.bytes_sent = 0
+
+    def resolve(self, path: str, query: str) -> tuple[int, Any]:
+        """Resolve a request path to a status code and JSON body.
+
+        Args:
+            path: The URL path (e.g., '/services/2').
+            query: The raw query string.
+
+        Returns:
+            Tuple of (status_code, body).
+        """
+        parts = [p for p in path.split("/") if p]
+        if not parts or parts[0] not in self.resources:
+            return 404, {}
+        data = self.resources[parts[0]]
+        if len(parts) == 1:
+            filters = parse_qsl(query)
+            return 200, [item for item in data if _matches(item, filters)]
+        if len(parts) == 2:
+            for item in data:
+                if str(item.get("id")) == parts[1]:
+                    return 200, item
+        return 404, {}
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        """Build the request handler bound to this server instance."""
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if api.latency:
+                    threading.Event().wait(api.latency)
+                url = urlsplit(self.path)
+                status, body = api.resolve(url.path, url.query)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+                with api._lock:
+                    api.requests += 1
+                    api.bytes_sent += len(payload)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                # Keep benchmark output clean
+                return
+
+        return Handler
+
+    def start(self) -> MockDevOpsAPI:
+        """Start serving in a background thread.
+
+        Returns:
+            This server, for chaining.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop the server."""
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,425 @@
+"""Timing spans and metrics for Playground Chatbot.
+
+Tool calls, model calls and agent runs are wrapped in spans with span().
+Every span:
+
+- Is exported to OpenTelemetry when the opentelemetry package is installed
+  (spans are no-ops unless an OpenTelemetry SDK is configured).
+- Records its duration, errors and payload size in the in-process metrics
+  registry, exported in the Prometheus text format by serve_metrics()
+  and summarized by profile_summary().
+
+Example:
+    with span("tool", "api_get", endpoint="/services") as s:
+        result = call()
+        s.payload_bytes = len(result)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # pragma: no cover - optional dependency
+    otel_trace = None  # type: ignore[assignment]
+
+_tracer = otel_trace.get_tracer("playground_chatbot") if otel_trace else None
+
+# Latency buckets in seconds (local tools take microseconds, models seconds)
+DURATION_BUCKETS = (
+    0.0005,
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Payload size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+
+def _format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    """Format labels in the Prometheus text format."""
+    if not labels:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in labels
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str) -> None:
+        """Initialize the counter.
+
+        Args:
+            name: Metric name.
+            help: Metric description.
+        """
+        self.name = name
+        self.help = help
+        self._values: dict[tuple[tuple[str, str], ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increment the counter for a set of labels."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def values(self) -> dict[tuple[tuple[str, str], ...], float]:
+        """Get a snapshot of the values per label set."""
+        with self._lock:
+            return dict(self._values)
+
+    def render(self) -> list[str]:
+        """Render the counter in the Prometheus text format."""
+        return [
+            f"{self.name}{_format_labels(labels)} {value:g}"
+            for labels, value in sorted(self.values().items())
+        ]
+
+    def clear(self) -> None:
+        """Reset all values."""
+        with self._lock:
+            self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down, with labels."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the gauge for a set of labels."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = value
+
+
+@dataclass
+class _HistogramValue:
+    """Bucket counts, sum and count of one histogram label set."""
+
+    buckets: list[int]
+    sum: float = 0.0
+    count: int = 0
+    max: float = 0.0
+
+
+class Histogram:
+    """Histogram with fixed buckets and labels."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple[float, ...]) -> None:
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name.
+            help: Metric description.
+            buckets: Upper bounds of the buckets (ascending).
+        """
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self._values: dict[tuple[tuple[str, str], ...], _HistogramValue] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation for a set of labels."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = _HistogramValue(buckets=[0] * len(self.buckets))
+                self._values[key] = entry
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry.buckets[i] += 1
+            entry.sum += value
+            entry.count += 1
+            entry.max = max(entry.max, value)
+
+    def values(self) -> dict[tuple[tuple[str, str], ...], _HistogramValue]:
+        """Get a snapshot of the values per label set."""
+        with self._lock:
+            return {
+                k: _HistogramValue(list(v.buckets), v.sum, v.count, v.max)
+                for k, v in self._values.items()
+            }
+
+    def quantile(self, q: float, **labels: str) -> float:
+        """Estimate a quantile from the buckets (upper bound of its bucket).
+
+        Args:
+            q: The quantile (e.g., 0.95).
+            **labels: The label set.
+
+        Returns:
+            The estimated quantile, or 0.0 if there are no observations.
+        """
+        entry = self.values().get(tuple(sorted(labels.items())))
+        if entry is None or entry.count == 0:
+            return 0.0
+        rank = q * entry.count
+        for bound, cumulative in zip(self.buckets, entry.buckets):
+            if cumulative >= rank:
+                return min(bound, entry.max)
+        return entry.max
+
+    def render(self) -> list[str]:
+        """Render the histogram in the Prometheus text format."""
+        lines = []
+        for labels, entry in sorted(self.values().items()):
+            for bound, cumulative in zip(self.buckets, entry.buckets):
+                bucket_labels = labels + (("le", f"{bound:g}"),)
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}"
+                )
+            inf_labels = labels + (("le", "+Inf"),)
+            lines.append(
+                f"{self.name}_bucket{_format_labels(inf_labels)} {entry.count}"
+            )
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {entry.sum:g}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {entry.count}")
+        return lines
+
+    def clear(self) -> None:
+        """Reset all values."""
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """Registry of the metrics exported on /metrics."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._metrics: dict[str, Counter | Gauge | Histogram] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str) -> Counter:
+        """Get or create a counter."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Counter(name, help)
+        if type(metric) is not Counter:
+            raise ValueError(f"Metric '{name}' is not a counter")
+        return metric
+
+    def gauge(self, name: str, help: str) -> Gauge:
+        """Get or create a gauge."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Gauge(name, help)
+        if not isinstance(metric, Gauge):
+            raise ValueError(f"Metric '{name}' is not a gauge")
+        return metric
+
+    def histogram(
+        self, name: str, help: str, buckets: tuple[float, ...] = DURATION_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram."""
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Histogram(name, help, buckets)
+        if not isinstance(metric, Histogram):
+            raise ValueError(f"Metric '{name}' is not a histogram")
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def clear(self) -> None:
+        """Reset the values of all metrics."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.clear()
+
+
+registry = MetricsRegistry()
+
+span_duration = registry.histogram(
+    "playground_span_duration_seconds",
+    "Duration of tool calls, model calls and agent runs.",
+)
+span_errors = registry.counter(
+    "playground_span_errors_total",
+    "Tool calls, model calls and agent runs that failed.",
+)
+span_payload = registry.histogram(
+    "playground_span_payload_bytes",
+    "Size of tool results and model prompts.",
+    buckets=SIZE_BUCKETS,
+)
+
+
+# =============================================================================
+# SPANS
+# =============================================================================
+
+
+@dataclass
+class Span:
+    """A running span; set payload_bytes or error before it ends."""
+
+    kind: str
+    name: str
+    attributes: dict[str, Any] = field(default_factory=dict)
+    payload_bytes: int | None = None
+    error: str | None = None
+
+
+@contextmanager
+def span(kind: str, name: str, **attributes: Any) -> Iterator[Span]:
+    """Time a tool call, model call or agent run.
+
+    Args:
+        kind: What is being timed ('tool', 'model', 'agent', ...).
+        name: The tool, model or agent name.
+        **attributes: Extra span attributes (exported to OpenTelemetry).
+
+    Yields:
+        The span, to set its payload size or mark it as failed.
+    """
+    current = Span(kind=kind, name=name, attributes=attributes)
+    otel_span = None
+    otel_context = None
+    if _tracer is not None:
+        otel_context = _tracer.start_as_current_span(f"{kind} {name}")
+        otel_span = otel_context.__enter__()
+        otel_span.set_attribute("playground.kind", kind)
+        otel_span.set_attribute("playground.name", name)
+        for key, value in attributes.items():
+            if isinstance(value, (str, bool, int, float)):
+                otel_span.set_attribute(f"playground.{key}", value)
+
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = current.error or type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - start
+        span_duration.observe(duration, kind=kind, name=name)
+        if current.error:
+            span_errors.inc(kind=kind, name=name)
+        if current.payload_bytes is not None:
+            span_payload.observe(current.payload_bytes, kind=kind, name=name)
+        if otel_span is not None and otel_context is not None:
+            if current.payload_bytes is not None:
+                otel_span.set_attribute(
+                    "playground.payload_bytes", current.payload_bytes
+                )
+            if current.error:
+                otel_span.set_attribute("error.type", current.error)
+            otel_context.__exit__(None, None, None)
+
+
+# =============================================================================
+# EXPORT
+# =============================================================================
+
+
+def profile_summary() -> list[dict[str, Any]]:
+    """Summarize the recorded spans, slowest total time first.
+
+    Returns:
+        One dict per (kind, name) with count, total/mean/p95/max seconds,
+        errors and mean payload bytes.
+    """
+    errors = span_errors.values()
+    payloads = span_payload.values()
+    rows = []
+    for labels, entry in span_duration.values().items():
+        label_dict = dict(labels)
+        payload = payloads.get(labels)
+        rows.append(
+            {
+                "kind": label_dict.get("kind", ""),
+                "name": label_dict.get("name", ""),
+                "count": entry.count,
+                "total_s": entry.sum,
+                "mean_s": entry.sum / entry.count if entry.count else 0.0,
+                "p95_s": span_duration.quantile(0.95, **label_dict),
+                "max_s": entry.max,
+                "errors": int(errors.get(labels, 0)),
+                "mean_bytes": (
+                    payload.sum / payload.count if payload and payload.count else None
+                ),
+            }
+        )
+    return sorted(rows, key=lambda row: row["total_s"], reverse=True)
+
+
+def serve_metrics(host: str, port: int) -> ThreadingHTTPServer:
+    """Serve the metrics on /metrics from a background thread.
+
+    Args:
+        host: Host to bind to.
+        port: Port to bind to.
+
+    Returns:
+        The running server (call shutdown() to stop it).
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            # Scrapes would flood the server output
+            return
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,393 @@
+"""Pre-forked worker processes for the web interface.
+
+`web --workers N` runs N copies of the web server, each in its own process
+(and with its own GIL):
+
+- The parent loads the skills, facts, recipes and prefetch index once and
+  then forks the workers, so they share those pages copy-on-write.
+- Each worker serves on a private localhost port. The parent listens on
+  the public port and hands every TCP connection (a page load or a whole
+  WebSocket session) to the worker with the fewest open connections.
+- The API and answer caches are shared through a SQLite file (see
+  cache.share_caches), so an API result fetched by one worker is served
+  from the cache by all of them.
+- Workers are recycled after serving max_requests connections or when
+  their resident memory goes over max_memory_mb: a replacement is started
+  first, the old worker gets no new connections, and it's stopped once its
+  open connections are done (or after drain_timeout).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# Seconds between health checks of the workers
+MONITOR_INTERVAL = 1.0
+
+
+def preload() -> int:
+    """Load the data shared by all workers before forking.
+
+    Returns:
+        Number of skills and facts loaded.
+    """
+    from .local_agents.toolbox.prefetch import prefetcher
+    from .local_agents.toolbox.recipes import get_recipes
+    from .local_agents.toolbox.tools import preload_documents
+
+    documents = preload_documents()
+    get_recipes()
+    _ = prefetcher.index
+    # Keep the loaded objects out of the collector, so its passes in the
+    # workers don't write to (and un-share) their pages
+    gc.collect()
+    gc.freeze()
+    return documents
+
+
+def rss_bytes(pid: int) -> int | None:
+    """Get the resident memory of a process (Linux only).
+
+    Args:
+        pid: The process ID.
+
+    Returns:
+        Resident set size in bytes, or None if it can't be read.
+    """
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+def start_metrics(host: str, port: int, timeout: float = 300.0) -> None:
+    """Serve a worker's metrics, waiting for the port if it's still in use.
+
+    A replacement worker starts while the worker it replaces (which has
+    the same metrics port) is still finishing its connections.
+
+    Args:
+        host: Host to bind to.
+        port: Port to bind to.
+        timeout: Seconds to keep retrying.
+    """
+    from .telemetry import serve_metrics
+
+    def bind() -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                serve_metrics(host, port)
+                return
+            except OSError:
+                time.sleep(1.0)
+        logger.warning("Metrics port %d still in use, not serving metrics", port)
+
+    threading.Thread(target=bind, daemon=True).start()
+
+
+def _free_port() -> int:
+    """Find a free localhost TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@dataclass
+class Worker:
+    """A worker process and its connection counts."""
+
+    slot: int
+    pid: int
+    port: int
+    started: float
+    ready: bool = False
+    connections: int = 0
+    active: int = 0
+    draining_since: float | None = None
+    terminated: bool = False
+    replacement: Worker | None = None
+
+    @property
+    def accepting(self) -> bool:
+        """Whether new connections may be sent to this worker."""
+        return self.ready and self.draining_since is None
+
+
+class WorkerPool:
+    """Fork web server workers and balance connections between them."""
+
+    def __init__(
+        self,
+        target: Callable[[int, int], None],
+        workers: int,
+        host: str,
+        port: int,
+        max_requests: int = 0,
+        max_memory_mb: int = 0,
+        drain_timeout: float = 60.0,
+    ) -> None:
+        """Initialize the pool.
+
+        Args:
+            target: Runs the web server in a worker; called with the worker
+                slot (0..workers-1) and the localhost port to serve on.
+            workers: Number of worker processes.
+            host: Public host to bind to.
+            port: Public port to bind to.
+            max_requests: Recycle a worker after this many connections
+                (0 = never).
+            max_memory_mb: Recycle a worker over this resident memory in MB
+                (0 = never).
+            drain_timeout: Seconds a recycled worker gets to finish its
+                open connections.
+        """
+        self.target = target
+        self.size = workers
+        self.host = host
+        self.port = port
+        self.max_requests = max_requests
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.drain_timeout = drain_timeout
+        self.workers: dict[int, Worker] = {}
+        self.recycled = 0
+        self._server: asyncio.Server | None = None
+        self._relayed: set[asyncio.StreamWriter] = set()
+        self._stopping = asyncio.Event()
+
+    def run(self) -> None:
+        """Start the workers and serve until interrupted."""
+        asyncio.run(self._main())
+
+    # -------------------------------------------------------------------------
+    # Process management
+    # -------------------------------------------------------------------------
+
+    def _spawn(self, slot: int) -> Worker:
+        """Fork a worker process for a slot."""
+        port = _free_port()
+        pid = os.fork()
+        if pid == 0:
+            self._run_child(slot, port)
+        worker = Worker(slot=slot, pid=pid, port=port, started=time.monotonic())
+        self.workers[pid] = worker
+        logger.info("Started worker %d (pid %d) on port %d", slot, pid, port)
+        return worker
+
+    def _run_child(self, slot: int, port: int) -> None:
+        """Run the web server in a forked worker; never returns."""
+        code = 0
+        try:
+            # Drop what the child inherited from the parent's event loop
+            if self._server is not None:
+                for sock in self._server.sockets:
+                    os.close(sock.fileno())
+            # Relayed connections would otherwise stay open until this exits
+            for writer in self._relayed:
+                sock = writer.get_extra_info("socket")
+                if sock is not None:
+                    os.close(sock.fileno())
+            signal.set_wakeup_fd(-1)
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, signal.SIG_DFL)
+            # Ctrl+C goes to the parent, which stops the workers gracefully
+            os.setpgid(0, 0)
+            self.target(slot, port)
+        except BaseException:
+            logger.exception("Worker %d failed", slot)
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _reap(self) -> None:
+        """Collect exited workers, replacing those that weren't recycled."""
+        for pid, worker in list(self.workers.items()):
+            try:
+                done, status = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                done, status = pid, 0
+            if done == 0:
+                continue
+            del self.workers[pid]
+            for other in self.workers.values():
+                if other.replacement is worker:
+                    # A replacement died while starting; retry the recycling
+                    other.replacement = None
+                    worker.terminated = True
+            expected = worker.draining_since is not None or worker.terminated
+            if worker.replacement is not None:
+                # Its replacement is already starting
+                expected = True
+            if not expected and not self._stopping.is_set():
+                logger.warning(
+                    "Worker %d (pid %d) exited with status %d, restarting",
+                    worker.slot,
+                    pid,
+                    os.waitstatus_to_exitcode(status),
+                )
+                self._spawn(worker.slot)
+
+    async def _check_ready(self, worker: Worker) -> None:
+        """Mark a worker as ready once its port accepts connections."""
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", worker.port)
+        except OSError:
+            return
+        writer.close()
+        worker.ready = True
+
+    def _needs_recycling(self, worker: Worker) -> str | None:
+        """Get the reason to recycle a worker, if any."""
+        if self.max_requests and worker.connections >= self.max_requests:
+            return f"{worker.connections} connections"
+        if self.max_memory:
+            rss = rss_bytes(worker.pid)
+            if rss is not None and rss > self.max_memory:
+                return f"{rss / 1024 / 1024:.0f} MB resident"
+        return None
+
+    async def _monitor(self) -> None:
+        """Check the workers: readiness, recycling and draining."""
+        while not self._stopping.is_set():
+            self._reap()
+            now = time.monotonic()
+            for worker in list(self.workers.values()):
+                if not worker.ready:
+                    await self._check_ready(worker)
+                    continue
+                if worker.draining_since is not None:
+                    drained = worker.active == 0
+                    timed_out = now - worker.draining_since > self.drain_timeout
+                    if not worker.terminated and (drained or timed_out):
+                        self._signal(worker, signal.SIGTERM)
+                        worker.terminated = True
+                    continue
+                if worker.replacement is None:
+                    reason = self._needs_recycling(worker)
+                    if reason:
+                        logger.info(
+                            "Recycling worker %d (pid %d): %s",
+                            worker.slot,
+                            worker.pid,
+                            reason,
+                        )
+                        worker.replacement = self._spawn(worker.slot)
+                elif worker.replacement.ready:
+                    # The replacement takes over; let this one finish
+                    worker.draining_since = now
+                    self.recycled += 1
+            try:
+                await asyncio.wait_for(self._stopping.wait(), MONITOR_INTERVAL)
+            except TimeoutError:
+                pass
+
+    @staticmethod
+    def _signal(worker: Worker, signum: int) -> None:
+        """Send a signal to a worker, ignoring workers already gone."""
+        try:
+            os.kill(worker.pid, signum)
+        except ProcessLookupError:
+            pass
+
+    async def _shutdown(self, timeout: float = 10.0) -> None:
+        """Stop all workers, killing those that don't exit in time."""
+        for worker in self.workers.values():
+            self._signal(worker, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while self.workers and time.monotonic() < deadline:
+            self._reap()
+            await asyncio.sleep(0.1)
+        for worker in self.workers.values():
+            self._signal(worker, signal.SIGKILL)
+        self._reap()
+
+    # -------------------------------------------------------------------------
+    # Connection balancing
+    # -------------------------------------------------------------------------
+
+    async def _pick(self, timeout: float = 30.0) -> Worker | None:
+        """Pick the accepting worker with the fewest open connections."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and not self._stopping.is_set():
+            candidates = [w for w in self.workers.values() if w.accepting]
+            if candidates:
+                return min(candidates, key=lambda w: (w.active, w.connections))
+            # All workers are (re)starting
+            await asyncio.sleep(0.1)
+        return None
+
+    @staticmethod
+    async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Copy bytes from a reader to a writer until EOF."""
+        try:
+            while data := await reader.read(65536):
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _handle(
+        self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter
+    ) -> None:
+        """Relay one client connection to a worker."""
+        worker = await self._pick()
+        if worker is None:
+            client_writer.close()
+            return
+        try:
+            worker_reader, worker_writer = await asyncio.open_connection(
+                "127.0.0.1", worker.port
+            )
+        except OSError:
+            client_writer.close()
+            return
+
+        worker.connections += 1
+        worker.active += 1
+        self._relayed.update((client_writer, worker_writer))
+        try:
+            relays = [
+                asyncio.create_task(self._pipe(client_reader, worker_writer)),
+                asyncio.create_task(self._pipe(worker_reader, client_writer)),
+            ]
+            # Either side closing ends the connection
+            _, pending = await asyncio.wait(relays, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+        finally:
+            worker.active -= 1
+            for writer in (worker_writer, client_writer):
+                self._relayed.discard(writer)
+                writer.close()
+
+    async def _main(self) -> None:
+        """Fork the workers, then balance connections until stopped."""
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, self._stopping.set)
+
+        for slot in range(self.size):
+            self._spawn(slot)
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, reuse_address=True
+        )
+        monitor = asyncio.create_task(self._monitor())
+        try:
+            await self._stopping.wait()
+        finally:
+            self._server.close()
+            await monitor
+            await self._shutdown()
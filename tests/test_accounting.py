@@ -0,0 +1,127 @@
+"""Tests for the per-request token accounting and budget."""
+
+from __future__ import annotations
+
+from collections import Counter
+from types import SimpleNamespace
+
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from playground_chatbot.local_agents.toolbox.accounting import (
+    TokenUsage,
+    attribute_prompt,
+    current_usage,
+)
+from playground_chatbot.local_agents.toolbox.middleware import (
+    TokenAccountingMiddleware,
+)
+from playground_chatbot.local_agents.toolbox.prompts import SYSTEM_PROMPT
+
+LONG_RESULT = "x" * 4000
+
+
+def history() -> list:
+    """A conversation with two large tool results."""
+    return [
+        HumanMessage(content="Why is auth-service failing?"),
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "read_skill", "args": {"path": "a.md"}, "id": "1"}],
+        ),
+        ToolMessage(content=LONG_RESULT, tool_call_id="1", name="read_skill"),
+        AIMessage(
+            content="",
+            tool_calls=[{"name": "api_get", "args": {"endpoint": "/x"}, "id": "2"}],
+        ),
+        ToolMessage(content=LONG_RESULT, tool_call_id="2", name="api_get"),
+    ]
+
+
+def run_model_call(middleware: TokenAccountingMiddleware) -> ModelRequest:
+    """Make one model call through the middleware, returning what it sent."""
+    sent: list[ModelRequest] = []
+
+    def handler(request: ModelRequest) -> ModelResponse:
+        sent.append(request)
+        return ModelResponse(result=[AIMessage(content="done")])
+
+    request = ModelRequest(
+        model=FakeListChatModel(responses=["done"]),
+        messages=history(),
+        system_message=SystemMessage(content=SYSTEM_PROMPT + "\nToday is Monday."),
+        tools=[],
+    )
+    middleware.wrap_model_call(request, handler)
+    return sent[0]
+
+
+def tool_request(name: str) -> SimpleNamespace:
+    """Build a minimal tool call request."""
+    return SimpleNamespace(tool_call={"name": name, "args": {}, "id": "3"})
+
+
+def test_attribute_prompt_by_source() -> None:
+    breakdown = attribute_prompt(
+        SystemMessage(content=SYSTEM_PROMPT + "\nToday is Monday."), history(), []
+    )
+    assert breakdown["skills"] == breakdown["api"] == 1000
+    assert set(breakdown) == {
+        "system_prompt",
+        "system_other",
+        "user",
+        "assistant",
+        "skills",
+        "api",
+    }
+
+
+def test_usage_as_dict() -> None:
+    usage = TokenUsage(budget=100)
+    usage.add(Counter({"api": 60, "user": 10}))
+    usage.add(Counter({"api": 40, "user": 10}))
+    assert usage.exceeded
+    assert usage.as_dict() == {
+        "total": 120,
+        "model_calls": 2,
+        "peak_context": 70,
+        "budget": 100,
+        "by_source": {"api": 100, "user": 20},
+    }
+
+
+def test_under_budget_sends_the_prompt_unchanged() -> None:
+    usage = TokenUsage()
+    token = current_usage.set(usage)
+    try:
+        middleware = TokenAccountingMiddleware(budget=100_000)
+        sent = run_model_call(middleware)
+        called = []
+        middleware.wrap_tool_call(tool_request("api_get"), called.append)
+    finally:
+        current_usage.reset(token)
+    assert sent.messages[2].content == LONG_RESULT
+    assert usage.budget == 100_000 and not usage.exceeded
+    assert len(called) == 1
+
+
+def test_over_budget_shortens_older_results_and_refuses_more_data() -> None:
+    usage = TokenUsage(budget=1000)
+    token = current_usage.set(usage)
+    try:
+        middleware = TokenAccountingMiddleware()
+        run_model_call(middleware)
+        assert usage.exceeded
+        sent = run_model_call(middleware)
+        refusal = middleware.wrap_tool_call(tool_request("api_get"), lambda r: None)
+        allowed = middleware.wrap_tool_call(tool_request("calculate"), lambda r: "ok")
+    finally:
+        current_usage.reset(token)
+    # Results before the model's last turn are shortened, the latest is kept
+    assert sent.messages[2].content.endswith(" [shortened: token budget]")
+    assert len(sent.messages[2].content) < 1000
+    assert sent.messages[4].content == LONG_RESULT
+    assert usage.model_calls == 2
+    assert refusal.content.startswith("[Token budget exceeded:")
+    assert allowed == "ok"
@@ -0,0 +1,46 @@
+"""Tests for repeated questions served from the answer cache."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+
+from playground_chatbot.config import config
+from playground_chatbot.local_agents.toolbox.agent import run_toolbox
+from playground_chatbot.local_agents.toolbox.cache import (
+    RunDependencies,
+    answer_cache,
+)
+from playground_chatbot.local_agents.toolbox.progress import current_reporter
+
+
+class Reporter:
+    """Progress reporter recording the answers it sends."""
+
+    def __init__(self) -> None:
+        self.answers: list[tuple[str, bool]] = []
+
+    async def answer(self, text: str, final: bool = False) -> None:
+        self.answers.append((text, final))
+
+
+@pytest.fixture
+def cached_answer(monkeypatch: pytest.MonkeyPatch) -> Iterator[dict]:
+    """Enable the answer cache with one answer in it."""
+    monkeypatch.setattr(config, "answer_cache", True)
+    response = {"response": "All services are healthy.", "agent_name": "toolbox"}
+    answer_cache.put("are all services healthy", None, response, RunDependencies())
+    yield response
+    answer_cache.clear()
+
+
+async def test_cached_answer_is_reported(cached_answer: dict) -> None:
+    reporter = Reporter()
+    token = current_reporter.set(reporter)
+    try:
+        result = await run_toolbox("Are all services healthy?")
+    finally:
+        current_reporter.reset(token)
+    assert result == cached_answer
+    assert reporter.answers == [("All services are healthy.", True)]
@@ -0,0 +1,64 @@
+"""Tests for the headless batch processing of queries."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from playground_chatbot.batch import BatchResult, load_batch
+
+
+def write(tmp_path: Path, *lines: str) -> Path:
+    """Write a batch input file."""
+    path = tmp_path / "queries.jsonl"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_load_batch(tmp_path: Path) -> None:
+    path = write(
+        tmp_path,
+        json.dumps({"id": "health", "query": "Is the API gateway up?", "tag": "a"}),
+        "",
+        json.dumps("Any critical alerts?"),
+        json.dumps({"query": "Last deployment?"}),
+    )
+    queries = load_batch(path)
+    assert [(q.index, q.id, q.query) for q in queries] == [
+        (0, "health", "Is the API gateway up?"),
+        (1, "2", "Any critical alerts?"),
+        (2, "3", "Last deployment?"),
+    ]
+    assert queries[0].extra == {"tag": "a"}
+
+
+@pytest.mark.parametrize(
+    ("line", "message"),
+    [
+        ("{not json", r"queries.jsonl:2: invalid JSON"),
+        (json.dumps({"id": "x"}), r"queries.jsonl:2: expected an object"),
+        (json.dumps({"query": "  "}), r"queries.jsonl:2: expected an object"),
+        ("[1, 2]", r"queries.jsonl:2: expected an object"),
+    ],
+)
+def test_load_batch_errors(tmp_path: Path, line: str, message: str) -> None:
+    path = write(tmp_path, json.dumps("Any critical alerts?"), line)
+    with pytest.raises(ValueError, match=message):
+        load_batch(path)
+
+
+def test_result_keeps_input_fields_without_overriding() -> None:
+    result = BatchResult(
+        index=0,
+        id="health",
+        query="Is the API gateway up?",
+        response="Yes",
+        tools={"api_get": 2},
+        extra={"tag": "a", "response": "ignored"},
+    )
+    data = result.as_dict()
+    assert data["tag"] == "a"
+    assert data["response"] == "Yes"
+    assert data["tool_calls"] == 2
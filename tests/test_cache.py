@@ -0,0 +1,49 @@
+"""Tests for the toolbox result caches."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from playground_chatbot.local_agents.toolbox.cache import TTLCache
+
+
+def test_entries_expire() -> None:
+    cache = TTLCache()
+    cache.set("fresh", "value", ttl=60)
+    cache.set("stale", "value", ttl=-1)
+    assert cache.get("fresh") is not None
+    assert cache.get("stale") is None
+
+
+def test_least_recently_used_is_evicted() -> None:
+    cache = TTLCache(max_entries=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.get("a")
+    cache.set("c", 3, ttl=60)
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+
+
+def test_shared_cache_is_seen_by_other_processes(tmp_path: Path) -> None:
+    path = tmp_path / "cache.db"
+    first, second = TTLCache(), TTLCache()
+    first.share(path, "api")
+    second.share(path, "api")
+    first.set("/services", [1, 2], ttl=60)
+    entry = second.get("/services")
+    assert entry is not None
+    assert entry.value == [1, 2]
+
+
+def test_sharing_keeps_the_entries_of_other_processes(tmp_path: Path) -> None:
+    path = tmp_path / "cache.db"
+    running = TTLCache()
+    running.share(path, "api")
+    running.set("/services", [1, 2], ttl=60)
+
+    starting = TTLCache()
+    starting.set("local", "dropped", ttl=60)
+    starting.share(path, "api")
+    assert starting.get("local") is None
+    assert running.get("/services") is not None
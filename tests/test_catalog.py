@@ -0,0 +1,101 @@
+"""Tests for the service catalog and the lookup_service tool."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from playground_chatbot.local_agents.toolbox.catalog import (
+    ServiceCatalog,
+    build_catalog,
+    parse_catalog,
+)
+from playground_chatbot.local_agents.toolbox.tools import FACTS_DIR, lookup_service
+
+CATALOG_FACT = FACTS_DIR / "devops-services-catalog.md"
+
+
+def catalog_records() -> list[dict]:
+    """Parse the real services catalog fact."""
+    return parse_catalog(CATALOG_FACT.read_text(), "devops-services-catalog.md")
+
+
+def lookup(id_or_slug: str, fields: list[str] | None = None) -> str:
+    """Call the lookup_service tool."""
+    return lookup_service.invoke({"id_or_slug": id_or_slug, "fields": fields})
+
+
+def test_parses_the_services_catalog_fact() -> None:
+    records = catalog_records()
+    assert [r["slug"] for r in records] == [
+        "web-frontend",
+        "api-gateway",
+        "auth-service",
+        "postgres-primary",
+        "redis-cache",
+        "worker-queue",
+    ]
+    auth = records[2]
+    assert auth["id"] == 3
+    assert auth["name"] == "Authentication Service"
+    assert auth["owner_email"] == "security-team@example.com"
+    assert auth["depends_on"] == [5, 4]
+    assert auth["sla_percent"] == 99.99
+    assert auth["tier"].startswith("Tier 1")
+    assert auth["source"] == "devops-services-catalog.md"
+    assert len(auth["typical_issues"]) == 4
+
+
+def test_services_without_dependencies() -> None:
+    postgres = catalog_records()[3]
+    assert postgres["critical_dependencies"] == []
+    assert postgres["depends_on"] == []
+
+
+def test_other_facts_are_no_catalog() -> None:
+    assert parse_catalog("# Runbook\n\n**Owner**: SRE\n") == []
+
+
+@pytest.mark.parametrize(
+    "key", ["4", 4, "ID 4", "postgres-primary", "Postgres Primary", "postgres_primary"]
+)
+def test_catalog_lookups(key: str | int) -> None:
+    catalog = build_catalog([(CATALOG_FACT, CATALOG_FACT.read_text())])
+    record = catalog.get(key)
+    assert record is not None
+    assert record["slug"] == "postgres-primary"
+
+
+def test_unknown_services_are_none() -> None:
+    assert ServiceCatalog().get("postgres-primary") is None
+
+
+@pytest.mark.parametrize("key", ["3", "auth-service", "Authentication Service"])
+def test_lookup_service_by_id_slug_and_name(key: str) -> None:
+    record = json.loads(lookup(key))
+    assert record["id"] == 3
+    assert record["slug"] == "auth-service"
+
+
+def test_lookup_service_projects_fields() -> None:
+    record = json.loads(lookup("redis-cache", ["owner", "sla_percent"]))
+    assert record == {
+        "id": 5,
+        "owner": "Platform Team (platform-team@example.com)",
+        "sla_percent": 99.9,
+    }
+
+
+def test_lookup_service_unknown_service() -> None:
+    assert lookup("billing") == (
+        "Error: Service 'billing' not found. Known services: 1 (web-frontend), "
+        "2 (api-gateway), 3 (auth-service), 4 (postgres-primary), "
+        "5 (redis-cache), 6 (worker-queue)."
+    )
+
+
+def test_lookup_service_unknown_field() -> None:
+    result = lookup("4", ["owner", "region"])
+    assert result.startswith("Error: Unknown fields ['region']. Available fields: ")
+    assert "owner_email" in result
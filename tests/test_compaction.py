@@ -0,0 +1,124 @@
+"""Tests for the tool-result compaction helpers."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from playground_chatbot.local_agents.toolbox.compaction import (
+    compact_payload,
+    estimate_tokens,
+    payload_ref,
+    select_path,
+    split_note,
+)
+
+SERVICES = [
+    {"id": i, "name": f"svc-{i}", "status": "healthy", "issues": []}
+    for i in range(1, 51)
+]
+
+
+def test_small_payload_is_unchanged() -> None:
+    content = json.dumps(SERVICES[:2])
+    assert compact_payload(content, max_tokens=2000) == (content, False)
+
+
+def test_allowlist_projects_objects() -> None:
+    content, compacted = compact_payload(
+        json.dumps(SERVICES[:2]),
+        endpoint="/services?status=healthy",
+        field_allowlists={"/services": ["id", "status"]},
+    )
+    assert compacted
+    assert json.loads(content) == [
+        {"id": 1, "status": "healthy"},
+        {"id": 2, "status": "healthy"},
+    ]
+
+
+def test_allowlist_projects_wrapped_lists() -> None:
+    wrapped = {"services": SERVICES[:2], "total": 2}
+    content, _ = compact_payload(
+        json.dumps(wrapped),
+        endpoint="/services",
+        field_allowlists={"/services": ["id", "status"]},
+    )
+    assert json.loads(content) == {
+        "services": [{"id": 1, "status": "healthy"}, {"id": 2, "status": "healthy"}],
+        "total": 2,
+    }
+
+
+def test_long_arrays_are_collapsed_over_budget() -> None:
+    content, compacted = compact_payload(
+        json.dumps(SERVICES), max_tokens=200, sample_size=3
+    )
+    data = json.loads(content)
+    assert compacted
+    assert data["_count"] == 50
+    assert [item["id"] for item in data["_sample"]] == [1, 2, 3]
+
+
+def test_text_over_budget_is_truncated() -> None:
+    content, compacted = compact_payload("x" * 1000, max_tokens=10)
+    assert compacted
+    assert content.startswith("x" * 40)
+    assert "[truncated 960 chars]" in content
+
+
+def test_estimate_tokens_rounds_up() -> None:
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcde") == 2
+
+
+def test_payload_ref_is_content_addressed() -> None:
+    assert payload_ref("a") == payload_ref("a")
+    assert payload_ref("a") != payload_ref("b")
+    assert payload_ref("a").startswith("res_")
+
+
+def test_select_path() -> None:
+    content = json.dumps(SERVICES[:3])
+    assert json.loads(select_path(content, "1.name")) == "svc-2"
+    assert json.loads(select_path(content, "-1.id")) == 3
+
+
+@pytest.mark.parametrize(
+    ("content", "path", "message"),
+    [
+        ("not json", "0", "not JSON"),
+        ("[1, 2]", "5", "out of range"),
+        ('{"a": 1}', "b", "'b' not found"),
+    ],
+)
+def test_select_path_errors(content: str, path: str, message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        select_path(content, path)
+
+
+def test_split_note() -> None:
+    note = "\n[Snapshot from 12s ago, refreshed in the background]"
+    assert split_note('[{"id": 1}]' + note) == ('[{"id": 1}]', note)
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '[{"id": 1}]',
+        '{"a": 1}\n[not a note',
+        '{"a": 1}\n[note]\nmore text',
+        json.dumps([[1], [2]], indent=2),
+    ],
+)
+def test_split_note_without_a_note(content: str) -> None:
+    assert split_note(content) == (content, "")
+
+
+def test_payload_with_a_note_still_compacts() -> None:
+    payload, note = split_note(json.dumps(SERVICES) + "\n[Snapshot from 5s ago]")
+    content, compacted = compact_payload(payload, max_tokens=200)
+    assert compacted
+    assert json.loads(content)["_count"] == 50
+    assert note == "\n[Snapshot from 5s ago]"
@@ -0,0 +1,94 @@
+"""Tests for the per-request deadlines."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+
+import pytest
+
+from playground_chatbot.config import config
+from playground_chatbot.local_agents.toolbox.agent import _start_deadline
+from playground_chatbot.local_agents.toolbox.deadline import (
+    Deadline,
+    current_deadline,
+    partial_response,
+)
+
+
+def test_answer_reserve_is_capped_to_a_quarter() -> None:
+    deadline = Deadline(seconds=8, answer_reserve=10)
+    assert deadline.answer_reserve == 2
+    assert 5.9 < deadline.tool_time() <= 6
+    assert not deadline.wrapping_up
+
+
+def test_expired_deadline_is_wrapping_up() -> None:
+    deadline = Deadline(seconds=5, expires_at=time.monotonic() - 1)
+    assert deadline.remaining() == 0
+    assert deadline.wrapping_up
+
+
+def test_partial_response_lists_gathered_and_pending_work() -> None:
+    deadline = Deadline(seconds=30)
+    deadline.start("c1", "api_get /services")
+    deadline.finish("c1", "api_get", '[{"id": 1, "status": "healthy"}]')
+    deadline.start("c2", "fetch_file /logs/api.log")
+    deadline.skip("c3", "api_get /alerts")
+    text = partial_response(deadline)
+    assert text.startswith("[Partial answer: the 30s time limit")
+    assert '- api_get /services: [{"id": 1, "status": "healthy"}]' in text
+    assert "- api_get /alerts (skipped)" in text
+    assert "- fetch_file /logs/api.log (cancelled)" in text
+
+
+def test_partial_response_without_data() -> None:
+    text = partial_response(Deadline(seconds=10))
+    assert "No data was gathered before the deadline." in text
+    assert "Not completed" not in text
+
+
+@pytest.fixture
+def outer() -> Iterator[Deadline]:
+    """Run within an enclosing request with 10 seconds left."""
+    deadline = Deadline(seconds=10)
+    token = current_deadline.set(deadline)
+    yield deadline
+    current_deadline.reset(token)
+
+
+@pytest.mark.parametrize("seconds", [None, 0])
+def test_unbounded_request(seconds: float | None) -> None:
+    assert _start_deadline(seconds) is None
+
+
+def test_request_deadline(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "toolbox_answer_reserve", 1.0)
+    deadline = _start_deadline(20)
+    assert deadline is not None
+    assert deadline.seconds == 20
+    assert deadline.answer_reserve == 1.0
+
+
+def test_nested_request_with_less_time_keeps_its_own(outer: Deadline) -> None:
+    deadline = _start_deadline(5)
+    assert deadline is not None
+    assert deadline.expires_at < outer.expires_at
+
+
+@pytest.mark.parametrize("seconds", [None, 0, 60])
+def test_nested_request_shares_an_earlier_deadline(
+    outer: Deadline, seconds: float | None
+) -> None:
+    deadline = _start_deadline(seconds)
+    assert deadline is not None
+    assert deadline.expires_at == outer.expires_at
+
+
+def test_nested_request_after_the_outer_deadline_is_expired(
+    outer: Deadline,
+) -> None:
+    outer.expires_at = time.monotonic() - 1
+    deadline = _start_deadline(60)
+    assert deadline is not None
+    assert deadline.remaining() == 0
@@ -0,0 +1,123 @@
+"""Tests for the dependency graph and the impact_analysis tool."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from playground_chatbot.local_agents.toolbox import tools
+from playground_chatbot.local_agents.toolbox.catalog import ServiceCatalog
+from playground_chatbot.local_agents.toolbox.impact import (
+    DependencyGraph,
+    analyze_impact,
+)
+from playground_chatbot.offline import FIXTURES_DIR
+
+SERVICES_PAYLOAD = (FIXTURES_DIR / "services.json").read_text()
+
+
+def slugs(entries: list[dict[str, Any]]) -> set[str]:
+    """Get the slugs of described services."""
+    return {entry["slug"] for entry in entries}
+
+
+def cyclic_graph() -> DependencyGraph:
+    """Build a graph where a → b → c → a, and an entry point depends on a."""
+    catalog = ServiceCatalog()
+    for service_id, slug, depends_on in [
+        (1, "a", [2]),
+        (2, "b", [3]),
+        (3, "c", [1]),
+        (4, "entry", [1]),
+    ]:
+        catalog.add(
+            {
+                "id": service_id,
+                "name": slug.upper(),
+                "slug": slug,
+                "depends_on": depends_on,
+                "sla_percent": 99.9,
+            }
+        )
+    return DependencyGraph.from_catalog(catalog)
+
+
+async def analyze(service: str, **kwargs: Any) -> dict[str, Any] | str:
+    """Call the impact_analysis tool, decoding JSON results."""
+    result = await tools.impact_analysis.ainvoke({"service": service, **kwargs})
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError:
+        return result
+
+
+def test_postgres_primary_blast_radius() -> None:
+    result = analyze_impact(tools.get_dependency_graph(), 4)
+    assert slugs(result["blast_radius"]) == {
+        "auth-service",
+        "worker-queue",
+        "api-gateway",
+        "web-frontend",
+    }
+    assert result["upstream"] == []
+    assert result["critical_paths"][0] == {
+        "path": ["web-frontend", "api-gateway", "auth-service", "postgres-primary"],
+        "combined_sla_percent": 99.88,
+    }
+    assert result["effective_sla_percent"] == 99.99
+
+
+def test_upstream_and_effective_sla() -> None:
+    result = analyze_impact(tools.get_dependency_graph(), 3)
+    assert {(e["slug"], e["distance"]) for e in result["upstream"]} == {
+        ("redis-cache", 1),
+        ("postgres-primary", 1),
+    }
+    assert result["effective_sla_percent"] == 99.88
+
+
+def test_cycles_terminate() -> None:
+    graph = cyclic_graph()
+    assert graph.downstream(1) == {3: 1, 4: 1, 2: 2}
+    assert graph.upstream(1) == {2: 1, 3: 2}
+    assert graph.critical_paths(1) == [[2, 3, 1], [4, 1]]
+    assert analyze_impact(graph, 1)["summary"] == (
+        "a failing affects 3 service(s) through 2 path(s); it depends on 2 service(s)."
+    )
+
+
+async def test_unknown_service() -> None:
+    assert await analyze("billing", live_status=False) == (
+        "Error: Service 'billing' not found. Use lookup_service() IDs."
+    )
+
+
+async def test_live_statuses_mark_degraded_services(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def fake_api_get(service: str, endpoint: str, **kwargs: Any) -> str:
+        assert (service, endpoint) == ("devops", "/services")
+        return SERVICES_PAYLOAD
+
+    monkeypatch.setattr(tools, "cached_api_get", fake_api_get)
+    result = await analyze("auth-service")
+    assert isinstance(result, dict)
+    assert result["service"]["status"] == "healthy"
+    assert slugs(result["unhealthy_upstream"]) == {"postgres-primary"}
+    assert slugs(result["unhealthy_downstream"]) == {"api-gateway"}
+    assert result["critical_paths"][0]["unhealthy"] == ["api-gateway"]
+
+
+async def test_live_status_errors_are_reported(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def failing_api_get(service: str, endpoint: str, **kwargs: Any) -> str:
+        raise RuntimeError("DevOps API unreachable")
+
+    monkeypatch.setattr(tools, "cached_api_get", failing_api_get)
+    result = await analyze("4")
+    assert isinstance(result, dict)
+    assert result["live_status_error"] == "DevOps API unreachable"
+    assert "unhealthy_upstream" not in result
@@ -0,0 +1,125 @@
+"""Tests for the per-service limits of upstream API calls."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from playground_chatbot.local_agents.toolbox import limits
+from playground_chatbot.local_agents.toolbox.limits import (
+    CircuitOpen,
+    ServiceGuard,
+    Throttled,
+    is_upstream_failure,
+)
+
+
+class Clock:
+    """Monotonic clock moved by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> Clock:
+    """Replace the guards' clock."""
+    clock = Clock()
+    monkeypatch.setattr(limits.time, "monotonic", clock)
+    return clock
+
+
+async def attempt(guard: ServiceGuard, success: bool = True) -> None:
+    """Make a guarded call and record its outcome."""
+    async with guard.call():
+        pass
+    guard.record(success)
+
+
+async def open_circuit(guard: ServiceGuard) -> None:
+    """Fail enough calls to open the guard's circuit."""
+    for _ in range(guard.failure_threshold):
+        await attempt(guard, success=False)
+    assert guard.state == "open"
+
+
+async def test_rate_limit_throttles_after_the_burst() -> None:
+    guard = ServiceGuard("devops", rate=1, burst=2, max_wait=0)
+    await attempt(guard)
+    await attempt(guard)
+    with pytest.raises(Throttled, match="rate limit"):
+        await attempt(guard)
+
+
+async def test_concurrency_cap_throttles() -> None:
+    guard = ServiceGuard("devops", rate=0, max_in_flight=1, max_wait=0)
+    async with guard.call():
+        with pytest.raises(Throttled, match="concurrent call limit"):
+            await attempt(guard)
+    await attempt(guard)
+    assert guard.stats()["in_flight"] == 0
+
+
+async def test_circuit_opens_and_fails_fast(clock: Clock) -> None:
+    guard = ServiceGuard("devops", rate=0, failure_threshold=2, reset_timeout=30)
+    await open_circuit(guard)
+    with pytest.raises(CircuitOpen, match="paused for 30s"):
+        await attempt(guard)
+
+
+async def test_successful_trial_closes_the_circuit(clock: Clock) -> None:
+    guard = ServiceGuard("devops", rate=0, failure_threshold=2, reset_timeout=30)
+    await open_circuit(guard)
+    clock.now += 31
+    assert guard.state == "half_open"
+    await attempt(guard)
+    assert guard.state == "closed"
+
+
+async def test_failed_trial_reopens_the_circuit(clock: Clock) -> None:
+    guard = ServiceGuard("devops", rate=0, failure_threshold=2, reset_timeout=30)
+    await open_circuit(guard)
+    clock.now += 31
+    await attempt(guard, success=False)
+    assert guard.state == "open"
+
+
+async def test_only_one_trial_at_a_time(clock: Clock) -> None:
+    guard = ServiceGuard("devops", rate=0, failure_threshold=1, reset_timeout=30)
+    await open_circuit(guard)
+    clock.now += 31
+    async with guard.call():
+        with pytest.raises(CircuitOpen):
+            await attempt(guard)
+
+
+@pytest.mark.parametrize("error", [asyncio.CancelledError, TimeoutError])
+async def test_interrupted_trial_releases_the_trial(
+    clock: Clock, error: type[BaseException]
+) -> None:
+    guard = ServiceGuard("devops", rate=0, failure_threshold=1, reset_timeout=30)
+    await open_circuit(guard)
+    clock.now += 31
+    with pytest.raises(error):
+        async with guard.call():
+            raise error
+    # No outcome was recorded: the next call is the trial
+    assert guard.state == "half_open"
+    await attempt(guard)
+    assert guard.state == "closed"
+
+
+@pytest.mark.parametrize(
+    ("error", "upstream"),
+    [
+        ("Error: API returned 503 Service Unavailable", True),
+        ("Error: Connection refused", True),
+        ("Error: API returned 404 Not Found", False),
+    ],
+)
+def test_is_upstream_failure(error: str, upstream: bool) -> None:
+    assert is_upstream_failure(error) is upstream
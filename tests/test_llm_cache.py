@@ -0,0 +1,83 @@
+"""Tests for the record/replay cache of model responses."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from playground_chatbot.local_agents.toolbox.llm_cache import (
+    LLMCacheMiss,
+    request_key,
+)
+from playground_chatbot.local_agents.toolbox.middleware import LLMCacheMiddleware
+
+MODEL = FakeListChatModel(responses=["unused"])
+
+
+def make_request(
+    query: str = "Is the API gateway healthy?", **kwargs: str
+) -> ModelRequest:
+    """Build a model request with a dated system message."""
+    return ModelRequest(
+        model=MODEL,
+        system_message=SystemMessage(
+            content=kwargs.pop("system", "Today is Monday, 2026-10-19 09:30.")
+        ),
+        messages=[HumanMessage(content=query, id=kwargs.pop("id", "m1"))],
+        tools=[],
+    )
+
+
+class Model:
+    """Model handler counting its calls."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __call__(self, request: ModelRequest) -> ModelResponse:
+        self.calls += 1
+        return ModelResponse(result=[AIMessage(content=f"answer {self.calls}")])
+
+
+def test_key_ignores_message_ids_and_dates() -> None:
+    key = request_key(make_request())
+    assert request_key(make_request(id="m2")) == key
+    assert (
+        request_key(make_request(system="Today is Tuesday, 2026-10-20 17:05.")) == key
+    )
+    assert request_key(make_request("Is the API gateway up?")) != key
+
+
+def test_record_then_replay(tmp_path: Path) -> None:
+    model = Model()
+    recorder = LLMCacheMiddleware(mode="record", directory=tmp_path)
+    recorded = recorder.wrap_model_call(make_request(), model)
+    # Recorded responses are replayed in record mode too
+    again = recorder.wrap_model_call(make_request(), model)
+    assert model.calls == 1
+    assert again.result[0].content == recorded.result[0].content == "answer 1"
+
+    replayer = LLMCacheMiddleware(mode="replay", directory=tmp_path)
+    replayed = replayer.wrap_model_call(make_request(id="m9"), model)
+    assert model.calls == 1
+    assert replayed.result[0].content == "answer 1"
+
+
+def test_replay_miss_on_a_changed_prompt(tmp_path: Path) -> None:
+    model = Model()
+    LLMCacheMiddleware(mode="record", directory=tmp_path).wrap_model_call(
+        make_request(), model
+    )
+    replayer = LLMCacheMiddleware(mode="replay", directory=tmp_path)
+    with pytest.raises(LLMCacheMiss, match="No recorded model response"):
+        replayer.wrap_model_call(make_request("Is the API gateway up?"), model)
+    assert model.calls == 1
+
+
+def test_unknown_mode_is_rejected(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Unknown llm_cache_mode"):
+        LLMCacheMiddleware(mode="rewind", directory=tmp_path)
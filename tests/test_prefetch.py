@@ -0,0 +1,102 @@
+"""Tests for the speculative prefetch of skill API calls."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from playground_chatbot.local_agents.toolbox import prefetch
+from playground_chatbot.local_agents.toolbox.cache import api_cache, api_cache_key
+from playground_chatbot.local_agents.toolbox.prefetch import (
+    Prefetcher,
+    build_index,
+    parse_api_calls,
+)
+
+SKILL = """---
+name: check-alerts
+description: Check the alerts
+---
+1. api_get(service="devops", endpoint="/alerts")
+2. api_get(service='devops', endpoint='/services')
+3. api_get(service="devops", endpoint="/alerts")
+4. api_get(service="devops", endpoint="/services/{id}")
+5. api_get(service="devops", endpoint="/pipelines")
+"""
+
+
+@pytest.fixture
+def skills(tmp_path: Path) -> Path:
+    """A skills directory with one skill in a subdirectory."""
+    (tmp_path / "alerts").mkdir()
+    (tmp_path / "alerts" / "check.md").write_text(SKILL, encoding="utf-8")
+    (tmp_path / "no-calls.md").write_text("Just text.", encoding="utf-8")
+    return tmp_path
+
+
+@pytest.fixture
+def fetched(monkeypatch: pytest.MonkeyPatch) -> Iterator[list[str]]:
+    """Answer the prefetched calls, recording their endpoints."""
+    endpoints: list[str] = []
+
+    async def fake_call_api(args: dict[str, Any]) -> str:
+        endpoints.append(args["endpoint"])
+        return "[]"
+
+    monkeypatch.setattr(prefetch, "call_api", fake_call_api)
+    yield endpoints
+    api_cache.clear()
+
+
+async def settle(prefetcher: Prefetcher) -> None:
+    """Wait for the in-flight prefetches of the skill."""
+    for args in prefetcher.index["alerts/check.md"]:
+        await prefetcher.wait(api_cache_key(args))
+
+
+def test_parse_api_calls_skips_duplicates_and_placeholders() -> None:
+    assert [call["endpoint"] for call in parse_api_calls(SKILL)] == [
+        "/alerts",
+        "/services",
+        "/pipelines",
+    ]
+
+
+def test_build_index(skills: Path) -> None:
+    index = build_index(skills)
+    assert list(index) == ["alerts/check.md"]
+    assert index["alerts/check.md"][0] == {"service": "devops", "endpoint": "/alerts"}
+
+
+async def test_schedule_is_capped_to_max_calls(skills: Path, fetched: list) -> None:
+    prefetcher = Prefetcher(skills, max_calls=2)
+    assert prefetcher.schedule("/alerts/check.md") == 2
+    await settle(prefetcher)
+    assert fetched == ["/alerts", "/services"]
+    # Cached calls aren't fetched again
+    assert prefetcher.schedule("alerts/check.md") == 0
+    assert prefetcher.schedule("unknown.md") == 0
+
+
+def test_schedule_needs_an_event_loop(skills: Path) -> None:
+    assert Prefetcher(skills).schedule("alerts/check.md") == 0
+
+
+async def test_hits_and_wasted_prefetches(skills: Path, fetched: list) -> None:
+    prefetcher = Prefetcher(skills)
+    prefetcher.schedule("alerts/check.md")
+    await settle(prefetcher)
+    key = api_cache_key({"service": "devops", "endpoint": "/alerts"})
+    entry = api_cache.get(key)
+    assert entry is not None
+    assert prefetcher.claim(key, entry)
+    # Each prefetched result counts as a hit once
+    assert not prefetcher.claim(key, entry)
+    stats = prefetcher.stats()
+    assert stats["completed"] == 3
+    assert stats["hits"] == 1
+    assert stats["wasted"] == 2
+    assert stats["hit_ratio"] == pytest.approx(1 / 3)
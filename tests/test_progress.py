@@ -0,0 +1,120 @@
+"""Tests for the progress events of toolbox runs."""
+
+from __future__ import annotations
+
+from typing import Any
+from uuid import UUID, uuid4
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+from playground_chatbot.local_agents.toolbox.progress import (
+    AnswerStreamHandler,
+    partial_response_text,
+    quiet_model_calls,
+    tool_detail,
+)
+
+
+class Reporter:
+    """Progress reporter recording the answers it sends."""
+
+    def __init__(self) -> None:
+        self.answers: list[str] = []
+
+    async def answer(self, text: str, final: bool = False) -> None:
+        self.answers.append(text)
+
+
+async def stream(
+    handler: AnswerStreamHandler,
+    tokens: list[str] | None = None,
+    calls: list[dict[str, Any]] | None = None,
+) -> UUID:
+    """Stream one model call's text tokens and then its tool call chunks."""
+    run_id = uuid4()
+    await handler.on_chat_model_start({}, [], run_id=run_id)
+    for token in tokens or []:
+        chunk = ChatGenerationChunk(message=AIMessageChunk(content=token))
+        await handler.on_llm_new_token(token, chunk=chunk, run_id=run_id)
+    for call in calls or []:
+        message = AIMessageChunk(content="", tool_call_chunks=[call])
+        chunk = ChatGenerationChunk(message=message)
+        await handler.on_llm_new_token("", chunk=chunk, run_id=run_id)
+    await handler.on_llm_end(None, run_id=run_id)
+    return run_id
+
+
+def call_chunk(args: str, name: str | None = None) -> dict[str, Any]:
+    """Build a tool call chunk (the name comes with the first one)."""
+    return {"name": name, "args": args, "id": None, "index": 0}
+
+
+@pytest.mark.parametrize(
+    ("args", "text"),
+    [
+        ('{"response_text": "All good', "All good"),
+        ('{"response_text": "Line 1\\nLine', "Line 1\nLine"),
+        ('{"response_text": "caf\\u00e9", "tools', "café"),
+        ('{"response_text": "ends with \\', "ends with "),
+        ('{"tools_used": []', None),
+    ],
+)
+def test_partial_response_text(args: str, text: str | None) -> None:
+    assert partial_response_text(args) == text
+
+
+def test_tool_detail() -> None:
+    assert tool_detail("api_get", {"endpoint": "/alerts"}) == "api_get /alerts"
+    assert tool_detail("list_skills", {}) == "list_skills"
+
+
+async def test_structured_mode_streams_only_the_response_text() -> None:
+    reporter = Reporter()
+    handler = AnswerStreamHandler(reporter, response_tool="AgentResponse")
+    await stream(
+        handler,
+        tokens=["Let me check ", "the alerts."],
+        calls=[call_chunk('{"endpoint": "/alerts"}', name="api_get")],
+    )
+    await stream(
+        handler,
+        calls=[
+            call_chunk('{"response_text": "Two', name="AgentResponse"),
+            call_chunk(' alerts."}'),
+        ],
+    )
+    assert reporter.answers == ["Two", "Two alerts."]
+
+
+async def test_structured_mode_streams_native_json_output() -> None:
+    reporter = Reporter()
+    handler = AnswerStreamHandler(reporter, response_tool="AgentResponse")
+    await stream(handler, tokens=['{"response_text": "All', ' good"}'])
+    assert reporter.answers == ["All", "All good"]
+
+
+async def test_plain_text_mode_holds_back_tool_calling_turns() -> None:
+    reporter = Reporter()
+    handler = AnswerStreamHandler(reporter)
+    await stream(
+        handler,
+        tokens=["Let me check the alerts."],
+        calls=[call_chunk('{"endpoint": "/alerts"}', name="api_get")],
+    )
+    assert reporter.answers == []
+    await stream(handler, tokens=["There are ", "two alerts."])
+    assert reporter.answers == ["There are two alerts."]
+
+
+async def test_quiet_model_calls_are_not_streamed() -> None:
+    reporter = Reporter()
+    handler = AnswerStreamHandler(reporter)
+    token = quiet_model_calls.set(True)
+    try:
+        await stream(handler, tokens=["Fast answer."])
+    finally:
+        quiet_model_calls.reset(token)
+    await stream(handler, tokens=["Main answer."])
+    assert reporter.answers == ["Main answer."]
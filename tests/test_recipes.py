@@ -0,0 +1,129 @@
+"""Tests for the skill recipes fast path."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from playground_chatbot.local_agents.toolbox import recipes
+from playground_chatbot.local_agents.toolbox.recipes import (
+    RecipeError,
+    _parse_recipe,
+    load_recipes,
+    run_recipe,
+)
+from playground_chatbot.local_agents.toolbox.tools import SKILLS_DIR
+from playground_chatbot.offline import FIXTURES_DIR
+
+FRONTMATTER = {
+    "name": "check-service-health",
+    "recipe": {
+        "intents": [r"^is (the )?(?P<service>[a-z-]+) healthy$"],
+        "calls": {"svc": {"service": "devops", "endpoint": "/services/{service}"}},
+        "compute": {
+            "sla": "'met' if svc['uptime_percent'] >= 99.95 else 'missed'",
+            "issues": "len(svc['issues'])",
+        },
+        "template": "{svc[name]} is {svc[status]} (SLA {sla}, {issues} issues).",
+    },
+}
+
+SERVICE = {
+    "name": "api-gateway",
+    "status": "warning",
+    "uptime_percent": 99.9,
+    "issues": ["High latency detected"],
+}
+
+
+@pytest.fixture
+def api_calls(monkeypatch: pytest.MonkeyPatch) -> list[dict[str, Any]]:
+    """Answer the recipe API calls with SERVICE, recording their arguments."""
+    calls: list[dict[str, Any]] = []
+
+    async def fake_api_get(**kwargs: Any) -> str:
+        calls.append(kwargs)
+        return json.dumps(SERVICE)
+
+    monkeypatch.setattr(recipes, "cached_api_get", fake_api_get)
+    return calls
+
+
+def test_parse_recipe() -> None:
+    recipe = _parse_recipe(FRONTMATTER, "monitoring/health.md")
+    assert recipe is not None
+    assert recipe.skill == "check-service-health"
+    assert recipe.match("is the api-gateway healthy") == {"service": "api-gateway"}
+    assert recipe.match("restart the api-gateway") is None
+
+
+@pytest.mark.parametrize(
+    "frontmatter",
+    [
+        {"name": "no-recipe"},
+        {"recipe": {"intents": ["^x$"]}},  # no template
+        {"recipe": {"intents": ["(unclosed"], "template": "x"}},
+        {"recipe": {"intents": [], "template": "x"}},
+    ],
+)
+def test_parse_recipe_ignores_missing_or_invalid(frontmatter: dict) -> None:
+    assert _parse_recipe(frontmatter, "skill.md") is None
+
+
+async def test_run_recipe_computes_and_renders(api_calls: list) -> None:
+    recipe = _parse_recipe(FRONTMATTER, "monitoring/health.md")
+    assert recipe is not None
+    result = await run_recipe(recipe, {"service": "api-gateway"})
+    assert api_calls == [{"service": "devops", "endpoint": "/services/api-gateway"}]
+    assert result == {
+        "response": "api-gateway is warning (SLA missed, 1 issues).",
+        "agent_name": "toolbox",
+        "tools_used": ["api_get", "calculate"],
+    }
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"compute": {"sla": "svc['missing_field']"}},
+        {"compute": {"sla": "__import__('os')"}},
+        {"template": "{unknown}"},
+    ],
+)
+async def test_run_recipe_failures_raise_recipe_error(
+    api_calls: list, change: dict
+) -> None:
+    spec = {**FRONTMATTER["recipe"], **change}
+    recipe = _parse_recipe({"name": "broken", "recipe": spec}, "broken.md")
+    assert recipe is not None
+    with pytest.raises(RecipeError, match="Recipe 'broken' failed"):
+        await run_recipe(recipe, {"service": "api-gateway"})
+
+
+async def test_recipe_without_calls_uses_no_tools() -> None:
+    recipe = _parse_recipe(
+        {"recipe": {"intents": ["^ping$"], "template": "pong"}}, "ping.md"
+    )
+    assert recipe is not None
+    result = await run_recipe(recipe)
+    assert result["response"] == "pong"
+    assert result["tools_used"] == []
+
+
+async def test_shipped_recipes_render_with_the_fixtures(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    services = json.loads((FIXTURES_DIR / "services.json").read_text())
+    by_id = {f"/services/{service['id']}": service for service in services}
+
+    async def fixture_api_get(service: str, endpoint: str, **kwargs: Any) -> str:
+        return json.dumps(by_id[endpoint])
+
+    monkeypatch.setattr(recipes, "cached_api_get", fixture_api_get)
+    shipped = load_recipes(SKILLS_DIR)
+    assert shipped
+    for recipe in shipped:
+        result = await run_recipe(recipe)
+        assert "{" not in result["response"], recipe.skill
@@ -0,0 +1,97 @@
+"""Tests for the background refresh of API endpoints."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterator
+
+import pytest
+from macsdk.core.api_registry import register_api_service
+
+from playground_chatbot.local_agents.toolbox import refresher as refresher_module
+from playground_chatbot.local_agents.toolbox import tools
+from playground_chatbot.local_agents.toolbox.cache import (
+    RunDependencies,
+    answer_cache,
+    api_cache,
+    api_cache_key,
+)
+from playground_chatbot.local_agents.toolbox.refresher import ApiRefresher
+from playground_chatbot.offline import FIXTURES_DIR, MockDevOpsAPI
+
+SERVICES_KEY = api_cache_key({"service": "devops", "endpoint": "/services"})
+QUERY = "Are all services healthy?"
+
+
+@pytest.fixture
+def mock_api(monkeypatch: pytest.MonkeyPatch) -> Iterator[MockDevOpsAPI]:
+    """Serve the DevOps fixtures locally as the devops API service."""
+    api = MockDevOpsAPI().start()
+    register_api_service(name="devops", base_url=api.base_url, max_retries=0)
+    # Registered again with its real URL on next use
+    monkeypatch.setattr(tools, "_api_registered", True)
+    yield api
+    tools._api_registered = False
+    api.stop()
+
+
+@pytest.fixture
+def stale_answer() -> Iterator[str]:
+    """Cache an old /services snapshot and an answer that depends on it.
+
+    Yields:
+        The snapshot's ETag.
+    """
+    snapshot = api_cache.set(SERVICES_KEY, "[]", ttl=60)
+    deps = RunDependencies(etags={SERVICES_KEY: snapshot.etag})
+    answer_cache.put(QUERY, None, {"response": "No services."}, deps)
+    assert answer_cache.get(QUERY) is not None
+    yield snapshot.etag
+    api_cache.clear()
+    answer_cache.clear()
+
+
+async def test_refresh_replaces_the_snapshot(
+    mock_api: MockDevOpsAPI, stale_answer: str
+) -> None:
+    refresher = ApiRefresher(["/services"], max_age=30)
+    assert refresher.covers(SERVICES_KEY)
+    assert await refresher.refresh("/services")
+
+    entry = api_cache.get(SERVICES_KEY)
+    assert entry is not None
+    assert entry.etag != stale_answer
+    expected = json.loads((FIXTURES_DIR / "services.json").read_text())
+    assert json.loads(entry.value) == expected
+    assert entry.expires_at - entry.stored_at == pytest.approx(30)
+    assert mock_api.requests == 1
+
+
+async def test_refresh_invalidates_dependent_answers(
+    mock_api: MockDevOpsAPI, stale_answer: str
+) -> None:
+    await ApiRefresher(["/services"]).refresh("/services")
+    assert answer_cache.get(QUERY) is None
+
+
+async def test_failed_refresh_keeps_the_snapshot(
+    monkeypatch: pytest.MonkeyPatch, stale_answer: str
+) -> None:
+    async def failing_call_api(args: dict) -> str:
+        raise RuntimeError("Error: API call failed - connection refused")
+
+    monkeypatch.setattr(refresher_module, "call_api", failing_call_api)
+    assert not await ApiRefresher(["/services"]).refresh("/services")
+    assert api_cache.get(SERVICES_KEY).etag == stale_answer
+    assert answer_cache.get(QUERY) is not None
+
+
+def test_backoff_is_capped() -> None:
+    refresher = ApiRefresher(["/services"], interval=10, jitter=0, max_backoff=60)
+    assert [refresher._delay(failures) for failures in range(5)] == [
+        10,
+        20,
+        40,
+        60,
+        60,
+    ]
@@ -0,0 +1,52 @@
+"""Tests for offline toolbox runs with the scripted model."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+
+import pytest
+from macsdk.core.api_registry import register_api_service
+
+from playground_chatbot.config import config
+from playground_chatbot.local_agents.toolbox import agent, tools
+from playground_chatbot.local_agents.toolbox.agent import run_toolbox
+from playground_chatbot.offline import (
+    QUERIES_FILE,
+    MockDevOpsAPI,
+    ScriptedChatModel,
+    load_scripts,
+)
+
+QUERY = "Why is auth-service having issues?"
+ANSWER = "auth-service is affected by the degraded postgres-primary database."
+
+
+@pytest.fixture
+def model(monkeypatch: pytest.MonkeyPatch) -> Iterator[ScriptedChatModel]:
+    """Run the toolbox with the scripted model against the local API."""
+    api = MockDevOpsAPI().start()
+    register_api_service(name="devops", base_url=api.base_url, max_retries=0)
+    # Registered again with its real URL on next use
+    monkeypatch.setattr(tools, "_api_registered", True)
+    scripted = ScriptedChatModel(scripts=load_scripts(QUERIES_FILE))
+    monkeypatch.setattr(agent, "get_answer_model", lambda *args, **kwargs: scripted)
+    monkeypatch.setattr(config, "answer_cache", False)
+    yield scripted
+    tools._api_registered = False
+    api.stop()
+
+
+async def test_plain_text_run(model: ScriptedChatModel) -> None:
+    result = await run_toolbox(QUERY, structured=False)
+    assert result["response"] == ANSWER
+    assert result["tools_used"] == ["list_skills", "read_skill", "api_get"]
+    assert result["tool_calls"] == {"calls": 6, "failed": 0}
+    # The scripted tool calls, then the answer as text
+    assert model.usage.tool_calls == {"list_skills": 1, "read_skill": 2, "api_get": 3}
+    assert model.usage.calls == 5
+
+
+async def test_structured_run_gives_the_same_answer(model: ScriptedChatModel) -> None:
+    result = await run_toolbox(QUERY)
+    assert result["response"] == ANSWER
+    assert result["tools_used"] == ["list_skills", "read_skill", "api_get"]
@@ -0,0 +1,150 @@
+"""Tests for the per-session memo of discovery tools."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from playground_chatbot.config import config
+from playground_chatbot.local_agents.toolbox import agent, middleware
+from playground_chatbot.local_agents.toolbox.middleware import (
+    SessionMemoMiddleware,
+    SkillPrefetchMiddleware,
+)
+from playground_chatbot.local_agents.toolbox.sessions import SessionStore
+
+
+def make_request(
+    call_id: str,
+    name: str = "read_skill",
+    args: dict[str, Any] | None = None,
+    messages: list[Any] | None = None,
+    thread_id: str = "t1",
+) -> SimpleNamespace:
+    """Build a minimal tool call request."""
+    return SimpleNamespace(
+        tool_call={"id": call_id, "name": name, "args": args or {"name": "a"}},
+        state={"messages": messages or []},
+        runtime=SimpleNamespace(config={"configurable": {"thread_id": thread_id}}),
+    )
+
+
+class Handler:
+    """Tool handler answering with a fixed content and counting calls."""
+
+    def __init__(self, content: str = "skill body", status: str = "success"):
+        self.content = content
+        self.status = status
+        self.calls = 0
+
+    def __call__(self, request: SimpleNamespace) -> ToolMessage:
+        self.calls += 1
+        return ToolMessage(
+            content=self.content,
+            tool_call_id=request.tool_call["id"],
+            name=request.tool_call["name"],
+            status=self.status,
+        )
+
+
+def test_repeated_call_is_served_from_the_memo() -> None:
+    memo = SessionMemoMiddleware(store=SessionStore())
+    handler = Handler()
+    memo.wrap_tool_call(make_request("c1"), handler)
+    result = memo.wrap_tool_call(make_request("c2"), handler)
+    assert handler.calls == 1
+    assert result.content == "skill body"
+    assert result.tool_call_id == "c2"
+
+
+def test_memo_is_per_session() -> None:
+    memo = SessionMemoMiddleware(store=SessionStore())
+    handler = Handler()
+    memo.wrap_tool_call(make_request("c1", thread_id="t1"), handler)
+    memo.wrap_tool_call(make_request("c2", thread_id="t2"), handler)
+    assert handler.calls == 2
+
+
+def test_call_answered_in_history_returns_a_marker() -> None:
+    memo = SessionMemoMiddleware(store=SessionStore())
+    handler = Handler()
+    call = {"id": "c1", "name": "read_skill", "args": {"name": "a"}}
+    messages = [
+        AIMessage(content="", tool_calls=[call]),
+        ToolMessage(content="skill body", tool_call_id="c1", name="read_skill"),
+        AIMessage(content="", tool_calls=[{**call, "id": "c2"}]),
+    ]
+    result = memo.wrap_tool_call(make_request("c2", messages=messages), handler)
+    assert handler.calls == 0
+    assert result.content == ("[Already provided above (turn 1). Reuse that result.]")
+
+
+def test_errors_are_not_memoized() -> None:
+    memo = SessionMemoMiddleware(store=SessionStore())
+    failing = Handler("Error: skill not found")
+    memo.wrap_tool_call(make_request("c1"), failing)
+    memo.wrap_tool_call(make_request("c2"), failing)
+    assert failing.calls == 2
+
+    rejected = Handler("boom", status="error")
+    memo.wrap_tool_call(make_request("c3", args={"name": "b"}), rejected)
+    memo.wrap_tool_call(make_request("c4", args={"name": "b"}), rejected)
+    assert rejected.calls == 2
+
+
+def test_other_tools_pass_through() -> None:
+    memo = SessionMemoMiddleware(store=SessionStore())
+    handler = Handler("[]")
+    memo.wrap_tool_call(make_request("c1", name="api_get"), handler)
+    memo.wrap_tool_call(make_request("c2", name="api_get"), handler)
+    assert handler.calls == 2
+
+
+async def test_async_calls_share_the_memo() -> None:
+    memo = SessionMemoMiddleware(store=SessionStore())
+    handler = Handler()
+
+    async def ahandler(request: SimpleNamespace) -> ToolMessage:
+        return handler(request)
+
+    await memo.awrap_tool_call(make_request("c1"), ahandler)
+    result = await memo.awrap_tool_call(make_request("c2"), ahandler)
+    assert handler.calls == 1
+    assert result.content == "skill body"
+
+
+def test_prefetch_wraps_the_session_memo(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config, "prefetch", True)
+    monkeypatch.setattr(config, "api_cache", True)
+    monkeypatch.setattr(config, "session_memo", True)
+    captured: dict[str, Any] = {}
+    monkeypatch.setattr(agent, "get_answer_model", lambda: None)
+    monkeypatch.setattr(agent, "create_agent", lambda **kwargs: captured.update(kwargs))
+    agent.create_toolbox()
+    kinds = [type(m) for m in captured["middleware"]]
+    assert kinds.index(SkillPrefetchMiddleware) < kinds.index(SessionMemoMiddleware)
+
+
+async def test_memoized_skill_read_still_prefetches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    scheduled: list[str] = []
+    monkeypatch.setattr(middleware.prefetcher, "schedule", scheduled.append)
+    prefetch = SkillPrefetchMiddleware()
+    memo = SessionMemoMiddleware(store=SessionStore())
+    handler = Handler()
+
+    async def ahandler(request: SimpleNamespace) -> ToolMessage:
+        return handler(request)
+
+    async def memoized(request: SimpleNamespace) -> ToolMessage:
+        return await memo.awrap_tool_call(request, ahandler)
+
+    for call_id in ("c1", "c2"):
+        request = make_request(call_id, args={"path": "health.md"})
+        await prefetch.awrap_tool_call(request, memoized)
+    assert handler.calls == 1
+    assert scheduled == ["health.md", "health.md"]
@@ -0,0 +1,80 @@
+"""Tests for the bounded per-session store."""
+
+from __future__ import annotations
+
+import pytest
+
+from playground_chatbot.local_agents.toolbox import sessions
+from playground_chatbot.local_agents.toolbox.sessions import SessionStore
+from playground_chatbot.local_agents.toolbox.tools import get_full_result
+
+
+def summarize(content: str) -> str:
+    return "summary"
+
+
+def test_sessions_are_isolated() -> None:
+    store = SessionStore()
+    store.put("t1", "res_1", "payload")
+    assert store.get("t1", "res_1") is not None
+    assert store.get("t2", "res_1") is None
+
+
+def test_least_recently_used_session_is_evicted() -> None:
+    store = SessionStore(max_sessions=2)
+    store.put("t1", "k", "a")
+    store.put("t2", "k", "b")
+    # Reading t1 makes t2 the least recently used
+    store.get("t1", "k")
+    store.put("t3", "k", "c")
+    assert store.get("t1", "k") is not None
+    assert store.get("t2", "k") is None
+    assert store.stats() == {"sessions": 2, "bytes": 2}
+
+
+def test_idle_sessions_are_swept(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(sessions.time, "monotonic", lambda: now[0])
+    store = SessionStore(idle_ttl=60)
+    store.put("idle", "k", "a")
+    now[0] += 30
+    store.put("active", "k", "b")
+    now[0] += 45
+    assert store.get("active", "k") is not None
+    assert store.get("idle", "k") is None
+
+
+def test_byte_cap_summarizes_then_drops_oldest_outputs() -> None:
+    store = SessionStore(max_bytes=25)
+    store.put("t1", "memo", "x" * 10)
+    store.put("t1", "res_1", "y" * 10, summarize=summarize)
+    store.put("t1", "res_2", "z" * 10, summarize=summarize)
+    # The memoized result (no summary) is dropped first
+    assert store.get("t1", "memo") is None
+    assert store.get("t1", "res_1").content == "y" * 10
+    store.put("t1", "res_3", "w" * 10, summarize=summarize)
+    oldest = store.get("t1", "res_1")
+    assert oldest.summarized and oldest.content == "summary"
+    assert store.stats()["bytes"] <= 25
+
+
+def test_keep_full_summarizes_older_outputs() -> None:
+    store = SessionStore(keep_full=1)
+    store.put("t1", "res_1", "first", summarize=summarize)
+    store.put("t1", "res_2", "second", summarize=summarize)
+    assert store.get("t1", "res_1").summarized
+    assert not store.get("t1", "res_2").summarized
+
+
+def test_full_result_is_only_served_to_its_session() -> None:
+    sessions.session_store.put("owner", "res_abc", '[{"id": 1}, {"id": 2}]')
+    try:
+
+        def fetch(thread_id: str, **args: str) -> str:
+            config = {"configurable": {"thread_id": thread_id}}
+            return get_full_result.invoke({"ref": "res_abc", **args}, config=config)
+
+        assert fetch("owner", path="1.id") == "2"
+        assert fetch("other").startswith("Error: Result 'res_abc' not found")
+    finally:
+        sessions.session_store.drop("owner")
@@ -0,0 +1,62 @@
+"""Tests for the tabular encoding of API results."""
+
+from __future__ import annotations
+
+import json
+
+from playground_chatbot.local_agents.toolbox.compaction import compact_payload
+from playground_chatbot.local_agents.toolbox.tabular import encode_tables, is_uniform
+
+SERVICES = [
+    {"id": 1, "name": "web-frontend", "status": "healthy", "issues": []},
+    {"id": 2, "name": "api-gateway", "status": "warning", "issues": ["High latency"]},
+]
+
+
+def test_uniform_list_is_encoded_as_a_table() -> None:
+    table = encode_tables(SERVICES)
+    assert table is not None
+    assert table.splitlines() == [
+        "[2 rows, tab-separated; empty cell = null or missing]",
+        "id\tname\tstatus\tissues",
+        "1\tweb-frontend\thealthy\t[]",
+        '2\tapi-gateway\twarning\t["High latency"]',
+    ]
+
+
+def test_missing_and_null_values_leave_empty_cells() -> None:
+    rows = [
+        {"id": 1, "owner": "platform", "active": True},
+        {"id": 2, "owner": None},
+    ]
+    table = encode_tables(rows)
+    assert table is not None
+    assert table.splitlines()[2:] == ["1\tplatform\ttrue", "2\t\t"]
+
+
+def test_cells_never_break_the_row() -> None:
+    table = encode_tables([{"msg": "a\tb\nc"}, {"msg": "d"}])
+    assert table is not None
+    assert table.splitlines()[2] == "a b c"
+
+
+def test_lists_in_an_object_are_encoded_under_their_key() -> None:
+    text = encode_tables({"services": SERVICES, "total": 2})
+    assert text is not None
+    first, second = text.split("\n", 1)
+    assert json.loads(first) == {"total": 2}
+    assert second.startswith("services: [2 rows")
+
+
+def test_irregular_data_stays_json() -> None:
+    assert not is_uniform([{"id": 1}])
+    assert not is_uniform([{"id": 1, "meta": {"a": 1}}, {"id": 2, "meta": {}}])
+    assert not is_uniform([{"a": 1, "b": 2, "c": 3}, {"d": 4}])
+    assert encode_tables({"total": 2}) is None
+    assert encode_tables("text") is None
+
+
+def test_tables_alone_dont_count_as_compaction() -> None:
+    content, compacted = compact_payload(json.dumps(SERVICES), tables=True)
+    assert content.startswith("[2 rows")
+    assert not compacted
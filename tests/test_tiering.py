@@ -0,0 +1,145 @@
+"""Tests for the model tiering of the toolbox's tool-calling turns."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+from langchain.agents.middleware import ModelRequest, ModelResponse
+from langchain_core.exceptions import OutputParserException
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from pydantic import BaseModel
+
+from playground_chatbot.local_agents.toolbox.middleware import (
+    ModelTieringMiddleware,
+)
+from playground_chatbot.local_agents.toolbox.progress import quiet_model_calls
+
+MAIN = FakeListChatModel(responses=["main"])
+FAST = FakeListChatModel(responses=["fast"])
+
+
+class Answer(BaseModel):
+    response: str
+
+
+@tool
+def read_skill(path: str) -> str:
+    """Read a skill."""
+    return path
+
+
+def make_request(structured: bool = True) -> ModelRequest:
+    """Build a main model request, with a response format if structured."""
+    return ModelRequest(
+        model=MAIN,
+        messages=[HumanMessage(content="Is the API gateway healthy?")],
+        tools=[read_skill],
+        response_format=Answer if structured else None,
+    )
+
+
+class Handler:
+    """Model handler answering each model with a scripted message."""
+
+    def __init__(self, fast: AIMessage | Exception) -> None:
+        self.fast = fast
+        self.models: list[Any] = []
+
+    def __call__(self, request: ModelRequest) -> ModelResponse:
+        self.models.append(request.model)
+        if request.model is MAIN:
+            return ModelResponse(result=[AIMessage(content="main answer")])
+        assert request.response_format is None
+        if isinstance(self.fast, Exception):
+            raise self.fast
+        return ModelResponse(result=[self.fast])
+
+
+def call(name: str, **args: Any) -> AIMessage:
+    """Build a model turn with one tool call."""
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": "1"}])
+
+
+def test_valid_tool_calls_use_the_fast_model() -> None:
+    handler = Handler(call("read_skill", path="health.md"))
+    response = ModelTieringMiddleware(FAST).wrap_model_call(make_request(), handler)
+    assert handler.models == [FAST]
+    assert response.result[0].tool_calls[0]["name"] == "read_skill"
+
+
+@pytest.mark.parametrize(
+    "fast",
+    [
+        call("unknown_tool"),
+        call("read_skill", wrong="x"),
+        TimeoutError("slow"),
+        ConnectionError("reset"),
+        OutputParserException("not JSON"),
+    ],
+)
+def test_unusable_fast_turns_escalate(
+    fast: AIMessage | Exception, caplog: pytest.LogCaptureFixture
+) -> None:
+    handler = Handler(fast)
+    caplog.set_level("INFO")
+    response = ModelTieringMiddleware(FAST).wrap_model_call(make_request(), handler)
+    assert handler.models == [FAST, MAIN]
+    assert response.result[0].content == "main answer"
+    assert "main model redoes the turn" in caplog.text
+
+
+def test_structured_answer_is_written_by_the_main_model() -> None:
+    handler = Handler(AIMessage(content="fast answer"))
+    ModelTieringMiddleware(FAST).wrap_model_call(make_request(), handler)
+    assert handler.models == [FAST, MAIN]
+
+
+def test_plain_answer_of_the_fast_model_is_used() -> None:
+    handler = Handler(AIMessage(content="fast answer"))
+    response = ModelTieringMiddleware(FAST).wrap_model_call(
+        make_request(structured=False), handler
+    )
+    assert handler.models == [FAST]
+    assert response.result[0].content == "fast answer"
+
+
+@pytest.mark.parametrize(
+    "error",
+    [RuntimeError("unknown model"), ValueError("bad override"), TypeError("bad")],
+)
+def test_unexpected_errors_are_logged_and_raised(
+    error: Exception, caplog: pytest.LogCaptureFixture
+) -> None:
+    handler = Handler(error)
+    with pytest.raises(type(error), match=str(error)):
+        ModelTieringMiddleware(FAST).wrap_model_call(make_request(), handler)
+    assert handler.models == [FAST]
+    assert "unexpected fast model error" in caplog.text
+
+
+async def test_async_turns_escalate_the_same_way() -> None:
+    handler = Handler(call("unknown_tool"))
+
+    async def ahandler(request: ModelRequest) -> ModelResponse:
+        return handler(request)
+
+    response = await ModelTieringMiddleware(FAST).awrap_model_call(
+        make_request(), ahandler
+    )
+    assert handler.models == [FAST, MAIN]
+    assert response.result[0].content == "main answer"
+
+
+def test_fast_turns_are_quiet() -> None:
+    quiet: list[bool] = []
+
+    def handler(request: ModelRequest) -> ModelResponse:
+        quiet.append(quiet_model_calls.get())
+        return ModelResponse(result=[AIMessage(content="answer")])
+
+    ModelTieringMiddleware(FAST).wrap_model_call(make_request(), handler)
+    assert quiet == [True, False]
+    assert not quiet_model_calls.get()